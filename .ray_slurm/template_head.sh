@@ -0,0 +1,80 @@
+#!/bin/bash
+
+#===================================================================================================
+#
+#         USAGE:  sbatch <file>.sh
+#
+#   DESCRIPTION:  Setup a multi-node, multi-partition Ray head.
+#
+#       OPTIONS:  --exclusive:          sets hardware to be exclusive to this job
+#                 --job-name:           name of the job
+#                 --output:             output file name
+#                 --cpus-per-task:      number of cpus set per task
+#                 --nodes:              number of nodes to assign to this job
+#                 --ntasks:             number of parallel tasks allowed (should match --nodes)
+#                 --ntasks-per-node:    number of tasks to assign per node
+#                 --time:               maximum time before killing job "days-hours:min:secs"
+#                 --constraint:         type of hardware to use
+#                 --partition:          type of partition used
+#                 --gres:               gpu resource request
+#
+#        AUTHOR:  William Li, william.li@ll.mit.edu
+#       COMPANY:  MIT Lincoln Laboratory
+#       VERSION:  1.0
+#       CREATED:  08/07/2023
+#===================================================================================================
+
+#SBATCH --exclusive
+#SBATCH --job-name ray_head_node
+#SBATCH --output logs/cli_head_bare_metal_test.log
+#SBATCH --cpus-per-task=1
+#SBATCH --nodes=1
+#SBATCH --ntasks=1
+#SBATCH --ntasks-per-node=1
+#SBATCH --time 0-00:05:00
+#SBATCH --partition=xeon-p8
+
+# Local variable initialization
+HOSTENV=bare_metal
+
+# Setup Ray head
+# --rendezvous: rendezvous to publish the head's IP information to
+# --autoscaling_config: Ray autoscaler configuration (empty without autoscaling)
+# --container: path to container that holds the environment code to use
+
+case $HOSTENV in
+    "container")
+        # Singualrity Config
+        export SINGULARITY_TMPDIR=/state/partition1/user/$USER/tmp    # directory used by Apptainer/Singularity
+
+        # Setup Ray Head
+        source src/scripts/setup_ray_head.sh \
+            --tmpdir=/state/partition1/user/$USER/tmp \
+            --rendezvous=file://$HOME/tmp/eu1 \
+            --container_src=n/a \
+            --container_tgt=/tmp/ray_container.sif \
+            --container_cache= \
+            --container_cache_images=3 \
+            --container_fanout=copy \
+            ;;
+
+    "bare_metal")
+        source src/scripts/setup_ray_head.sh \
+            --tmpdir=/state/partition1/user/$USER/tmp \
+            --rendezvous=file://$HOME/tmp/eu1 \
+            --autoscaling_config=
+            ;;
+
+    *)
+        echo "ERROR: This Ray configuration setup is not available. Please choose a different one."
+        ;;
+esac
+
+# Verification
+# --------------------------------------------------------------------------------------------------
+# Provides verification of Ray runtimes.
+# Argument 1: Slurm log file.
+# Argument 2: Number of nodes to check for.
+python -m src.validation.nodes "logs/cli_head_bare_metal_test.log" 1
+
+sleep infinity
@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from typing_extensions import Annotated
+
+from src.container.fanout import distribute
+from src.container.fanout import Strategy
+
+console = Console()
+
+
+def node(strategy: Strategy, src: str, root: str, rank: int, size: int, results):
+    """One simulated node: a process with its own node-local target directory.
+
+    Args:
+        strategy (Strategy): Fan-out strategy.
+        src (str): Image on the simulated shared file system.
+        root (str): Root directory of the simulation.
+        rank (int): Rank of the node.
+        size (int): Number of nodes.
+        results (multiprocessing.Queue): Queue receiving the result of the node.
+    """
+    target = os.path.join(root, f"node{rank}", "ray_container.sif")
+    result = distribute(
+        strategy,
+        src,
+        target,
+        rank=rank,
+        size=size,
+        rendezvous=f"file://{root}/rendezvous_{strategy}",
+        job=str(strategy),
+        host="127.0.0.1",
+        cache_dir=os.path.join(root, f"node{rank}", f"cache_{strategy}"),
+    )
+    results.put(result)
+
+
+def main(
+    nodes: Annotated[int, typer.Option(help="number of simulated nodes")] = 8,
+    size_mb: Annotated[int, typer.Option(help="size of the simulated container image (MB)")] = 256,
+):
+    """Distribute an image to simulated nodes (processes with separate target directories) with each strategy.
+
+    The shared file system is a local file, so the table is mostly useful for the bytes read from it: every node reads the whole image with copy and chunked, a tree reads it once.  sbcast needs a SLURM allocation and is not simulated.
+    """
+    table = Table(title=f"Container fan-out to {nodes} nodes ({size_mb} MB image)")
+    table.add_column("Strategy", justify="right", style="bold")
+    table.add_column("Wall Time (s)", justify="right")
+    table.add_column("Slowest Node (s)", justify="right")
+    table.add_column("Shared FS Reads (MB)", justify="right", style="green")
+    table.add_column("Aggregate (MB/s)", justify="right")
+
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "ray.sif")
+        with open(src, "wb") as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1 << 20))
+
+        for strategy in [Strategy.copy, Strategy.chunked, Strategy.tree]:
+            results = multiprocessing.Queue()
+            processes = [
+                multiprocessing.Process(
+                    target=node, args=(strategy, src, root, rank, nodes, results)
+                )
+                for rank in range(nodes)
+            ]
+
+            tic = time.perf_counter()
+            [process.start() for process in processes]
+            outcomes = [results.get() for _ in processes]
+            [process.join() for process in processes]
+            wall = time.perf_counter() - tic
+
+            shared = sum([r["bytes"] for r in outcomes if r["origin"] == "shared"]) / 1e6
+            total = sum([r["bytes"] for r in outcomes]) / 1e6
+            table.add_row(
+                str(strategy),
+                f"{wall:.2f}",
+                f"{max([r['seconds'] for r in outcomes]):.2f}",
+                f"{shared:.0f}",
+                f"{total / wall:.0f}",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
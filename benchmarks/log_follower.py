@@ -0,0 +1,95 @@
+import os
+import tempfile
+import time
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from typing_extensions import Annotated
+
+from src.validation.logs import LogFollower
+from src.validation.logs import RAY_RUNTIME_STARTED
+
+console = Console()
+
+# A line similar to the verbose output of `ray start -v`
+FILLER_LINE = (
+    "[2024-01-01 00:00:00,000 I 12345 12345] gcs_client.cc:100: ray start -v output line\n"
+)
+
+
+def full_read_tick(log_path: str) -> tuple[int, int]:
+    """The original wait loop tick: read the entire file and count the marker.
+
+    Args:
+        log_path (str): Path to the log file.
+
+    Returns:
+        tuple[int, int]: Number of markers found and number of bytes read.
+    """
+    with open(log_path) as f:
+        content = f.read()
+    return content.count(RAY_RUNTIME_STARTED), len(content)
+
+
+def main(
+    max_size_mb: Annotated[int, typer.Option(help="final size of the simulated log (MB)")] = 64,
+    steps: Annotated[int, typer.Option(help="number of times the log doubles in size")] = 6,
+    append_kb: Annotated[int, typer.Option(help="bytes appended between ticks (KB)")] = 64,
+    ticks: Annotated[int, typer.Option(help="ticks measured at each log size")] = 20,
+):
+    """Measure CPU time and bytes read per wait-loop tick as a SLURM log grows.
+
+    The full re-read cost grows with the size of the log while the follower cost only depends on the bytes appended between ticks.
+    """
+    table = Table(title="Wait loop cost per tick")
+    table.add_column("Log Size (MB)", justify="right", style="bold")
+    table.add_column("Full Read CPU (ms)", justify="right")
+    table.add_column("Full Read I/O (KB)", justify="right")
+    table.add_column("Follower CPU (ms)", justify="right", style="green")
+    table.add_column("Follower I/O (KB)", justify="right", style="green")
+
+    append_block = (FILLER_LINE * (append_kb * 1024 // len(FILLER_LINE))).encode()
+    sizes = [max_size_mb * 1024 * 1024 // 2**i for i in reversed(range(steps))]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log_path = os.path.join(tmpdir, "ray.log")
+        open(log_path, "wb").close()
+        follower = LogFollower(log_path, RAY_RUNTIME_STARTED)
+
+        for size in sizes:
+            # Grow the log to the target size
+            with open(log_path, "ab") as f:
+                while f.tell() < size:
+                    f.write(append_block)
+            follower.poll()
+
+            full_cpu = full_io = follower_cpu = follower_io = 0.0
+            for _ in range(ticks):
+                with open(log_path, "ab") as f:
+                    f.write(append_block)
+
+                tic = time.process_time()
+                _, n_bytes = full_read_tick(log_path)
+                full_cpu += time.process_time() - tic
+                full_io += n_bytes
+
+                bytes_before = follower.bytes_read
+                tic = time.process_time()
+                follower.poll()
+                follower_cpu += time.process_time() - tic
+                follower_io += follower.bytes_read - bytes_before
+
+            table.add_row(
+                f"{size / 1024**2:.1f}",
+                f"{1e3 * full_cpu / ticks:.3f}",
+                f"{full_io / ticks / 1024:.0f}",
+                f"{1e3 * follower_cpu / ticks:.3f}",
+                f"{follower_io / ticks / 1024:.0f}",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
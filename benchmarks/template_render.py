@@ -0,0 +1,71 @@
+import time
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from typing_extensions import Annotated
+
+from src.launch.template import load
+from src.launch.template import Template
+
+console = Console()
+
+
+def replace_lines(replacements: dict, text: str) -> str:
+    """The previous renderer: :code:`str.replace` of every key on every line.
+
+    Args:
+        replacements (dict): Replacement values.
+        text (str): Template text.
+
+    Returns:
+        str: Rendered text.
+    """
+    lines = []
+    for line in text.splitlines(keepends=True):
+        for key, value in replacements.items():
+            line = line.replace("{" + key.upper() + "}", str(value))
+        lines.append(line)
+    return "".join(lines)
+
+
+def main(
+    template: Annotated[
+        str, typer.Option(help="template to render")
+    ] = "src/templates/template_cpu.sh",
+    variants: Annotated[int, typer.Option(help="number of variants to render")] = 2000,
+    extra_keys: Annotated[int, typer.Option(help="unused keys in the values (config size)")] = 20,
+):
+    """Render many variants of an sbatch template (i.e. a parameter sweep) in memory."""
+    with open(template) as f:
+        text = f.read()
+
+    compiled = load(template)
+    base = {key.lower(): "value" for key in compiled.placeholders}
+    base |= {f"extra_{i}": i for i in range(extra_keys)}
+    values = [base | {"nodes": i, "job_name": f"sweep_{i}"} for i in range(variants)]
+
+    table = Table(title=f"Rendering {variants} variants of {template}")
+    table.add_column("Renderer", justify="right", style="bold")
+    table.add_column("Total (ms)", justify="right")
+    table.add_column("Per Variant (us)", justify="right")
+
+    tic = time.perf_counter()
+    expected = [replace_lines(v, text) for v in values]
+    baseline = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    Template(text, name=template)  # one compilation, included in the measurement
+    rendered = [compiled.render(v) for v in values]
+    fast = time.perf_counter() - tic
+
+    assert rendered == expected
+    for name, seconds in [("line x key replace", baseline), ("compiled", fast)]:
+        table.add_row(name, f"{1e3 * seconds:.1f}", f"{1e6 * seconds / variants:.1f}")
+
+    console.print(table)
+    console.print(f"Speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    typer.run(main)
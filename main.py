@@ -3,8 +3,10 @@ import json
 import os.path
 import random
 import re
+import shutil
 import subprocess
-import time
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 from os.path import exists
@@ -20,6 +22,43 @@ from trogon import Trogon
 from typer.main import get_group
 from typing_extensions import Annotated
 
+from src.container.fanout import Strategy
+from src.launch.autoscaler import cluster_config
+from src.launch.hetjob import hetjob_values
+from src.launch.local import activate
+from src.launch.partitions import check_request
+from src.launch.partitions import load_index
+from src.launch.partitions import node_cpus
+from src.launch.partitions import parse_time
+from src.launch.placement import log_decision
+from src.launch.placement import parse_timestamp
+from src.launch.placement import place
+from src.launch.registry import config_hash
+from src.launch.registry import Registry
+from src.launch.slurm import GATEWAY
+from src.launch.slurm import job_info
+from src.launch.slurm import job_states
+from src.launch.slurm import parse_job_id
+from src.launch.slurm import sbatch
+from src.launch.slurm import scancel
+from src.launch.slurm import TERMINAL_STATES
+from src.launch.sweep import expand_grid
+from src.launch.sweep import group_variants
+from src.launch.sweep import log_path
+from src.launch.sweep import sweep_values
+from src.launch.sweep import variant_tmpdir
+from src.launch.template import load
+from src.launch.template import render_file
+from src.rendezvous.server import RendezvousServer
+from src.validation.health import LOST_STATES
+from src.validation.health import NodeCensus
+from src.validation.logs import LogFollower
+from src.validation.logs import RAY_RUNTIME_STARTED
+from src.validation.monitor import JobFailedError
+from src.validation.monitor import JobMonitor
+from src.validation.ready import port_open
+from src.validation.wait import wait_for
+
 
 # Custom types
 class ConfigType(str, Enum):
@@ -35,27 +74,71 @@ class ConfigType(str, Enum):
         return str(self.value)
 
 
+class RendezvousType(str, Enum):
+    """How the Ray head address is handed to the workers."""
+
+    file = "file"
+    http = "http"
+
+    def __str__(self):
+        return str(self.value)
+
+
+class BackendType(str, Enum):
+    """Where the jobs run."""
+
+    slurm = "slurm"
+    local = "local"
+
+    def __str__(self):
+        return str(self.value)
+
+
 @dataclass
 class Cfg:
     """Global configuration settings.  These should be changed based on local directory structure."""
 
     RAY_SLURM_DIR: str = ".ray_slurm"
     SRC_TEMPLATES: str = "src/templates"
-    RESOURCES_FILE: str = f"{RAY_SLURM_DIR}/resources.json"
+    PARTITIONS_FILE: str = f"{RAY_SLURM_DIR}/partitions.json"
+    PARTITIONS_TTL: float = 600  # seconds the sinfo partition index is reused
+    PLACEMENT_LOG: str = f"{RAY_SLURM_DIR}/placements.jsonl"
     CONFIG_HEAD: str = f"{RAY_SLURM_DIR}/head.json"
     CONFIG_CPU: str = f"{RAY_SLURM_DIR}/cpu.json"
     CONFIG_GPU: str = f"{RAY_SLURM_DIR}/gpu.json"
     CONFIG_MISC: str = f"{RAY_SLURM_DIR}/misc.json"
+    CONFIG_AUTOSCALE: str = f"{RAY_SLURM_DIR}/autoscale.json"
+    AUTOSCALER_CONFIG: str = f"{RAY_SLURM_DIR}/autoscaler.json"
+    AUTOSCALER_STATE: str = f"{RAY_SLURM_DIR}/autoscaler_nodes.json"
+    RENEWALS: str = f"{RAY_SLURM_DIR}/renewals.json"
+    CAPACITY_LOG: str = f"{RAY_SLURM_DIR}/capacity.jsonl"
+    WATCH_STATE: str = f"{RAY_SLURM_DIR}/watch.json"
+    HEALTH_LOG: str = f"{RAY_SLURM_DIR}/health.jsonl"
+    EVENTS_LOG: str = f"{RAY_SLURM_DIR}/events.jsonl"
+    LOCAL_DIR: str = f"{RAY_SLURM_DIR}/local"
     SRC_TEMPLATE_HEAD: str = f"{SRC_TEMPLATES}/template_head.sh"
     SRC_TEMPLATE_CPU: str = f"{SRC_TEMPLATES}/template_cpu.sh"
     SRC_TEMPLATE_GPU: str = f"{SRC_TEMPLATES}/template_gpu.sh"
+    SRC_TEMPLATE_HETJOB: str = f"{SRC_TEMPLATES}/template_hetjob.sh"
     DEST_TEMPLATE_HEAD: str = f"{RAY_SLURM_DIR}/template_head.sh"
     DEST_TEMPLATE_CPU: str = f"{RAY_SLURM_DIR}/template_cpu.sh"
     DEST_TEMPLATE_GPU: str = f"{RAY_SLURM_DIR}/template_gpu.sh"
+    DEST_TEMPLATE_HETJOB: str = f"{RAY_SLURM_DIR}/template_hetjob.sh"
+    SRC_TEMPLATE_SWEEP: str = f"{SRC_TEMPLATES}/template_sweep.sh"
+    SWEEP_DIR: str = f"{RAY_SLURM_DIR}/sweeps"
+    REGISTRY_DB: str = f"{RAY_SLURM_DIR}/registry.db"
     LOG_PATH: str = "logs"
+    MONITOR_INTERVAL: float = 5.0  # minimum seconds between two squeue calls while waiting
     CONTAINER_TGT_PATH: str = "/tmp/ray_container.sif"  # default if no path is provided
 
 
+# Cluster tiers in launch order: name -> (source template, destination template, config file)
+TIERS = {
+    "head": (Cfg.SRC_TEMPLATE_HEAD, Cfg.DEST_TEMPLATE_HEAD, Cfg.CONFIG_HEAD),
+    "cpu": (Cfg.SRC_TEMPLATE_CPU, Cfg.DEST_TEMPLATE_CPU, Cfg.CONFIG_CPU),
+    "gpu": (Cfg.SRC_TEMPLATE_GPU, Cfg.DEST_TEMPLATE_GPU, Cfg.CONFIG_GPU),
+}
+
 # Tagging tools
 curr_time = datetime.datetime.now().strftime("%-m-%-d-%y_%H:%M:%S")
 userid = os.getenv("USER")
@@ -67,6 +150,31 @@ app = typer.Typer(
 )
 
 
+@app.callback(
+    help=":satellite: Ray clusters on **SLURM**, or on this machine with `--backend local`."
+)
+def select_backend(
+    backend: Annotated[
+        BackendType,
+        typer.Option(help="run the jobs on SLURM or as local processes", envvar="SYNDEO_BACKEND"),
+    ] = BackendType.slurm,
+    local_nodes: Annotated[
+        int, typer.Option(help="simulated nodes of the local backend", envvar="SYNDEO_LOCAL_NODES")
+    ] = 4,
+):
+    """Choose the backend of every scheduler command.
+
+    The local backend runs the rendered head and worker scripts as local processes on :code:`local_nodes` simulated nodes: shims of sbatch, srun, scontrol, squeue, sacct, scancel and sinfo (:code:`src.launch.local`) are put first on the :code:`PATH`, and every node is a real raylet on this machine.  Its partition index is kept apart from the one of SLURM.
+
+    Args:
+        backend (BackendType, optional): Backend of the jobs. Defaults to BackendType.slurm.
+        local_nodes (int, optional): Simulated nodes of the local backend. Defaults to 4.
+    """
+    if backend == BackendType.local:
+        activate(Cfg.LOCAL_DIR, local_nodes)
+        Cfg.PARTITIONS_FILE = f"{Cfg.LOCAL_DIR}/partitions.json"
+
+
 @app.command()
 def tui(ctx: typer.Context):
     """
@@ -82,7 +190,9 @@ def tui(ctx: typer.Context):
 def setup_head(
     job_name: Annotated[str, typer.Option(help="name of the job")] = "ray_head_node",
     output: Annotated[str, typer.Option(help="output file name")] = f"ray_head_{curr_time}",
-    cpus_per_task: Annotated[int, typer.Option(help="number of cpus set per task")] = 1,
+    cpus_per_task: Annotated[
+        int, typer.Option(help="number of cpus set per task (0 for all cores of a node)")
+    ] = 0,
     nodes: Annotated[int, typer.Option(help="number of nodes to assign to this job")] = 1,
     partition: Annotated[str, typer.Option(help="type of partition used")] = "normal",
     gres: Annotated[str, typer.Option(help="number of GPUs to allocate")] = "n/a",
@@ -100,6 +210,10 @@ def setup_head(
         str,
         typer.Option(help="the file system location of the node to copy container to"),
     ] = Cfg.CONTAINER_TGT_PATH,
+    deadline: Annotated[
+        int,
+        typer.Option(help="seconds to wait for the nodes to start (0 for no deadline)"),
+    ] = 0,
 ):
     config = {key: value for key, value in locals().items() if key != "self"}
     setup_node(config, Cfg.CONFIG_HEAD)
@@ -110,9 +224,19 @@ def setup_head(
 def setup_cpu(
     job_name: Annotated[str, typer.Option(help="name of the job")] = "ray_cpu_workers",
     output: Annotated[str, typer.Option(help="output file name")] = f"ray_cpu_{curr_time}",
-    cpus_per_task: Annotated[int, typer.Option(help="number of cpus set per task")] = 1,
+    cpus_per_task: Annotated[
+        int, typer.Option(help="number of cpus set per task (0 for all cores of a node)")
+    ] = 0,
     nodes: Annotated[int, typer.Option(help="number of nodes to assign to this job")] = 1,
-    partition: Annotated[str, typer.Option(help="type of partition used")] = "normal",
+    partition: Annotated[
+        str, typer.Option(help="type of partition used (auto: earliest expected start)")
+    ] = "normal",
+    cores: Annotated[
+        int, typer.Option(help="total cores sizing the nodes of --partition auto (0: --nodes)")
+    ] = 0,
+    candidates: Annotated[
+        str, typer.Option(help="comma separated partitions of --partition auto (all if empty)")
+    ] = "",
     gres: Annotated[str, typer.Option(help="number of GPUs to allocate")] = "n/a",
     time: Annotated[str, typer.Option(help="run time days-hours:min:secs")] = "0-00:05:00",
     hostenv: Annotated[
@@ -128,6 +252,10 @@ def setup_cpu(
         str,
         typer.Option(help="the file system location of the node to copy container to"),
     ] = Cfg.CONTAINER_TGT_PATH,
+    deadline: Annotated[
+        int,
+        typer.Option(help="seconds to wait for the nodes to start (0 for no deadline)"),
+    ] = 0,
 ):
     config = {key: value for key, value in locals().items() if key != "self"}
     setup_node(config, Cfg.CONFIG_CPU)
@@ -138,9 +266,19 @@ def setup_cpu(
 def setup_gpu(
     job_name: Annotated[str, typer.Option(help="name of the job")] = "ray_gpu_workers",
     output: Annotated[str, typer.Option(help="output file name")] = f"ray_gpu_{curr_time}",
-    cpus_per_task: Annotated[int, typer.Option(help="number of cpus set per task")] = 1,
+    cpus_per_task: Annotated[
+        int, typer.Option(help="number of cpus set per task (0 for all cores of a node)")
+    ] = 0,
     nodes: Annotated[int, typer.Option(help="number of nodes to assign to this job")] = 1,
-    partition: Annotated[str, typer.Option(help="type of partition used")] = "gaia",
+    partition: Annotated[
+        str, typer.Option(help="type of partition used (auto: earliest expected start)")
+    ] = "gaia",
+    cores: Annotated[
+        int, typer.Option(help="total cores sizing the nodes of --partition auto (0: --nodes)")
+    ] = 0,
+    candidates: Annotated[
+        str, typer.Option(help="comma separated partitions of --partition auto (all if empty)")
+    ] = "",
     gres: Annotated[str, typer.Option(help="number of GPUs to allocate")] = "gpu:volta:2",
     time: Annotated[str, typer.Option(help="run time days-hours:min:secs")] = "0-00:05:00",
     hostenv: Annotated[
@@ -156,6 +294,10 @@ def setup_gpu(
         str,
         typer.Option(help="the file system location of the node to copy container to"),
     ] = Cfg.CONTAINER_TGT_PATH,
+    deadline: Annotated[
+        int,
+        typer.Option(help="seconds to wait for the nodes to start (0 for no deadline)"),
+    ] = 0,
 ):
     config = {key: value for key, value in locals().items() if key != "self"}
     setup_node(config, Cfg.CONFIG_GPU)
@@ -179,31 +321,177 @@ def show_config():
 
 
 @app.command(help=":zap: **Run** all **config** files.")
-def run() -> dict:
+def run(
+    concurrent: Annotated[
+        bool,
+        typer.Option(help="submit all tiers at once instead of waiting for each tier to start"),
+    ] = False,
+    head_timeout: Annotated[
+        int,
+        typer.Option(help="seconds the workers wait for the head address to be exported"),
+    ] = 3600,
+    hetjob: Annotated[
+        bool,
+        typer.Option(help="submit all tiers as a single heterogeneous job"),
+    ] = False,
+    rendezvous: Annotated[
+        RendezvousType,
+        typer.Option(help="file|http (shared directory or a key/value server run by the CLI)"),
+    ] = RendezvousType.file,
+    container_cache: Annotated[
+        str,
+        typer.Option(
+            help="node-local directory caching container images (default: next to target)"
+        ),
+    ] = "",
+    container_cache_images: Annotated[
+        int,
+        typer.Option(help="container images kept in the node-local cache"),
+    ] = 3,
+    container_fanout: Annotated[
+        Strategy,
+        typer.Option(help="copy|chunked|tree|sbcast (how the container reaches the nodes)"),
+    ] = Strategy.copy,
+    drain_notice: Annotated[
+        int,
+        typer.Option(help="seconds before the time limit the workers are told to leave (SIGTERM)"),
+    ] = 60,
+    reuse: Annotated[
+        bool,
+        typer.Option(help="return a live cluster of the same configuration instead of launching"),
+    ] = False,
+    standby: Annotated[
+        int,
+        typer.Option(help="clusters of the same configuration kept starting in the background"),
+    ] = 0,
+    renew_margin: Annotated[
+        int,
+        typer.Option(help="seconds of walltime a reused or standby cluster must have left"),
+    ] = 60,
+) -> dict:
     """Run the current configuration.
 
+    Args:
+        concurrent (bool, optional): Submit the head, CPU and GPU tiers at once.  Workers wait for the head address to appear, so the time to a full cluster is the slowest tier rather than the sum of all tiers. Defaults to False.
+        head_timeout (int, optional): Seconds the workers wait for the head address before giving up. Defaults to 3600.
+        hetjob (bool, optional): Submit all tiers as one heterogeneous job so SLURM co-schedules the head and the workers. Defaults to False.
+        rendezvous (RendezvousType, optional): Publish the head address to a shared directory (file) or to a key/value server started by the CLI for the duration of the launch (http). Defaults to file.
+        container_cache (str, optional): Node-local directory where container images are cached between runs.  Defaults to .syndeo_cache next to the container target.
+        container_cache_images (int, optional): Number of images kept in the node-local cache, the least recently used are evicted. Defaults to 3.
+        container_fanout (Strategy, optional): How the container reaches the nodes: every node reads the shared file system (copy), with parallel chunked reads (chunked), from peers that already have it (tree) or with sbcast. Defaults to copy.
+        drain_notice (int, optional): Seconds before their time limit SLURM sends SIGTERM to the worker job steps (:code:`--signal`), so the workers leave the Ray cluster before they are killed. Defaults to 60.
+        reuse (bool, optional): Return a running cluster launched from the same configuration, if its head answers and it has :code:`renew_margin` seconds of walltime left, instead of launching a new one. Defaults to False.
+        standby (int, optional): Number of clusters of the same configuration submitted ahead (without waiting for them) and replaced before their walltime expires, so a later :code:`--reuse` finds one ready. Defaults to 0.
+        renew_margin (int, optional): Seconds of walltime a cluster must have left to be reused or to count as standby. Defaults to 60.
+
     Returns:
         dict: Information of the current run.
     """
     show()
 
+    options = {
+        "rendezvous": str(rendezvous),
+        "container_cache": container_cache,
+        "container_cache_images": container_cache_images,
+        "container_fanout": str(container_fanout),
+        "drain_notice": drain_notice,
+    }
+    launch_hash = run_hash(options)
+    if standby:
+        assert rendezvous == RendezvousType.file, "Standby clusters need a file rendezvous!"
+        assert not exists(Cfg.CONFIG_AUTOSCALE), "Standby clusters cannot be autoscaled!"
+
+    if reuse:
+        info = reuse_cluster(launch_hash, renew_margin)
+        if info:
+            top_up_standby(
+                launch_hash, standby, renew_margin, info["cluster_id"], head_timeout, options
+            )
+            return info
+
+    # Serve the head address while the cluster starts
+    server = None
+    if rendezvous == RendezvousType.http:
+        server = RendezvousServer()
+        server.start()
+
     # Setup a random directory for the Ray IP directory
-    runtime_dict = generate_runtime_data()
+    runtime_dict = generate_runtime_data(
+        head_timeout,
+        server.url() if server else None,
+        container_cache,
+        container_cache_images,
+        container_fanout,
+        drain_notice,
+    )
+
+    # The autoscaled tiers are launched by the autoscaler of the head
+    if exists(Cfg.CONFIG_AUTOSCALE):
+        configure_autoscaler(runtime_dict)
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        registry.add_cluster(runtime_dict["cluster_id"], launch_hash, runtime_dict)
 
     # Display the Ray IP TMP directory for debugging purposes
-    run_script(Cfg.SRC_TEMPLATE_HEAD, Cfg.DEST_TEMPLATE_HEAD, Cfg.CONFIG_HEAD, runtime_dict)
-    run_script(Cfg.SRC_TEMPLATE_CPU, Cfg.DEST_TEMPLATE_CPU, Cfg.CONFIG_CPU, runtime_dict)
-    run_script(Cfg.SRC_TEMPLATE_GPU, Cfg.DEST_TEMPLATE_GPU, Cfg.CONFIG_GPU, runtime_dict)
+    assert not (concurrent and hetjob), "Choose either --concurrent or --hetjob!"
+    try:
+        if hetjob:
+            run_hetjob(runtime_dict)
+        elif concurrent:
+            run_concurrent(runtime_dict)
+        else:
+            for tier, (src_template_path, dest_template_path, config_path) in launch_tiers(
+                runtime_dict
+            ).items():
+                run_script(src_template_path, dest_template_path, config_path, runtime_dict, tier)
+    except JobFailedError as error:
+        console.print(f":x: [red]{error}")
+        console.print(
+            f"Cancel the cluster with: python main.py teardown --cluster {runtime_dict['cluster_id']}"
+        )
+        raise typer.Exit(code=1)
+    finally:
+        if server is not None:
+            server.stop()
 
     info = get_run_info()
     info["ray_ip_dir"] = runtime_dict["ray_ip_dir"]
+    info["rendezvous"] = runtime_dict["rendezvous"]
+
+    # Every node registered, record the cluster as running
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        jobs = registry.jobs([runtime_dict["cluster_id"]])
+        registry.update_states({job["job_id"]: "RUNNING" for job in jobs})
+        if "head_addr" in info:
+            registry.set_head(runtime_dict["cluster_id"], info["head_addr"])
+    info["cluster_id"] = runtime_dict["cluster_id"]
+
+    top_up_standby(launch_hash, standby, renew_margin, info["cluster_id"], head_timeout, options)
 
     return info
 
 
-def generate_runtime_data() -> dict:
+def generate_runtime_data(
+    head_timeout: int = 3600,
+    rendezvous_server: str | None = None,
+    container_cache: str = "",
+    container_cache_images: int = 3,
+    container_fanout: str = "copy",
+    drain_notice: int = 60,
+    save: bool = True,
+) -> dict:
     """Generate a randomized temporary directory that is accessible by all worker nodes.  This must be a shared file directory.  This must be added to the config dictionaries so that at construction, the templates can all point to the same directory.
 
+    The head publishes its address to the rendezvous and the workers read it from there.  By default the rendezvous is the shared directory (:code:`file://`), otherwise it is a namespace on a rendezvous server (:code:`http://`).
+
+    Args:
+        head_timeout (int, optional): Seconds the workers wait for the head address. Defaults to 3600.
+        rendezvous_server (str | None, optional): URL of a running rendezvous server. Defaults to None.
+        container_cache (str, optional): Node-local container cache directory, empty for the default. Defaults to "".
+        container_cache_images (int, optional): Number of images kept in the container cache. Defaults to 3.
+        container_fanout (str, optional): Distribution strategy of the container. Defaults to "copy".
+        drain_notice (int, optional): Seconds before the time limit the worker jobs get SIGTERM. Defaults to 60.
+        save (bool, optional): Save the values as the ones of the current cluster (:code:`Cfg.CONFIG_MISC`). Defaults to True.
+
     Returns:
         dict: Information of the runtime.
     """
@@ -211,18 +499,1265 @@ def generate_runtime_data() -> dict:
     runtime_dict = {}
 
     # Generate variables
-    ray_ip_dir = "$HOME/tmp/" + random_id()
+    cluster_id = random_id()
+    ray_ip_dir = "$HOME/tmp/" + cluster_id
 
     # Add variables to config dict
+    runtime_dict["cluster_id"] = cluster_id
     runtime_dict["ray_ip_dir"] = ray_ip_dir
+    runtime_dict["head_timeout"] = head_timeout
+    if rendezvous_server is None:
+        runtime_dict["rendezvous"] = f"file://{ray_ip_dir}"
+    else:
+        runtime_dict["rendezvous"] = f"{rendezvous_server}/{cluster_id}"
+    runtime_dict["container_cache"] = container_cache
+    runtime_dict["container_cache_images"] = container_cache_images
+    runtime_dict["container_fanout"] = str(container_fanout)
+    runtime_dict["drain_notice"] = drain_notice
+    runtime_dict["autoscaling_config"] = ""
+    runtime_dict["autoscaled"] = []
 
     # Save misc data to file
-    with open(Cfg.CONFIG_MISC, "w") as fp:
-        json.dump(runtime_dict, fp)
+    if save:
+        with open(Cfg.CONFIG_MISC, "w") as fp:
+            json.dump(runtime_dict, fp)
+
+    return runtime_dict
+
+
+def launch_tiers(runtime_dict: dict) -> dict[str, tuple[str, str, str]]:
+    """Tiers submitted by :code:`run`, every tier except the ones launched by the autoscaler.
+
+    Args:
+        runtime_dict (dict): Runtime dictionary of values generated at runtime.
+
+    Returns:
+        dict[str, tuple[str, str, str]]: Source template, destination template and config file by tier.
+    """
+    return {tier: paths for tier, paths in TIERS.items() if tier not in runtime_dict["autoscaled"]}
+
+
+def run_hash(options: dict) -> str:
+    """Hash of everything a cluster is launched from: the tier configs, the autoscaling settings and the run options that change the cluster.
+
+    Args:
+        options (dict): Run options (rendezvous, container cache and fan-out).
+
+    Returns:
+        str: Configuration hash, equal for two runs that launch equivalent clusters.
+    """
+    launch = {"options": options}
+    for name, path in [(tier, config_path) for tier, (_, _, config_path) in TIERS.items()] + [
+        ("autoscale", Cfg.CONFIG_AUTOSCALE)
+    ]:
+        if exists(path):
+            launch[name] = json_read(path)
+
+    return config_hash(launch)
+
+
+def survey_clusters(launch_hash: str) -> list[dict]:
+    """Clusters launched from a configuration that are still alive, oldest first.
+
+    The state of every job of these clusters is refreshed with one batched squeue call.  A cluster is dropped once its head job ended or one of its jobs failed (cancelled jobs were scaled in or released by the autoscaler).  The time left of a cluster is the earliest walltime expiry of its jobs, None while one of them is not running yet.  Jobs of autoscaled tiers come and go, they are not taken into account.
+
+    Args:
+        launch_hash (str): Hash of the configuration (:code:`run_hash`).
+
+    Returns:
+        list[dict]: Cluster records with their active jobs ("jobs") and "time_left" in seconds.
+    """
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        clusters = registry.clusters(launch_hash)
+        cluster_ids = [cluster["cluster_id"] for cluster in clusters]
+        active = [job["job_id"] for job in registry.jobs(cluster_ids, active=True)]
+        GATEWAY.invalidate(active)
+        registry.update_states(job_states(active))
+        jobs = registry.jobs(cluster_ids)
+    starts = {job_id: info["start"] for job_id, info in job_info(active).items()}  # cached
+
+    now = timer.time()
+    alive = []
+    for cluster in clusters:
+        cluster_jobs = [job for job in jobs if job["cluster_id"] == cluster["cluster_id"]]
+        failed = [job for job in cluster_jobs if job["state"] in TERMINAL_STATES - {"CANCELLED"}]
+        cluster_jobs = [job for job in cluster_jobs if job["state"] not in TERMINAL_STATES]
+        heads = [job for job in cluster_jobs if job["tier"] in ("head", "hetjob")]
+        if failed or not heads:
+            continue
+
+        static = [
+            job
+            for job in cluster_jobs
+            if job["tier"].split(".")[0] not in cluster["runtime"]["autoscaled"]
+        ]
+        expiries = [job_expiry(job, starts.get(job["job_id"], "")) for job in static]
+        time_left = None if None in expiries else min(expiries) - now
+        alive.append(cluster | {"jobs": static, "time_left": time_left})
+
+    return alive
+
+
+def job_expiry(job: dict, start: str) -> float | None:
+    """Epoch seconds at which a running job reaches its walltime limit.
+
+    Args:
+        job (dict): Job record.
+        start (str): Start time reported by squeue, the last state change is used if unknown.
+
+    Returns:
+        float | None: Expiry, None if the job is not running, infinity for jobs without a limit.
+    """
+    if job["state"] != "RUNNING":
+        return None
+
+    tier = job["tier"].split(".")[0]
+    config = json_read(TIERS["head" if tier == "hetjob" else tier][2])
+    limit = parse_time(config["time"])
+    started = parse_timestamp(start) or job["updated"]
+
+    return float("inf") if limit is None else started + limit
+
+
+def reuse_cluster(launch_hash: str, margin: int) -> dict:
+    """Make a running cluster of the same configuration the current cluster.
+
+    The cluster that expires first among the ones with more than :code:`margin` seconds left is chosen, if every node of its jobs started and its head answers on the GCS port.  Nothing is submitted.
+
+    Args:
+        launch_hash (str): Hash of the configuration (:code:`run_hash`).
+        margin (int): Seconds of walltime the cluster must have left.
+
+    Returns:
+        dict: Information of the reused cluster, empty if none is ready.
+    """
+    clusters = [
+        cluster
+        for cluster in survey_clusters(launch_hash)
+        if cluster["time_left"] is not None and cluster["time_left"] > margin
+    ]
+    for cluster in sorted(clusters, key=lambda cluster: cluster["time_left"]):
+        info = cluster_info(cluster)
+        if not info:
+            continue
+
+        runtime_dict = cluster["runtime"]
+        with open(Cfg.CONFIG_MISC, "w") as fp:
+            json.dump(runtime_dict, fp)
+        with Registry(Cfg.REGISTRY_DB) as registry:
+            registry.set_head(runtime_dict["cluster_id"], info["head_addr"])
+
+        console.print(
+            f":recycle: Reusing cluster {runtime_dict['cluster_id']} "
+            f"({cluster['time_left']:.0f} s of walltime left)"
+        )
+        print_run_table(info)
+        info["ray_ip_dir"] = runtime_dict["ray_ip_dir"]
+        info["rendezvous"] = runtime_dict["rendezvous"]
+        info["cluster_id"] = runtime_dict["cluster_id"]
+        return info
+
+    console.print(":information: No running cluster of this configuration, launching one")
+    return {}
+
+
+def cluster_info(cluster: dict) -> dict:
+    """Head information of a cluster that is ready to use.
+
+    Args:
+        cluster (dict): Cluster record of :code:`survey_clusters`.
+
+    Returns:
+        dict: Head information (head_addr, ...), empty if a node has not started or the head does not answer.
+    """
+    head = [job for job in cluster["jobs"] if job["tier"] in ("head", "hetjob")][0]
+    info = read_head_info(head["log"])
+    if head["head_addr"]:
+        info["head_addr"] = head["head_addr"]
+    if "head_addr" not in info:
+        return {}
+
+    for job in cluster["jobs"]:
+        if LogFollower(job["log"], RAY_RUNTIME_STARTED).count(RAY_RUNTIME_STARTED) < job["nodes"]:
+            return {}
+
+    host, port = info["head_addr"].rsplit(":", 1)
+    return info if port_open(host, int(port)) else {}
+
+
+def top_up_standby(
+    launch_hash: str, standby: int, margin: int, in_use: str, head_timeout: int, options: dict
+) -> list[str]:
+    """Submit clusters of the same configuration until :code:`standby` of them are starting or running besides the one in use.
+
+    A standby cluster with less than :code:`margin` seconds of walltime left no longer counts, so it is replaced before it expires.  Standby clusters are submitted without waiting for their nodes, each with its own logs.
+
+    Args:
+        launch_hash (str): Hash of the configuration (:code:`run_hash`).
+        standby (int): Number of standby clusters.
+        margin (int): Seconds of walltime a standby cluster must have left.
+        in_use (str): Identifier of the current cluster.
+        head_timeout (int): Seconds the workers wait for the head address.
+        options (dict): Run options the clusters are launched with.
+
+    Returns:
+        list[str]: Identifiers of the submitted clusters.
+    """
+    if standby <= 0:
+        return []
+
+    pool = [
+        cluster
+        for cluster in survey_clusters(launch_hash)
+        if cluster["cluster_id"] != in_use
+        and (cluster["time_left"] is None or cluster["time_left"] > margin)
+    ]
+
+    submitted = []
+    for _ in range(standby - len(pool)):
+        submitted.append(launch_background(launch_hash, head_timeout, options)["cluster_id"])
+
+    console.print(
+        f":hourglass: {len(pool) + len(submitted)} standby clusters ({len(submitted)} submitted)"
+    )
+
+    return submitted
+
+
+def launch_background(launch_hash: str, head_timeout: int, options: dict) -> dict:
+    """Submit a new cluster of the current configuration without waiting for its nodes.
+
+    Every job of the cluster writes its own log (suffixed by the cluster id), so it never removes the log of a running cluster.  The cluster is not made the current one.
+
+    Args:
+        launch_hash (str): Hash of the configuration (:code:`run_hash`).
+        head_timeout (int): Seconds the workers wait for the head address.
+        options (dict): Run options the cluster is launched with.
+
+    Returns:
+        dict: Runtime values of the new cluster.
+    """
+    runtime_dict = generate_runtime_data(
+        head_timeout,
+        None,
+        options["container_cache"],
+        options["container_cache_images"],
+        options["container_fanout"],
+        options["drain_notice"],
+        save=False,
+    )
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        registry.add_cluster(runtime_dict["cluster_id"], launch_hash, runtime_dict)
+
+    for tier, (src_template_path, dest_template_path, config_path) in TIERS.items():
+        master_dict = prepare_script(config_path, runtime_dict)
+        if not master_dict:
+            continue
+
+        suffix = runtime_dict["cluster_id"]
+        master_dict["output"] = f"{master_dict['output']}_{suffix}"
+        dest_template_path = dest_template_path.replace(".sh", f"_{suffix}.sh")
+        submit_tier(tier, master_dict, src_template_path, dest_template_path)
 
     return runtime_dict
 
 
+@app.command(help=":arrows_counterclockwise: **Autoscale** the worker tiers of the next run.")
+def autoscale(
+    cpu_min: Annotated[int, typer.Option(help="CPU worker nodes kept at all times")] = 0,
+    cpu_max: Annotated[int, typer.Option(help="CPU worker nodes at most (0: not autoscaled)")] = 0,
+    gpu_min: Annotated[int, typer.Option(help="GPU worker nodes kept at all times")] = 0,
+    gpu_max: Annotated[int, typer.Option(help="GPU worker nodes at most (0: not autoscaled)")] = 0,
+    idle_timeout: Annotated[
+        int, typer.Option(help="seconds an idle worker node is kept before its job is cancelled")
+    ] = 300,
+    node_id_as_ip: Annotated[
+        bool,
+        typer.Option(help="identify nodes by Ray node id (several nodes on one host, i.e. tests)"),
+    ] = False,
+    disable: Annotated[bool, typer.Option(help="launch every tier statically again")] = False,
+) -> dict:
+    """Let the Ray autoscaler of the head launch and release the worker nodes of the next run.
+
+    Each node of an autoscaled tier is a one-node job rendered from the tier config.  The autoscaler starts :code:`min` nodes, adds nodes up to :code:`max` while tasks or actors are pending on missing resources, and cancels the jobs of nodes idle for :code:`idle_timeout` seconds.  The autoscaled tiers are not submitted by :code:`run`.
+
+    Args:
+        cpu_min (int, optional): CPU worker nodes kept at all times. Defaults to 0.
+        cpu_max (int, optional): Maximum number of CPU worker nodes, 0 if the tier is not autoscaled. Defaults to 0.
+        gpu_min (int, optional): GPU worker nodes kept at all times. Defaults to 0.
+        gpu_max (int, optional): Maximum number of GPU worker nodes, 0 if the tier is not autoscaled. Defaults to 0.
+        idle_timeout (int, optional): Seconds an idle node is kept. Defaults to 300.
+        node_id_as_ip (bool, optional): Identify the nodes by Ray node id instead of IP address. Defaults to False.
+        disable (bool, optional): Remove the autoscaling settings. Defaults to False.
+
+    Returns:
+        dict: Autoscaling settings, empty if disabled.
+    """
+    if disable:
+        if exists(Cfg.CONFIG_AUTOSCALE):
+            os.remove(Cfg.CONFIG_AUTOSCALE)
+        console.print(":information: Autoscaling disabled")
+        return {}
+
+    bounds = {"cpu": (cpu_min, cpu_max), "gpu": (gpu_min, gpu_max)}
+    tiers = {tier: bound for tier, bound in bounds.items() if bound[1] > 0}
+    assert tiers, "Set --cpu-max or --gpu-max!"
+    for tier, (minimum, maximum) in tiers.items():
+        assert exists(TIERS[tier][2]), f"Setup the {tier.upper()} workers first!"
+        assert 0 <= minimum <= maximum, f"The {tier.upper()} bounds must satisfy 0 <= min <= max!"
+
+    settings = {
+        "tiers": {
+            tier: {"min_workers": low, "max_workers": high} for tier, (low, high) in tiers.items()
+        },
+        "idle_timeout": idle_timeout,
+        "use_node_id_as_ip": node_id_as_ip,
+    }
+    with open(Cfg.CONFIG_AUTOSCALE, "w") as fp:
+        json.dump(settings, fp)
+
+    for tier, (low, high) in tiers.items():
+        console.print(f":arrows_counterclockwise: {tier.upper()} workers: {low} to {high} nodes")
+
+    return settings
+
+
+def configure_autoscaler(runtime_dict: dict):
+    """Write the Ray autoscaler configuration of a run and point the head to it.
+
+    Args:
+        runtime_dict (dict): Runtime dictionary, the autoscaling config and the autoscaled tiers are set in place.
+    """
+    settings = json_read(Cfg.CONFIG_AUTOSCALE)
+    head_dict = json_read(Cfg.CONFIG_HEAD) if exists(Cfg.CONFIG_HEAD) else {}
+
+    # The autoscaler runs sbatch on the head, and launched nodes join after the CLI exited
+    assert head_dict.get("hostenv") == ConfigType.bare_metal, "Autoscaling needs a bare metal head!"
+    assert runtime_dict["rendezvous"].startswith("file://"), "Autoscaling needs a file rendezvous!"
+
+    tiers = {}
+    for tier, bounds in settings["tiers"].items():
+        src_template_path, _, config_path = TIERS[tier]
+        master_dict = prepare_script(config_path, runtime_dict)
+        tiers[tier] = bounds | {"template": src_template_path, "values": master_dict}
+
+    workdir = os.getcwd()
+    provider = {
+        "workdir": workdir,
+        "state_path": os.path.join(workdir, Cfg.AUTOSCALER_STATE),
+        "registry": os.path.join(workdir, Cfg.REGISTRY_DB),
+        "use_node_id_as_ip": settings["use_node_id_as_ip"],
+    }
+    config = cluster_config(runtime_dict["cluster_id"], tiers, settings["idle_timeout"], provider)
+    with open(Cfg.AUTOSCALER_CONFIG, "w") as fp:
+        json.dump(config, fp, indent=2)
+
+    # Nodes of a previous cluster are not tracked by this autoscaler
+    if exists(Cfg.AUTOSCALER_STATE):
+        os.remove(Cfg.AUTOSCALER_STATE)
+
+    runtime_dict["autoscaling_config"] = os.path.join(workdir, Cfg.AUTOSCALER_CONFIG)
+    runtime_dict["autoscaled"] = list(tiers)
+
+
+@app.command(help=":chart_with_upwards_trend: **Sweep** a grid of cluster configs (job arrays).")
+def sweep(
+    nodes: Annotated[str, typer.Option(help="comma separated worker node counts")] = "1",
+    cpus_per_task: Annotated[
+        str, typer.Option(help="comma separated cpus per task (0 for all cores of a node)")
+    ] = "0",
+    partition: Annotated[str, typer.Option(help="comma separated partitions")] = "normal",
+    hostenv: Annotated[
+        str, typer.Option(help="comma separated container|bare_metal")
+    ] = "bare_metal",
+    gres: Annotated[str, typer.Option(help="number of GPUs to allocate")] = "n/a",
+    time: Annotated[str, typer.Option(help="run time days-hours:min:secs")] = "0-00:05:00",
+    tmpdir: Annotated[
+        str,
+        typer.Option(help="temporary directory to write files to (host system)"),
+    ] = "/tmp",
+    container_src_path: Annotated[str, typer.Option(help="path of source container")] = "n/a",
+    container_tgt_path: Annotated[
+        str,
+        typer.Option(help="the file system location of the node to copy container to"),
+    ] = Cfg.CONTAINER_TGT_PATH,
+    repeats: Annotated[int, typer.Option(help="number of runs of each variant")] = 1,
+    array: Annotated[
+        bool,
+        typer.Option(help="submit the variants sharing a resource request as one job array"),
+    ] = True,
+    parallel: Annotated[int, typer.Option(help="concurrent sbatch calls")] = 4,
+    command: Annotated[
+        str, typer.Option(help="command run once the cluster of a variant is up")
+    ] = "",
+    wait: Annotated[bool, typer.Option(help="wait for the variants and collect timings")] = True,
+    timeout: Annotated[int, typer.Option(help="seconds to wait for the variants")] = 3600,
+) -> list[dict]:
+    """Run a grid of cluster configurations.
+
+    Every variant is a single-job Ray cluster (head on the first node, workers on the others) with its own runtime directory under :code:`.ray_slurm/sweeps/<id>`.  All scripts are rendered in memory up front.  The variants that share a resource request are submitted as one job array, so a sweep costs one sbatch call per shape rather than one setup + run per variant.
+
+    Args:
+        nodes (str, optional): Worker node counts. Defaults to "1".
+        cpus_per_task (str, optional): CPUs per task, 0 for all cores of a node. Defaults to "0".
+        partition (str, optional): Partitions. Defaults to "normal".
+        hostenv (str, optional): Host environments. Defaults to "bare_metal".
+        gres (str, optional): GPUs to allocate per node. Defaults to "n/a".
+        time (str, optional): Run time of each variant. Defaults to "0-00:05:00".
+        tmpdir (str, optional): Temporary directory on the nodes, each variant uses a sub-directory. Defaults to "/tmp".
+        container_src_path (str, optional): Path of the source container. Defaults to "n/a".
+        container_tgt_path (str, optional): Node-local path of the container. Defaults to Cfg.CONTAINER_TGT_PATH.
+        repeats (int, optional): Number of runs of each variant. Defaults to 1.
+        array (bool, optional): Submit job arrays, otherwise one sbatch call per variant. Defaults to True.
+        parallel (int, optional): Number of concurrent sbatch calls. Defaults to 4.
+        command (str, optional): Command run on the batch host once the cluster of a variant is up ($HEAD_NODE_ADDR is set). Defaults to "".
+        wait (bool, optional): Wait for every variant and collect the time to a full cluster. Defaults to True.
+        timeout (int, optional): Seconds to wait for the variants. Defaults to 3600.
+
+    Returns:
+        list[dict]: Variants with their job id, status and timings.
+    """
+    sweep_id = f"sweep_{random_id(6)}"
+    sweep_dir = f"{Cfg.SWEEP_DIR}/{sweep_id}"
+
+    grid = {
+        "nodes": [int(n) for n in nodes.split(",")],
+        "cpus_per_task": [int(n) for n in cpus_per_task.split(",")],
+        "partition": partition.split(","),
+        "hostenv": [str(ConfigType(h)) for h in hostenv.split(",")],
+    }
+    base = {
+        "job_name": sweep_id,
+        "output": sweep_id,
+        "gres": gres,
+        "time": time,
+        "tmpdir": tmpdir,
+        "container_src_path": container_src_path,
+        "container_tgt_path": container_tgt_path,
+    }
+    if ConfigType.container in grid["hostenv"]:
+        assert exists(os.path.expanduser(container_src_path)), "Container source file must exist!"
+        assert str(container_tgt_path).endswith(".sif"), "Must specify .sif file path"
+
+    # Fill and check the resource request of every variant before anything is submitted
+    index = load_index(Cfg.PARTITIONS_FILE, Cfg.PARTITIONS_TTL)
+    variants = expand_grid(base, grid, repeats)
+    for variant in variants:
+        if variant["cpus_per_task"] == 0:
+            variant["cpus_per_task"] = node_cpus(index, variant) or 1
+        problems = check_request(index, variant)
+        assert not problems, f"Infeasible variant {variant['variant']}: {'; '.join(problems)}"
+    groups = group_variants(variants, array)
+
+    # Render every submission in memory before submitting anything
+    template = load(Cfg.SRC_TEMPLATE_SWEEP)
+    scripts = [
+        template.render(sweep_values(sweep_id, g, group, command)) for g, group in enumerate(groups)
+    ]
+
+    # Write the runtime directory of the sweep
+    script_paths = []
+    for g, (group, script) in enumerate(zip(groups, scripts)):
+        script_paths.append(f"{sweep_dir}/g{g}.sh")
+        for task, variant in enumerate(group):
+            variant |= {"group": g, "task": task, "log": log_path(sweep_id, g, task)}
+            os.makedirs(f"{sweep_dir}/v{variant['variant']}", exist_ok=True)
+            with open(f"{sweep_dir}/v{variant['variant']}/config.json", "w") as fp:
+                json.dump(variant, fp)
+        with open(script_paths[-1], "w") as fp:
+            fp.write(script)
+
+    # Submit
+    tic = timer.perf_counter()
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        results = list(executor.map(submit_script, script_paths))
+    submitted = timer.time()
+    overhead = timer.perf_counter() - tic
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        for group, result in zip(groups, results):
+            job_id = parse_job_id(result.stdout)
+            for variant in group:
+                variant |= {"job_id": f"{job_id}_{variant['task']}", "status": "submitted"}
+                registry.add(
+                    variant["job_id"],
+                    sweep_id,
+                    "sweep",
+                    variant | {"tmpdir": variant_tmpdir(sweep_id, variant)},
+                    variant["log"],
+                )
+
+    print(
+        f":rocket: Submitted {len(variants)} variants with {len(script_paths)} sbatch calls in {overhead:.2f} s"
+    )
+
+    if wait:
+        verify_variants(variants, submitted, timeout)
+        with Registry(Cfg.REGISTRY_DB) as registry:
+            registry.update_states(
+                {v["job_id"]: "RUNNING" for v in variants if v["status"] == "ready"}
+            )
+    print_sweep_table(sweep_id, variants)
+
+    with open(f"{sweep_dir}/results.json", "w") as fp:
+        json.dump(variants, fp, indent=4)
+
+    return variants
+
+
+def verify_variants(variants: list[dict], submitted: float, timeout: int):
+    """Follow the logs of every variant of a sweep from a single loop and record the time each cluster took to start all of its nodes.
+
+    The jobs of all variants are cross-checked with the scheduler in batch, a variant whose job died or can never start is marked with its state instead of being waited on.
+
+    Args:
+        variants (list[dict]): Submitted variants, the "status" and "ready_s" fields are updated.
+        submitted (float): Time of the submission (epoch seconds).
+        timeout (int): Seconds to wait for the variants.
+    """
+    followers = [LogFollower(variant["log"], RAY_RUNTIME_STARTED) for variant in variants]
+    monitor = JobMonitor([variant["job_id"] for variant in variants], Cfg.MONITOR_INTERVAL)
+
+    with Progress() as progress:
+        task = progress.add_task(
+            "Registering Sweep Nodes...", total=sum([v["nodes"] + 1 for v in variants])
+        )
+
+        def all_started() -> bool:
+            active_nodes = 0
+            for variant, follower in zip(variants, followers):
+                count = follower.count(RAY_RUNTIME_STARTED)
+                active_nodes += min(count, variant["nodes"] + 1)
+                if count >= variant["nodes"] + 1 and variant["status"] != "ready":
+                    variant["status"] = "ready"
+                    variant["ready_s"] = round(timer.time() - submitted, 3)
+
+            # A variant whose job died or can never start is given up on
+            for variant in variants:
+                if variant["status"] == "submitted":
+                    try:
+                        monitor.check([variant["job_id"]])
+                    except JobFailedError:
+                        variant["status"] = f"failed: {monitor.describe(variant['job_id'])}"
+
+            progress.update(task, completed=active_nodes)
+            return all([variant["status"] != "submitted" for variant in variants])
+
+        try:
+            wait_for(all_started, [follower.log_path for follower in followers], timeout=timeout)
+        except TimeoutError:
+            console.print(
+                f":warning: Timeout reached after {timeout} s, some variants did not start"
+            )
+
+
+def print_sweep_table(sweep_id: str, variants: list[dict]):
+    """Create a CLI table of the variants of a sweep.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+        variants (list[dict]): Variants of the sweep.
+    """
+    table = Table(title=f"Sweep {sweep_id}", box=box.ROUNDED)
+    for column in ["Variant", "Partition", "Nodes", "CPUs", "Hostenv", "Repeat", "Job", "Status"]:
+        table.add_column(column, justify="right")
+    table.add_column("Ready (s)", justify="right", style="green")
+
+    for variant in variants:
+        table.add_row(
+            str(variant["variant"]),
+            variant["partition"],
+            str(variant["nodes"]),
+            str(variant["cpus_per_task"]),
+            variant["hostenv"],
+            str(variant["repeat"]),
+            variant["job_id"],
+            variant["status"],
+            str(variant.get("ready_s", "-")),
+        )
+
+    console.print(table)
+
+
+@app.command(help=":mag: **Status** of the recorded clusters.")
+def status(
+    cluster: Annotated[str, typer.Option(help="cluster or sweep id (default: all)")] = "",
+    finished: Annotated[bool, typer.Option(help="include the finished jobs")] = False,
+) -> list[dict]:
+    """Show the jobs recorded in the job registry, their state is refreshed with one squeue (and one sacct) call for all of them.
+
+    Args:
+        cluster (str, optional): Only the jobs of this cluster or sweep. Defaults to "" (every cluster).
+        finished (bool, optional): Include the jobs that reached a terminal state. Defaults to False.
+
+    Returns:
+        list[dict]: Job records.
+    """
+    cluster_ids = [cluster] if cluster else None
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        active = [job["job_id"] for job in registry.jobs(cluster_ids, active=True)]
+        GATEWAY.invalidate(active)  # an explicit status request is never answered from the cache
+        registry.update_states(job_states(active))
+        jobs = registry.jobs(cluster_ids, active=not finished)
+
+    print_status_table(jobs)
+
+    return jobs
+
+
+@app.command(help=":stop_sign: **Teardown** the recorded clusters (one bulk scancel).")
+def teardown(
+    cluster: Annotated[str, typer.Option(help="cluster or sweep id (default: all)")] = "",
+    logs: Annotated[bool, typer.Option(help="also delete the logs of the jobs")] = False,
+    parallel: Annotated[int, typer.Option(help="concurrent node-local cleanups")] = 8,
+) -> list[dict]:
+    """Cancel every active job of the job registry with a single scancel call.
+
+    Before the allocations are released, the Ray session files are removed from the node-local temporary directory of every running job (in parallel).  The shared rendezvous directories of the clusters are removed as well.
+
+    Args:
+        cluster (str, optional): Only the jobs of this cluster or sweep. Defaults to "" (every cluster).
+        logs (bool, optional): Delete the SLURM logs of the jobs. Defaults to False.
+        parallel (int, optional): Number of concurrent node-local cleanups. Defaults to 8.
+
+    Returns:
+        list[dict]: Cancelled jobs.
+    """
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        jobs = registry.jobs([cluster] if cluster else None, active=True)
+        GATEWAY.invalidate([job["job_id"] for job in jobs])
+        states = job_states([job["job_id"] for job in jobs])
+        registry.update_states(states)
+
+        jobs = [job for job in jobs if states[job["job_id"]] not in TERMINAL_STATES]
+        if not jobs:
+            console.print(":information: No active jobs")
+            return []
+
+        # Node-local cleanup needs the allocation, so it runs before the jobs are cancelled
+        running = [job for job in jobs if states[job["job_id"]] == "RUNNING" and job["tmpdir"]]
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            list(executor.map(clean_tmpdir, running))
+
+        scancel([job["job_id"] for job in jobs])
+        registry.update_states({job["job_id"]: "CANCELLED" for job in jobs})
+
+    for ray_ip_dir in {job["ray_ip_dir"] for job in jobs if job["ray_ip_dir"]}:
+        shutil.rmtree(os.path.expandvars(ray_ip_dir), ignore_errors=True)
+    if logs:
+        for job in jobs:
+            if job["log"] and exists(job["log"]):
+                os.remove(job["log"])
+
+    console.print(f":stop_sign: Cancelled {len(jobs)} jobs")
+
+    return jobs
+
+
+@app.command(help=":heavy_plus_sign: **Scale** the **CPU** workers of the running cluster.")
+def scale_cpu(
+    add: Annotated[int, typer.Option(help="nodes to add as a new worker job")] = 0,
+    remove: Annotated[int, typer.Option(help="worker jobs to drain and cancel (latest first)")] = 0,
+    job: Annotated[list[str], typer.Option(help="worker job to drain and cancel")] = [],
+    grace: Annotated[int, typer.Option(help="seconds the drained workers get to stop")] = 10,
+) -> list[dict]:
+    return scale("cpu", add, remove, job, grace)
+
+
+@app.command(help=":heavy_plus_sign: **Scale** the **GPU** workers of the running cluster.")
+def scale_gpu(
+    add: Annotated[int, typer.Option(help="nodes to add as a new worker job")] = 0,
+    remove: Annotated[int, typer.Option(help="worker jobs to drain and cancel (latest first)")] = 0,
+    job: Annotated[list[str], typer.Option(help="worker job to drain and cancel")] = [],
+    grace: Annotated[int, typer.Option(help="seconds the drained workers get to stop")] = 10,
+) -> list[dict]:
+    return scale("gpu", add, remove, job, grace)
+
+
+def scale(tier: str, add: int, remove: int, job_ids: list[str], grace: int) -> list[dict]:
+    """Add a worker job to the running cluster, or drain and cancel some of its worker jobs.
+
+    The cluster is the one of the last :code:`run`: its runtime values (:code:`Cfg.CONFIG_MISC`) hold the rendezvous a new worker job reads the head address from.  Only the nodes of the new job are verified, the head and the other workers keep running.
+
+    Args:
+        tier (str): Worker tier (cpu, gpu).
+        add (int): Nodes of the worker job to add, 0 to remove jobs.
+        remove (int): Number of worker jobs to remove, the most recently submitted first.
+        job_ids (list[str]): Worker jobs to remove, instead of the most recent ones.
+        grace (int): Seconds between the drain signal and the cancellation of removed jobs.
+
+    Returns:
+        list[dict]: Added or removed job records.
+    """
+    assert (add > 0) != bool(remove or job_ids), "Choose either --add or --remove/--job!"
+    assert exists(Cfg.CONFIG_MISC), "No cluster has been run!"
+    runtime_dict = json_read(Cfg.CONFIG_MISC)
+    cluster_id = runtime_dict["cluster_id"]
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        active = [job["job_id"] for job in registry.jobs([cluster_id], active=True)]
+        GATEWAY.invalidate(active)
+        registry.update_states(job_states(active))
+        jobs = registry.jobs([cluster_id], active=True)
+
+    heads = [job for job in jobs if job["tier"] in ("head", "hetjob")]
+    assert any(
+        [job["state"] == "RUNNING" for job in heads]
+    ), f"Cluster {cluster_id} is not running!"
+
+    if add:
+        try:
+            changed = scale_out(tier, add, runtime_dict)
+        except JobFailedError as error:
+            console.print(f":x: [red]{error}")
+            raise typer.Exit(code=1)
+    else:
+        workers = [job for job in jobs if job["tier"].split(".")[0] == tier]
+        if job_ids:
+            changed = [job for job in workers if job["job_id"] in job_ids]
+            assert len(changed) == len(set(job_ids)), f"Not active {tier} jobs of {cluster_id}!"
+        else:
+            changed = workers[::-1][:remove]
+        scale_in(changed, grace)
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        jobs = registry.jobs([cluster_id], active=True)
+    print_status_table(jobs)
+    console.print(f":information: {sum([job['nodes'] for job in jobs])} nodes in {cluster_id}")
+
+    return changed
+
+
+def scale_out(tier: str, nodes: int, runtime_dict: dict) -> list[dict]:
+    """Submit an additional worker job that joins the head of a running cluster and wait for its nodes.
+
+    Args:
+        tier (str): Worker tier (cpu, gpu).
+        nodes (int): Nodes of the new job.
+        runtime_dict (dict): Runtime values of the running cluster.
+
+    Raises:
+        JobFailedError: The new job died, can never start or missed its deadline.
+
+    Returns:
+        list[dict]: Record of the new job.
+    """
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        jobs = registry.jobs([runtime_dict["cluster_id"]])
+    label = f"scale{len([job for job in jobs if job['tier'] == tier])}"
+
+    master_dicts = submit_worker(tier, nodes, runtime_dict, label)
+    verify_tiers(master_dicts)
+
+    job_ids = [master_dict["job_id"] for master_dict in master_dicts.values()]
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        registry.update_states({job_id: "RUNNING" for job_id in job_ids})
+        return [
+            job for job in registry.jobs([runtime_dict["cluster_id"]]) if job["job_id"] in job_ids
+        ]
+
+
+def submit_worker(tier: str, nodes: int, runtime_dict: dict, label: str) -> dict[str, dict]:
+    """Submit an additional worker job that joins the head of a running cluster, without waiting for its nodes.
+
+    Args:
+        tier (str): Worker tier (cpu, gpu), or one part of a tier split across partitions (i.e. cpu.1).
+        nodes (int): Nodes of the new job.
+        runtime_dict (dict): Runtime values of the running cluster.
+        label (str): Suffix of the job name, log and script of the new job (i.e. scale2).
+
+    Returns:
+        dict[str, dict]: Master dictionary (with its "job_id") of the new job, by tier.
+    """
+    base, _, part = tier.partition(".")
+    src_template_path, dest_template_path, config_path = TIERS[base]
+    assert exists(config_path), f"Setup the {base.upper()} workers first!"
+    assert runtime_dict["rendezvous"].startswith("file://"), "Scaling needs a file rendezvous!"
+
+    # A new job lands on a single partition: the one of its part, else the first one of the tier
+    master_dict = prepare_script(config_path, runtime_dict)
+    master_dict |= (master_dict.pop("parts", None) or [{}])[int(part or 0)]
+    master_dict |= {
+        "nodes": nodes,
+        "job_name": f"{master_dict['job_name']}_{label}",
+        "output": f"{master_dict['output']}_{label}",
+    }
+
+    problems = check_request(load_index(Cfg.PARTITIONS_FILE, Cfg.PARTITIONS_TTL), master_dict)
+    assert not problems, f"Infeasible request: {'; '.join(problems)}"
+
+    dest_template_path = dest_template_path.replace(".sh", f"_{label}.sh")
+    return submit_tier(tier, master_dict, src_template_path, dest_template_path)
+
+
+def scale_in(jobs: list[dict], grace: int, parallel: int = 8):
+    """Drain worker jobs, then cancel them.
+
+    SIGTERM is sent to the job steps first: :code:`ray start --block` stops its raylet, so the nodes leave the Ray cluster and their tasks are rescheduled on the remaining nodes before the allocation is released.
+
+    Args:
+        jobs (list[dict]): Job records of the workers to remove.
+        grace (int): Seconds the workers get to stop before the jobs are cancelled.
+        parallel (int, optional): Number of concurrent node-local cleanups. Defaults to 8.
+    """
+    if not jobs:
+        console.print(":information: No worker jobs to remove")
+        return
+
+    running = [job for job in jobs if job["state"] == "RUNNING"]
+    if running:
+        scancel([job["job_id"] for job in running], signal="TERM")
+        timer.sleep(grace)
+
+        # Node-local cleanup needs the allocation, so it runs before the jobs are cancelled
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            list(executor.map(clean_tmpdir, [job for job in running if job["tmpdir"]]))
+
+    scancel([job["job_id"] for job in jobs])
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        registry.update_states({job["job_id"]: "CANCELLED" for job in jobs})
+    console.print(f":stop_sign: Removed {len(jobs)} worker jobs")
+
+
+@app.command(
+    help=":repeat: **Renew** the worker jobs of the running cluster before their time limit."
+)
+def renew(
+    lead: Annotated[
+        int, typer.Option(help="seconds before the time limit a replacement job is submitted")
+    ] = 300,
+    interval: Annotated[float, typer.Option(help="seconds between two checks")] = 30,
+    grace: Annotated[int, typer.Option(help="seconds the replaced workers get to stop")] = 10,
+    duration: Annotated[
+        float, typer.Option(help="seconds to keep renewing (0: as long as the head runs)")
+    ] = 0,
+    head: Annotated[
+        bool, typer.Option(help="also fail over to a new cluster before the head expires")
+    ] = False,
+) -> list[dict]:
+    """Keep the capacity of the running cluster beyond the time limit of its worker jobs.
+
+    Every :code:`interval` seconds, the jobs of the current cluster are refreshed with one batched squeue call.  A running worker job with less than :code:`lead` seconds of walltime left gets a replacement job of the same tier, nodes and partition.  Once the nodes of the replacement started, the old job is drained (SIGTERM to its job steps) and cancelled, so the capacity never dips as long as a replacement starts within :code:`lead` seconds.  A worker job that reaches its limit anyway is drained by SLURM itself with the :code:`--signal` notice of the templates.
+
+    With :code:`head`, a new cluster of the same configuration is submitted :code:`lead` seconds before the head expires, and it becomes the current cluster once its head answers.  The Ray state of the old cluster is not carried over: drivers have to connect to the new head address.
+
+    Every round appends a capacity sample (nodes of the started workers and their target) to :code:`Cfg.CAPACITY_LOG`.
+
+    Args:
+        lead (int, optional): Seconds before the time limit a replacement is submitted, longer than the expected queue wait. Defaults to 300.
+        interval (float, optional): Seconds between two rounds. Defaults to 30.
+        grace (int, optional): Seconds between the drain signal and the cancellation of a replaced job. Defaults to 10.
+        duration (float, optional): Seconds to keep renewing, 0 to stop when the head job ends. Defaults to 0.
+        head (bool, optional): Fail over to a new cluster before the head expires. Defaults to False.
+
+    Returns:
+        list[dict]: Capacity samples.
+    """
+    assert exists(Cfg.CONFIG_MISC), "No cluster has been run!"
+
+    start = timer.monotonic()
+    samples = []
+    while True:
+        # A failover changes the current cluster
+        sample = renew_round(json_read(Cfg.CONFIG_MISC), lead, grace, head)
+        samples.append(sample)
+        with open(Cfg.CAPACITY_LOG, "a") as fp:
+            fp.write(json.dumps(sample) + "\n")
+
+        if not sample["head"]:
+            console.print(f":stop_sign: The head of {sample['cluster_id']} ended")
+            break
+        if duration and timer.monotonic() - start >= duration:
+            break
+        timer.sleep(interval)
+
+    return samples
+
+
+def renew_round(runtime_dict: dict, lead: int, grace: int, head: bool) -> dict:
+    """One round of :code:`renew`: drain the workers whose replacement started, replace the workers about to expire.
+
+    The replacement of each worker job is kept in :code:`Cfg.RENEWALS`, so a restarted :code:`renew` goes on where it stopped.
+
+    Args:
+        runtime_dict (dict): Runtime values of the current cluster.
+        lead (int): Seconds before the time limit a replacement is submitted.
+        grace (int): Seconds between the drain signal and the cancellation of a replaced job.
+        head (bool): Fail over to a new cluster before the head expires.
+
+    Returns:
+        dict: Capacity sample (time, cluster_id, head, nodes, target, replacing).
+    """
+    cluster_id = runtime_dict["cluster_id"]
+    state = json_read(Cfg.RENEWALS) if exists(Cfg.RENEWALS) else {}
+    if state.get("cluster_id") != cluster_id:
+        state = {"cluster_id": cluster_id, "jobs": {}, "successor": ""}
+    renewals = state["jobs"]
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        active = [job["job_id"] for job in registry.jobs([cluster_id], active=True)]
+        GATEWAY.invalidate(active)
+        registry.update_states(job_states(active))
+        jobs = {job["job_id"]: job for job in registry.jobs([cluster_id])}
+    starts = {job_id: info["start"] for job_id, info in job_info(active).items()}  # cached
+    now = timer.time()
+
+    def started(job: dict) -> bool:
+        follower = LogFollower(job["log"], RAY_RUNTIME_STARTED)
+        return job["state"] == "RUNNING" and follower.count(RAY_RUNTIME_STARTED) >= job["nodes"]
+
+    # Drain the jobs whose replacement started, forget the replacements that died
+    for old, new in list(renewals.items()):
+        if jobs[old]["state"] in TERMINAL_STATES or jobs[new]["state"] in TERMINAL_STATES:
+            renewals.pop(old)
+        elif started(jobs[new]):
+            scale_in([jobs[old]], grace)
+            jobs[old]["state"] = "CANCELLED"
+            renewals.pop(old)
+
+    # Replace the running workers that expire within the lead time
+    workers = [
+        job
+        for job in jobs.values()
+        if job["tier"] not in ("head", "hetjob")
+        and job["tier"].split(".")[0] not in runtime_dict["autoscaled"]
+    ]
+    submitted = len(jobs)
+    for job in workers:
+        if job["state"] != "RUNNING" or job["job_id"] in renewals:
+            continue
+        expiry = job_expiry(job, starts.get(job["job_id"], ""))
+        if expiry - now > lead:
+            continue
+
+        label = f"renew{submitted}"  # jobs of the cluster so far, unique
+        (replacement,) = submit_worker(job["tier"], job["nodes"], runtime_dict, label).values()
+        submitted += 1
+        renewals[job["job_id"]] = replacement["job_id"]
+        console.print(
+            f":repeat: Job {job['job_id']} expires in {expiry - now:.0f} s, "
+            f"replaced by job {replacement['job_id']}"
+        )
+
+    heads = [
+        job
+        for job in jobs.values()
+        if job["tier"] in ("head", "hetjob") and job["state"] not in TERMINAL_STATES
+    ]
+    if head and heads:
+        renew_head(runtime_dict, heads[0], starts, lead, state)
+
+    state["jobs"] = renewals
+    with open(Cfg.RENEWALS, "w") as fp:
+        json.dump(state, fp)
+
+    target = sum(
+        [
+            json_read(config_path)["nodes"]
+            for tier, (_, _, config_path) in launch_tiers(runtime_dict).items()
+            if tier != "head" and exists(config_path)
+        ]
+    )
+    return {
+        "time": now,
+        "cluster_id": cluster_id,
+        "head": bool(heads),
+        "nodes": sum([job["nodes"] for job in workers if started(job)]),
+        "target": target,
+        "replacing": len(renewals),
+    }
+
+
+def renew_head(runtime_dict: dict, head_job: dict, starts: dict[str, str], lead: int, state: dict):
+    """Fail over to a new cluster of the same configuration before the head of the current one expires.
+
+    Args:
+        runtime_dict (dict): Runtime values of the current cluster.
+        head_job (dict): Job record of the head.
+        starts (dict[str, str]): Start time reported by squeue by job id.
+        lead (int): Seconds before the time limit the new cluster is submitted.
+        state (dict): Renewal state, the successor cluster is updated in place.
+    """
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        records = [c for c in registry.clusters() if c["cluster_id"] == runtime_dict["cluster_id"]]
+    if not records:
+        return
+
+    launch_hash = records[0]["config_hash"]
+    if not state["successor"]:
+        expiry = job_expiry(head_job, starts.get(head_job["job_id"], ""))
+        if expiry is None or expiry - timer.time() > lead:
+            return
+
+        options = {
+            key: runtime_dict[key]
+            for key in [
+                "container_cache",
+                "container_cache_images",
+                "container_fanout",
+                "drain_notice",
+            ]
+        }
+        successor = launch_background(launch_hash, runtime_dict["head_timeout"], options)
+        state["successor"] = successor["cluster_id"]
+        console.print(
+            f":repeat: Head of {runtime_dict['cluster_id']} expires soon, "
+            f"starting cluster {state['successor']}"
+        )
+        return
+
+    clusters = [c for c in survey_clusters(launch_hash) if c["cluster_id"] == state["successor"]]
+    if not clusters:
+        state["successor"] = ""  # the new cluster died, another one is submitted next round
+        return
+
+    info = cluster_info(clusters[0]) if clusters[0]["time_left"] is not None else {}
+    if info:
+        with open(Cfg.CONFIG_MISC, "w") as fp:
+            json.dump(clusters[0]["runtime"], fp)
+        with Registry(Cfg.REGISTRY_DB) as registry:
+            registry.set_head(state["successor"], info["head_addr"])
+        console.print(f":repeat: Failed over to cluster {state['successor']} ({info['head_addr']})")
+
+
+@app.command(
+    help=":stethoscope: **Watch** the worker nodes of the running cluster, replace the lost ones."
+)
+def watch(
+    interval: Annotated[
+        float, typer.Option(help="seconds between two checks (one GCS query each)")
+    ] = 10,
+    duration: Annotated[
+        float, typer.Option(help="seconds to keep watching (0: as long as the head runs)")
+    ] = 0,
+    replace: Annotated[
+        bool, typer.Option(help="submit a worker job for the lost nodes (else only report them)")
+    ] = True,
+) -> list[dict]:
+    """Notice the worker nodes of the running cluster that died and replace them.
+
+    Every :code:`interval` seconds, the jobs of the current cluster are refreshed with one batched squeue call and the alive Ray nodes are read with one GCS query of the head.  Worker nodes carry the id of their SLURM job as a label (:code:`setup_ray_workers.sh`), so a node is lost when it left the Ray cluster while its job runs, or when its job failed, was preempted or lost its nodes.  The lost nodes of a job get a replacement worker job of the same tier and partition, and a job whose nodes all died is cancelled so it stops holding its allocation.
+
+    Worker jobs being renewed (:code:`renew`) and autoscaled tiers are left alone.  Events (nodes lost, replacement submitted, head unreachable) are appended to :code:`Cfg.EVENTS_LOG` and every round appends a health sample to :code:`Cfg.HEALTH_LOG`.
+
+    Args:
+        interval (float, optional): Seconds between two rounds, the time to notice a lost node. Defaults to 10.
+        duration (float, optional): Seconds to keep watching, 0 to stop when the head job ends. Defaults to 0.
+        replace (bool, optional): Submit replacement worker jobs. Defaults to True.
+
+    Returns:
+        list[dict]: Health samples.
+    """
+    assert exists(Cfg.CONFIG_MISC), "No cluster has been run!"
+
+    start = timer.monotonic()
+    censuses = {}
+    samples = []
+    while True:
+        # A failover changes the current cluster
+        sample = watch_round(json_read(Cfg.CONFIG_MISC), censuses, interval, replace)
+        samples.append(sample)
+        with open(Cfg.HEALTH_LOG, "a") as fp:
+            fp.write(json.dumps(sample) + "\n")
+
+        if not sample["head"]:
+            console.print(f":stop_sign: The head of {sample['cluster_id']} ended")
+            break
+        if duration and timer.monotonic() - start >= duration:
+            break
+        timer.sleep(interval)
+
+    return samples
+
+
+def watch_round(
+    runtime_dict: dict, censuses: dict[str, NodeCensus], interval: float, replace: bool
+) -> dict:
+    """One round of :code:`watch`: compare the alive Ray nodes with the worker jobs, replace the lost nodes.
+
+    The nodes seen alive and the nodes already replaced are kept by job in :code:`Cfg.WATCH_STATE`, so a restarted :code:`watch` goes on where it stopped.
+
+    Args:
+        runtime_dict (dict): Runtime values of the current cluster.
+        censuses (dict[str, NodeCensus]): Node census by head address, reused across rounds.
+        interval (float): Seconds between two rounds (minimum age of a GCS answer before it is queried again).
+        replace (bool): Submit replacement worker jobs.
+
+    Returns:
+        dict: Health sample (time, cluster_id, head, alive, target, lost, replaced, gcs_queries).
+    """
+    cluster_id = runtime_dict["cluster_id"]
+    state = json_read(Cfg.WATCH_STATE) if exists(Cfg.WATCH_STATE) else {}
+    if state.get("cluster_id") != cluster_id:
+        state = {"cluster_id": cluster_id, "seen": {}, "lost": {}}
+    renewals = json_read(Cfg.RENEWALS) if exists(Cfg.RENEWALS) else {}
+    renewing = renewals["jobs"] if renewals.get("cluster_id") == cluster_id else {}
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        active = [job["job_id"] for job in registry.jobs([cluster_id], active=True)]
+        GATEWAY.invalidate(active)
+        registry.update_states(job_states(active))
+        jobs = registry.jobs([cluster_id])
+
+    heads = [
+        job
+        for job in jobs
+        if job["tier"] in ("head", "hetjob") and job["state"] not in TERMINAL_STATES
+    ]
+    workers = [
+        job
+        for job in jobs
+        if job["tier"] not in ("head", "hetjob")
+        and job["tier"].split(".")[0] not in runtime_dict["autoscaled"]
+    ]
+
+    # One GCS query per round, shared by every job
+    census, alive = None, None
+    if heads:
+        address = heads[0]["head_addr"] or read_head_info(heads[0]["log"]).get("head_addr", "")
+        if address:
+            census = censuses.setdefault(address, NodeCensus(address, interval))
+            alive = census.by_job()
+        if alive is None:
+            log_event("head_unreachable", cluster_id=cluster_id, head_addr=address)
+
+    lost, replaced = 0, 0
+    submitted = len(jobs)
+    for job in workers:
+        job_id = job["job_id"]
+        if job_id in renewing:
+            continue
+
+        # A node is lost once it was seen alive and left, or when its job died
+        seen = set(state["seen"].get(job_id, []))
+        nodes = alive.get(job_id, set()) if alive is not None else set()
+        if job["state"] not in TERMINAL_STATES:
+            seen |= nodes
+        state["seen"][job_id] = sorted(seen)
+        if job["state"] in LOST_STATES:
+            reason, count = job["state"], job["nodes"]
+        elif job["state"] not in TERMINAL_STATES and alive is not None:
+            reason, count = "left the Ray cluster", len(seen - nodes)
+        else:
+            continue
+
+        new = count - state["lost"].get(job_id, 0)
+        if new <= 0:
+            continue
+        state["lost"][job_id] = count
+        lost += new
+        log_event("nodes_lost", cluster_id=cluster_id, job_id=job_id, nodes=new, reason=reason)
+
+        if replace:
+            label = f"watch{submitted}"  # jobs of the cluster so far, unique
+            (replacement,) = submit_worker(job["tier"], new, runtime_dict, label).values()
+            submitted += 1
+            replaced += 1
+            log_event(
+                "replaced",
+                cluster_id=cluster_id,
+                job_id=job_id,
+                replacement=replacement["job_id"],
+                nodes=new,
+            )
+
+        # Free the allocation of a job left without nodes (the batch script outlives ray start)
+        if job["state"] not in TERMINAL_STATES and count >= job["nodes"]:
+            scale_in([job], 0)
+
+    with open(Cfg.WATCH_STATE, "w") as fp:
+        json.dump(state, fp)
+
+    target = sum(
+        [
+            json_read(config_path)["nodes"]
+            for tier, (_, _, config_path) in launch_tiers(runtime_dict).items()
+            if tier != "head" and exists(config_path)
+        ]
+    )
+    return {
+        "time": timer.time(),
+        "cluster_id": cluster_id,
+        "head": bool(heads),
+        "alive": (
+            sum([len(alive.get(job["job_id"], [])) for job in workers])
+            if alive is not None
+            else None
+        ),
+        "target": target,
+        "lost": lost,
+        "replaced": replaced,
+        "gcs_queries": census.queries if census else 0,
+    }
+
+
+def log_event(event: str, **fields):
+    """Append an event to :code:`Cfg.EVENTS_LOG` and print it.
+
+    Args:
+        event (str): Name of the event (i.e. nodes_lost).
+        **fields: Values of the event (i.e. cluster_id, job_id).
+    """
+    record = {"time": timer.time(), "event": event} | fields
+    with open(Cfg.EVENTS_LOG, "a") as fp:
+        fp.write(json.dumps(record) + "\n")
+    console.print(f":stethoscope: {event} " + " ".join([f"{k}={v}" for k, v in fields.items()]))
+
+
+def clean_tmpdir(job: dict, timeout: int = 60) -> subprocess.CompletedProcess | None:
+    """Remove the Ray session files from the node-local temporary directory of every node of a running job.
+
+    Args:
+        job (dict): Job record.
+        timeout (int, optional): Seconds before giving up on the cleanup. Defaults to 60.
+
+    Returns:
+        subprocess.CompletedProcess | None: Result of srun, None on timeout.
+    """
+    command = [
+        "srun",
+        f"--jobid={job['job_id']}",
+        "--overlap",
+        f"--export=ALL,TMPDIR={job['tmpdir']}",
+    ]
+    if job["tier"] == "hetjob":
+        command.append(f"--het-group=0-{len(job['partition'].split(',')) - 1}")
+    command += ["bash", "-c", 'rm -rf "$TMPDIR"/session_*']  # node-local, even on one machine
+
+    try:
+        return GATEWAY.run(command, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+
+
+def print_status_table(jobs: list[dict]):
+    """Create a CLI table of recorded jobs.
+
+    Args:
+        jobs (list[dict]): Job records.
+    """
+    table = Table(title="Syndeo Jobs", box=box.ROUNDED)
+    for column in ["Cluster", "Tier", "Job", "Name", "Nodes", "Partition", "Submitted"]:
+        table.add_column(column, justify="right")
+    table.add_column("State", justify="right", style="green")
+    table.add_column("Head", justify="left", style="cyan")
+
+    for job in jobs:
+        table.add_row(
+            job["cluster_id"],
+            job["tier"],
+            job["job_id"],
+            job["job_name"],
+            str(job["nodes"]),
+            job["partition"],
+            datetime.datetime.fromtimestamp(job["submitted"]).strftime("%m-%d %H:%M:%S"),
+            job["state"],
+            job["head_addr"] or "-",
+        )
+
+    console.print(table)
+
+
 @app.command(help=":fire: **Delete** the **all** configs.")
 def delete_all():
     """Deletes the current configuration."""
@@ -261,11 +1796,49 @@ def show():
     show_config()
 
 
+@app.command(help=":bar_chart: **Display** the partitions of the cluster (cached sinfo).")
+def partitions(
+    refresh: Annotated[bool, typer.Option(help="query sinfo even if the index is recent")] = False,
+) -> dict:
+    """Show the partition index used to check requests before submission.
+
+    Args:
+        refresh (bool, optional): Rebuild the index from sinfo. Defaults to False.
+
+    Returns:
+        dict: Partition by name.
+    """
+    index = load_index(Cfg.PARTITIONS_FILE, Cfg.PARTITIONS_TTL, refresh)
+
+    table = Table(title="SLURM Partitions", box=box.ROUNDED)
+    for column in ["Partition", "Up", "Nodes", "Idle", "Cores/Node", "GRES/Node", "Max Time (h)"]:
+        table.add_column(column, justify="right")
+
+    for name, partition in sorted(index.items()):
+        for group in partition["groups"]:
+            gres = ",".join([f"{k}:{v}" for k, v in group["gres"].items() if ":" in k]) or "-"
+            limit = partition["max_time"]
+            table.add_row(
+                name,
+                "yes" if partition["available"] else "no",
+                str(group["nodes"]),
+                str(group["idle"]),
+                str(group["cpus"]),
+                gres,
+                "unlimited" if limit is None else f"{limit / 3600:g}",
+            )
+
+    console.print(table)
+
+    return index
+
+
 def run_script(
     src_template_path: str,
     dest_template_path: str,
     config_path: str,
     runtime_dict: dict,
+    tier: str = "",
 ):
     """Launch the sbatch script for a certain configuration.
 
@@ -274,26 +1847,176 @@ def run_script(
         dest_template_path (str): The destination template file with the user values inserted.
         config_path (str): Path to the user configuration files.
         runtime_dict (dict): Runtime dictionary of values generated at runtime.
+        tier (str, optional): Name of the tier recorded in the job registry. Defaults to "".
     """
     # Return if configuration file has not been set
-    if exists(config_path) is False:
+    master_dict = prepare_script(config_path, runtime_dict)
+    if not master_dict:
         return
 
+    # Execute sbatch (one job per part of a tier split across partitions)
+    master_dicts = submit_tier(tier, master_dict, src_template_path, dest_template_path)
+
+    # Read the logs to determine whether the nodes have been successfully created.
+    # This may take a few mins depending on how many nodes the user has requested.
+    # Thus, a progress bar is provided along with an estimated wait time.
+    verify_tiers(master_dicts)
+
+
+def run_concurrent(runtime_dict: dict):
+    """Launch the sbatch scripts of all configured tiers at once and wait for all of them to start.
+
+    Args:
+        runtime_dict (dict): Runtime dictionary of values generated at runtime.
+    """
+    master_dicts = {}
+    for tier, (src_template_path, dest_template_path, config_path) in launch_tiers(
+        runtime_dict
+    ).items():
+        master_dict = prepare_script(config_path, runtime_dict)
+        if not master_dict:
+            continue
+
+        master_dicts |= submit_tier(tier, master_dict, src_template_path, dest_template_path)
+
+    verify_tiers(master_dicts)
+
+
+def run_hetjob(runtime_dict: dict):
+    """Launch all configured tiers as a single heterogeneous job and wait for every node to start.
+
+    Args:
+        runtime_dict (dict): Runtime dictionary of values generated at runtime.
+    """
+    assert exists(Cfg.CONFIG_HEAD), "A head config is required for a heterogeneous job!"
+
+    head_dict = json_read(Cfg.CONFIG_HEAD)
+    workers = [
+        (tier, json_read(config_path))
+        for tier, (_, _, config_path) in launch_tiers(runtime_dict).items()
+        if tier != "head" and exists(config_path)
+    ]
+
+    # Generate one script with a component per tier (and per part of a split tier)
+    workers = [
+        part for tier, config in workers for part in tier_parts(tier, config | runtime_dict).items()
+    ]
+    master_dict = head_dict | runtime_dict | hetjob_values(head_dict | runtime_dict, workers)
+    replace_text(master_dict, Cfg.SRC_TEMPLATE_HETJOB, Cfg.DEST_TEMPLATE_HETJOB)
+
+    remove_log(master_dict)
+    master_dict["job_id"] = register_job(
+        submit_script(Cfg.DEST_TEMPLATE_HETJOB), "hetjob", master_dict
+    )
+    verify_nodes(master_dict, "hetjob")
+
+
+def prepare_script(config_path: str, runtime_dict: dict) -> dict:
+    """Merge a configuration with the runtime values the sbatch script is generated from.
+
+    Args:
+        config_path (str): Path to the user configuration files.
+        runtime_dict (dict): Runtime dictionary of values generated at runtime.
+
+    Returns:
+        dict: Master dictionary of user and runtime values, empty if the configuration has not been set.
+    """
+    # Return if configuration file has not been set
+    if exists(config_path) is False:
+        return {}
+
     # Read the config dict & add runtime data
     config_dict = json_read(config_path)
     master_dict = config_dict | runtime_dict  # merge two dicts
 
-    # Generate full template with all fields filled out from a source template
-    replace_text(master_dict, src_template_path, dest_template_path)
+    return master_dict
+
+
+def tier_parts(tier: str, master_dict: dict) -> dict[str, dict]:
+    """Master dictionary of each job of a tier.  A tier placed across several partitions (:code:`--partition auto`) has one job per part, each with its own partition, nodes, name and log.
+
+    Args:
+        tier (str): Name of the tier.
+        master_dict (dict): Master dictionary of the tier.
+
+    Returns:
+        dict[str, dict]: Master dictionary by job name (the tier, or <tier>.<part>).
+    """
+    parts = master_dict.get("parts")
+    if not parts:
+        return {tier: master_dict}
+
+    return {
+        f"{tier}.{i}": master_dict
+        | part
+        | {"job_name": f"{master_dict['job_name']}_{i}", "output": f"{master_dict['output']}_{i}"}
+        for i, part in enumerate(parts)
+    }
+
+
+def submit_tier(
+    tier: str, master_dict: dict, src_template_path: str, dest_template_path: str
+) -> dict[str, dict]:
+    """Generate and submit the sbatch script of every job of a tier.
+
+    Args:
+        tier (str): Name of the tier.
+        master_dict (dict): Master dictionary of the tier.
+        src_template_path (str): The source template file to replace with user values.
+        dest_template_path (str): The destination template file with the user values inserted.
+
+    Returns:
+        dict[str, dict]: Master dictionary (with its "job_id") by job name.
+    """
+    master_dicts = tier_parts(tier, master_dict)
+    for name, part_dict in master_dicts.items():
+        path = dest_template_path
+        if name != tier:
+            path = dest_template_path.replace(".sh", f"_{name.split('.')[-1]}.sh")
+
+        # Generate full template with all fields filled out from a source template
+        replace_text(part_dict, src_template_path, path)
 
-    # Execute sbatch
-    results = subprocess.run(["sbatch", dest_template_path], capture_output=True, text=True)
+        # Remove the previous logging first so a fast job's log is never deleted
+        remove_log(part_dict)
+        part_dict["job_id"] = register_job(submit_script(path), name, part_dict)
+
+    return master_dicts
+
+
+def submit_script(dest_template_path: str) -> subprocess.CompletedProcess:
+    """Submit a generated sbatch script to the scheduler.
+
+    Args:
+        dest_template_path (str): The generated template to submit.
+
+    Returns:
+        subprocess.CompletedProcess: Result of the sbatch command.
+    """
+    results = sbatch(dest_template_path)
     assert results.returncode == 0, f"Error Code: { results.returncode }, Info: {results}"
 
-    # Read the logs to determine whether the nodes have been successfully created.
-    # This may take a few mins depending on how many nodes the user has requested.
-    # Thus, a progress bar is provided along with an estimated wait time.
-    verify_nodes(master_dict)
+    return results
+
+
+def register_job(results: subprocess.CompletedProcess, tier: str, master_dict: dict) -> str:
+    """Record a submitted job in the job registry.
+
+    Args:
+        results (subprocess.CompletedProcess): Result of the sbatch command.
+        tier (str): Role of the job (head, cpu, gpu, hetjob).
+        master_dict (dict): Master dictionary the script was rendered from.
+
+    Returns:
+        str: SLURM job id.
+    """
+    job_id = parse_job_id(results.stdout)
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        registry.add(
+            job_id, master_dict["cluster_id"], tier, master_dict, get_log_path(master_dict)
+        )
+
+    return job_id
 
 
 def setup_node(config: dict, config_file_path: str):
@@ -317,8 +2040,10 @@ def setup_node(config: dict, config_file_path: str):
 def verify_config(config: dict):
     """Verify the Head/CPU/GPU configuration is valid.
 
+    The request is checked against the partition index built from :code:`sinfo` (nodes, cores, gres and walltime limit) so that a job that could never start is rejected before it is submitted.  A :code:`cpus_per_task` of 0 is set to all cores of a node, since every job is exclusive.
+
     Args:
-        config (dict): Config dictionary.
+        config (dict): Config dictionary, :code:`cpus_per_task` is updated in place.
     """
     key_names = [
         "job_name",
@@ -336,17 +2061,17 @@ def verify_config(config: dict):
     # Check that all required names are found
     assert all([name in config for name in key_names]), "Missing name in config!"
 
-    # Check that resource file exists (use to update the cpus for each partition)
-    if os.path.exists(Cfg.RESOURCES_FILE):
-        resources_dict = json_read(Cfg.RESOURCES_FILE)
+    # Check the request against the partition index (cached sinfo) before anything is submitted
+    index = load_index(Cfg.PARTITIONS_FILE, Cfg.PARTITIONS_TTL)
+    if config["partition"] == "auto":
+        place_tier(index, config)
+    if config["cpus_per_task"] == 0:
+        config["cpus_per_task"] = node_cpus(index, config) or 1
+        print(f":information: cpus_per_task set to {config['cpus_per_task']} (exclusive nodes)")
 
-        # Try reading the config if it exists
-        try:
-            config["cpus_per_task"] = resources_dict["cpus_per_task"][config["partition"]]
-            print(f":information: resources file detected: {Cfg.RESOURCES_FILE}")
-            print(f":information: updating cpus_per_task...")
-        except KeyError:
-            pass
+    for part in config.get("parts") or [{}]:
+        problems = check_request(index, config | part)
+        assert not problems, f"Infeasible request: {'; '.join(problems)}"
 
     # Check that container path is valid
     if config["hostenv"] == ConfigType.container:
@@ -360,6 +2085,47 @@ def verify_config(config: dict):
         assert check3, "Must specify .sif file path"
 
 
+def place_tier(index: dict[str, dict], config: dict):
+    """Choose the partition and node count of a worker tier with the earliest expected start (:code:`--partition auto`).
+
+    The target is :code:`cores` total cores (or :code:`nodes` nodes) on any of the :code:`candidates` partitions.  When several partitions together are expected to start the request sooner than any single one, the tier is split into one job per partition (:code:`parts`).  Every decision is appended to :code:`Cfg.PLACEMENT_LOG`.
+
+    Args:
+        index (dict[str, dict]): Partition index.
+        config (dict): CPU/GPU config dictionary, partition, nodes, cpus_per_task and parts are updated in place.
+    """
+    candidates = [name for name in config.get("candidates", "").split(",") if name]
+    decision = place(index, config, config.get("cores", 0), candidates)
+    log_decision(Cfg.PLACEMENT_LOG, decision)
+
+    parts = decision["parts"]
+    assert parts, f"No partition can run the request (candidates: {candidates or 'all'})"
+
+    for part in parts:
+        start = part["start"]
+        wait = "unknown" if start is None else f"{max(0, start - decision['time']):.0f} s"
+        print(f":information: {part['nodes']} nodes on {part['partition']}, expected wait {wait}")
+
+    config["nodes"] = sum([part["nodes"] for part in parts])
+    if len(parts) == 1:
+        config["partition"] = parts[0]["partition"]
+        if config["cpus_per_task"] == 0:
+            config["cpus_per_task"] = parts[0]["cpus"]
+        return
+
+    # One job per partition, each exclusive node uses all of its cores
+    config["parts"] = [
+        {
+            "partition": part["partition"],
+            "nodes": part["nodes"],
+            "cpus_per_task": config["cpus_per_task"] or part["cpus"],
+        }
+        for part in parts
+    ]
+    config["partition"] = "+".join([part["partition"] for part in parts])
+    config["cpus_per_task"] = min([part["cpus_per_task"] for part in config["parts"]])
+
+
 def get_run_info() -> dict:
     """Read the log file after starting the run.  Here we monitor the printout statements coming from the log file to get some key variables.
 
@@ -376,66 +2142,147 @@ def get_run_info() -> dict:
     if os.path.isfile(Cfg.CONFIG_HEAD):
         head_dict = json_read(Cfg.CONFIG_HEAD)
         head_log = head_dict["output"]
+        info = read_head_info(f"{Cfg.LOG_PATH}/{head_log}.log")
 
-        head_file = open(f"{Cfg.LOG_PATH}/{head_log}.log")
-        lines = head_file.readlines()
+    # Print to console
+    print_run_table(info)
 
-        # Strips the newline character
-        for line in lines:
-            check1 = "HEAD Node ID" in line
-            check2 = "HEAD Node IP" in line
-            check3 = "HEAD Node Address" in line
+    return info
 
-            # Populate info dict
-            key_val = re.split("=|\n", line)[-2].strip()  # format for ip address
 
-            if check1:
-                info["head_id"] = key_val
-            if check2:
-                info["head_ip"] = key_val
-            if check3:
-                info["head_addr"] = key_val
+def read_head_info(log_path: str) -> dict:
+    """Head id, IP and address printed in the log of the head.
 
-    # Print to console
-    print_run_table(info)
+    Args:
+        log_path (str): Path to the log of the head.
+
+    Returns:
+        dict: Head information (head_id, head_ip, head_addr) found in the log.
+    """
+    info = {}
+    if not exists(log_path):
+        return info
+
+    with open(log_path) as head_file:
+        lines = head_file.readlines()
+
+    # Strips the newline character
+    for line in lines:
+        check1 = "HEAD Node ID" in line
+        check2 = "HEAD Node IP" in line
+        check3 = "HEAD Node Address" in line
+
+        # Populate info dict
+        key_val = re.split("=|\n", line)[-2].strip()  # format for ip address
+
+        if check1:
+            info["head_id"] = key_val
+        if check2:
+            info["head_ip"] = key_val
+        if check3:
+            info["head_addr"] = key_val
 
     return info
 
 
-def verify_nodes(master_dict: dict):
+def verify_nodes(master_dict: dict, tier: str = ""):
     """Read the logs generated by the scheduler to verify that runtime executed successfully.
 
     Args:
         master_dict (dict): Master dictionary that holds both user defined variables and runtime variables.
+        tier (str, optional): Name of the tier shown in the progress bar. Defaults to "".
+
+    Raises:
+        JobFailedError: The job died, can never start or missed its deadline.
     """
-    # Get log path (remove the previous logging if it exists!)
-    log_path = f"{Cfg.LOG_PATH}/{master_dict['output']}.log"
-    if exists(log_path):
-        os.remove(log_path)
+    verify_tiers({tier: master_dict})
 
-    # Wait for log file to be created
-    while exists(log_path) is False:
-        time.sleep(0.25)
 
-    active_nodes = 0
-    requested_nodes = master_dict["nodes"]
-    requested_parition = master_dict["partition"]
+def verify_tiers(master_dicts: dict[str, dict]):
+    """Follow the logs of several tiers from a single loop until every tier has started all of its nodes.
+
+    While a tier is waiting, the scheduler state of its job is cross-checked (one batched squeue call for all tiers, at most every :code:`Cfg.MONITOR_INTERVAL` seconds), so a job that was cancelled, failed or can never start aborts the wait instead of hanging.  The pending reason and expected start time are shown in the progress bar.  A tier that has not started all of its nodes within its deadline (seconds, 0 for no deadline) aborts the wait as well.
+
+    Args:
+        master_dicts (dict[str, dict]): Master dictionary of each submitted tier (with its "job_id").
+
+    Raises:
+        JobFailedError: A job died, can never start or missed its deadline.
+    """
+    followers = {
+        tier: LogFollower(get_log_path(master_dict), RAY_RUNTIME_STARTED)
+        for tier, master_dict in master_dicts.items()
+    }
+    labels = {
+        tier: f"Registering {tier.upper()} Nodes..." if tier else "Registering Nodes..."
+        for tier in master_dicts
+    }
+    job_ids = {tier: master_dict["job_id"] for tier, master_dict in master_dicts.items()}
+    monitor = JobMonitor(job_ids.values(), interval=Cfg.MONITOR_INTERVAL)
+    start = timer.monotonic()
 
     with Progress() as progress:
-        task = progress.add_task("Registering Nodes...", total=requested_nodes)
+        tasks = {
+            tier: progress.add_task(labels[tier], total=master_dict["nodes"])
+            for tier, master_dict in master_dicts.items()
+        }
+
+        def all_started() -> bool:
+            started = True
+            for tier, follower in followers.items():
+                active_nodes = follower.count(RAY_RUNTIME_STARTED)
+                tier_started = active_nodes >= master_dicts[tier]["nodes"]
+
+                # Only ask the scheduler about the tiers still waiting on nodes
+                if not tier_started:
+                    monitor.check([job_ids[tier]])
+                    deadline = master_dicts[tier].get("deadline", 0)
+                    if deadline and timer.monotonic() - start > deadline:
+                        raise JobFailedError(
+                            f"Job {job_ids[tier]} did not start within {deadline} s "
+                            f"({monitor.describe(job_ids[tier])})"
+                        )
+
+                progress.update(
+                    tasks[tier],
+                    completed=active_nodes,
+                    description=f"{labels[tier]} {monitor.describe(job_ids[tier])}",
+                )
+                started &= tier_started
+            return started
+
+        # All logs live in the same directory, so a single watcher wakes up for every tier
+        wait_for(all_started, [follower.log_path for follower in followers.values()])
+
+    for tier, master_dict in master_dicts.items():
+        suffix = f" ({tier})" if tier else ""
+        console.print(
+            f":party_popper: Successfully started #{master_dict['nodes']} on {master_dict['partition']} partition{suffix}"
+        )
+        console.print(f"logs can be found at: {get_log_path(master_dict)}")
+
+
+def get_log_path(master_dict: dict) -> str:
+    """Path of the SLURM log written by a configuration.
 
-        while active_nodes < requested_nodes:
-            with open(log_path) as f:
-                content = f.read()
+    Args:
+        master_dict (dict): Master dictionary that holds both user defined variables and runtime variables.
 
-            active_nodes = content.count("Ray runtime started")
-            progress.update(task, completed=active_nodes)
-            time.sleep(0.25)
+    Returns:
+        str: Path to the log file.
+    """
+    return f"{Cfg.LOG_PATH}/{master_dict['output']}.log"
 
-    console.print(
-        f":party_popper: Successfully started #{requested_nodes} on {requested_parition} partition"
-    )
-    console.print(f"logs can be found at: {log_path}")
+
+def remove_log(master_dict: dict):
+    """Remove the SLURM log of a previous run of a configuration if it exists.
+
+    Args:
+        master_dict (dict): Master dictionary that holds both user defined variables and runtime variables.
+    """
+    log_path = get_log_path(master_dict)
+    if exists(log_path):
+        os.remove(log_path)
 
 
 def print_run_table(info: dict):
@@ -459,16 +2306,17 @@ def print_run_table(info: dict):
 def replace_text(replacements: dict, src: str, dest: str):
     """Replace text in a document with values specified in a dictionary.
 
+    The template is compiled once and cached, then rendered in a single pass.
+
     Args:
         replacements (dict): Replacement values to insert into document.
         src (str): Path of the original template.
         dest (str): Path of the destination copy template with replacements.
+
+    Raises:
+        KeyError: A placeholder of the template has no replacement value (nothing is written).
     """
-    with open(src) as infile, open(dest, "w") as outfile:
-        for line in infile:
-            for src, target in replacements.items():
-                line = line.replace("{" + src.upper() + "}", str(target))
-            outfile.write(line)
+    render_file(replacements, src, dest)
 
 
 def random_id(length: int = 3) -> str:
@@ -514,6 +2362,7 @@ def populate_row(
         "TmpDir": [],
         "Container Source": [],
         "Container Target": [],
+        "Deadline (s)": [],
     }
 
     # Iterate over all json files
@@ -0,0 +1,248 @@
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import time
+from collections.abc import Callable
+
+import typer
+from typing_extensions import Annotated
+
+CACHE_DIR_NAME = ".syndeo_cache"  # default cache directory, next to the container target
+CHUNK_SIZE = 8 << 20
+
+# Typer application CLI
+app = typer.Typer(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    rich_markup_mode="markdown",
+)
+
+
+def fingerprint(path: str) -> str:
+    """Fast fingerprint of a container image from its name, size and modification time.
+
+    Args:
+        path (str): Path to the image.
+
+    Returns:
+        str: Fingerprint used as the cache key.
+    """
+    stat = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return f"{name}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def file_hash(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """Full SHA-256 hash of a file.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int, optional): Bytes read per call. Defaults to 8 MiB.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_atomic(src: str, dest: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """Copy a file to a temporary file next to the destination and rename it into place, so a partially copied image is never visible at the destination.
+
+    Args:
+        src (str): Source path.
+        dest (str): Destination path.
+        chunk_size (int, optional): Bytes copied per call. Defaults to 8 MiB.
+
+    Returns:
+        str: SHA-256 hex digest of the copied bytes.
+    """
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+
+    try:
+        with open(src, "rb") as infile, os.fdopen(fd, "wb") as outfile:
+            while chunk := infile.read(chunk_size):
+                digest.update(chunk)
+                outfile.write(chunk)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return digest.hexdigest()
+
+
+def link_atomic(target: str, path: str):
+    """Point a path to a target with a symbolic link, replacing whatever was at the path in one step.
+
+    Args:
+        target (str): Path the link points to.
+        path (str): Path of the link.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    os.symlink(target, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def entries(cache_dir: str) -> list[str]:
+    """Cached images from the least to the most recently used.
+
+    Args:
+        cache_dir (str): Cache directory.
+
+    Returns:
+        list[str]: Paths to the cached images.
+    """
+    images = [
+        os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".sif")
+    ]
+    return sorted(images, key=lambda path: os.stat(path).st_mtime)
+
+
+def evict(
+    cache_dir: str, max_images: int, max_bytes: int | None = None, keep: str | None = None
+) -> list[str]:
+    """Remove the least recently used images until the cache fits its limits.
+
+    Args:
+        cache_dir (str): Cache directory.
+        max_images (int): Maximum number of images to keep.
+        max_bytes (int | None, optional): Maximum total size of the images, None for no limit. Defaults to None.
+        keep (str | None, optional): Image that must not be evicted (the one in use). Defaults to None.
+
+    Returns:
+        list[str]: Paths of the removed images.
+    """
+    images = entries(cache_dir)
+    total = sum([os.stat(image).st_size for image in images])
+    removed = []
+
+    for image in images:
+        over_count = len(images) - len(removed) > max_images
+        over_size = max_bytes is not None and total > max_bytes
+        if not (over_count or over_size):
+            break
+        if image == keep:
+            continue
+
+        total -= os.stat(image).st_size
+        os.remove(image)
+        if os.path.exists(metadata_path(image)):
+            os.remove(metadata_path(image))
+        removed.append(image)
+
+    return removed
+
+
+def metadata_path(image: str) -> str:
+    return os.path.splitext(image)[0] + ".json"
+
+
+def sync(
+    src: str,
+    target: str,
+    cache_dir: str | None = None,
+    max_images: int = 3,
+    max_bytes: int | None = None,
+    verify: bool = False,
+    copy: Callable[[str, str], str | None] | None = None,
+) -> dict:
+    """Make a container image available at a node-local path, copying it only if the node does not already cache the same image.
+
+    The image is stored in the cache under its fingerprint and the target path is a symbolic link to the cached image.  On a cache hit the copy is skipped; with :code:`verify` the full hash of the source is compared to the hash recorded when the image was cached, and the image is copied again on a mismatch.
+
+    Args:
+        src (str): Source image on the shared file system.
+        target (str): Node-local path to make the image available at.
+        cache_dir (str | None, optional): Node-local cache directory. Defaults to :code:`.syndeo_cache` next to the target.
+        max_images (int, optional): Maximum number of images kept in the cache. Defaults to 3.
+        max_bytes (int | None, optional): Maximum total size of the cache, None for no limit. Defaults to None.
+        verify (bool, optional): Compare full hashes instead of trusting size and modification time. Defaults to False.
+        copy (Callable[[str, str], str | None] | None, optional): Copies the source to a cache path atomically and returns the SHA-256 of the bytes (None if unknown).  Used by the fan-out strategies.  Defaults to :code:`copy_atomic()`.
+
+    Returns:
+        dict: Result of the sync (hit, key, path, bytes, seconds, evicted).
+    """
+    tic = time.perf_counter()
+    src = os.path.expanduser(src)
+    target = os.path.expanduser(target)
+    cache_dir = os.path.expanduser(
+        cache_dir or os.path.join(os.path.dirname(target), CACHE_DIR_NAME)
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+
+    key = fingerprint(src)
+    image = os.path.join(cache_dir, f"{key}.sif")
+
+    # Serialize the tasks sharing a node
+    with open(os.path.join(cache_dir, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        hit = os.path.exists(image) and os.path.exists(metadata_path(image))
+        if hit and verify:
+            with open(metadata_path(image)) as f:
+                sha256 = json.load(f)["sha256"] or file_hash(image)
+            hit = sha256 == file_hash(src)
+
+        if not hit:
+            sha256 = (copy or copy_atomic)(src, image)
+            with open(metadata_path(image), "w") as f:
+                json.dump({"source": src, "key": key, "sha256": sha256}, f)
+
+        os.utime(image)  # mark as most recently used
+        link_atomic(image, target)
+        evicted = evict(cache_dir, max_images, max_bytes, keep=image)
+
+    return {
+        "hit": hit,
+        "key": key,
+        "path": image,
+        "bytes": 0 if hit else os.stat(image).st_size,
+        "seconds": time.perf_counter() - tic,
+        "evicted": evicted,
+    }
+
+
+@app.command(name="sync", help="**Sync** a container image to a node-local cache.")
+def sync_command(
+    src: Annotated[str, typer.Argument(help="source image on the shared file system")],
+    target: Annotated[str, typer.Argument(help="node-local path of the image")],
+    cache_dir: Annotated[str, typer.Option(help="node-local cache directory")] = "",
+    max_images: Annotated[int, typer.Option(help="images to keep in the cache")] = 3,
+    max_gb: Annotated[float, typer.Option(help="maximum cache size in GB (0 for no limit)")] = 0,
+    verify: Annotated[bool, typer.Option(help="compare full hashes of the images")] = False,
+):
+    max_bytes = int(max_gb * 1e9) if max_gb > 0 else None
+    result = sync(src, target, cache_dir or None, max_images, max_bytes, verify)
+
+    status = "hit" if result["hit"] else "miss"
+    print(
+        f"{socket.gethostname()}: container cache {status} {result['key']} "
+        f"({result['bytes'] / 1e6:.1f} MB copied in {result['seconds']:.2f} s)"
+    )
+    for image in result["evicted"]:
+        print(f"{socket.gethostname()}: evicted {image}")
+
+
+@app.command(name="evict", help="**Evict** the least recently used images of a node-local cache.")
+def evict_command(
+    cache_dir: Annotated[str, typer.Argument(help="node-local cache directory")],
+    max_images: Annotated[int, typer.Option(help="images to keep in the cache")] = 0,
+):
+    for image in evict(os.path.expanduser(cache_dir), max_images):
+        print(f"{socket.gethostname()}: evicted {image}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,420 @@
+import hashlib
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from typing_extensions import Annotated
+
+from src.container.cache import CHUNK_SIZE
+from src.container.cache import copy_atomic
+from src.container.cache import sync
+from src.rendezvous import client
+
+# Typer application CLI
+console = Console()
+app = typer.Typer(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    rich_markup_mode="markdown",
+)
+
+REPORT_PREFIX = "FANOUT"  # marks the per-node report lines in the launch log
+
+
+class Strategy(str, Enum):
+    """How a container image reaches the nodes."""
+
+    copy = "copy"  # every node reads the shared file system
+    chunked = "chunked"  # every node reads the shared file system with parallel chunked reads
+    tree = "tree"  # one node reads the shared file system, nodes that have the image serve it
+    sbcast = "sbcast"  # SLURM broadcasts the image to a staging path on every node
+
+    def __str__(self):
+        return str(self.value)
+
+
+def tree_parent(rank: int) -> int | None:
+    """Parent of a node in a binomial broadcast tree (the rank without its highest bit).
+
+    Args:
+        rank (int): Rank of the node.
+
+    Returns:
+        int | None: Rank of the parent, None for the root.
+    """
+    if rank == 0:
+        return None
+    return rank - (1 << (rank.bit_length() - 1))
+
+
+def tree_children(rank: int, size: int) -> list[int]:
+    """Children of a node in a binomial broadcast tree.
+
+    The number of nodes holding the image doubles every round, so :code:`size` nodes are served in :code:`log2(size)` rounds while the shared file system is read once.
+
+    Args:
+        rank (int): Rank of the node.
+        size (int): Number of nodes.
+
+    Returns:
+        list[int]: Ranks of the children.
+    """
+    children = []
+    step = 1 << rank.bit_length()
+    while rank + step < size:
+        children.append(rank + step)
+        step <<= 1
+    return children
+
+
+def chunked_copy(src: str, dest: str, workers: int = 4, chunk_size: int = 64 << 20) -> None:
+    """Copy a file with parallel positional reads (benefits striped parallel file systems), written to a temporary file and renamed into place.
+
+    Args:
+        src (str): Source path.
+        dest (str): Destination path.
+        workers (int, optional): Number of concurrent reads. Defaults to 4.
+        chunk_size (int, optional): Bytes per read. Defaults to 64 MiB.
+
+    Returns:
+        None: The hash is not computed, chunks complete out of order.
+    """
+    size = os.stat(src).st_size
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+    src_fd = os.open(src, os.O_RDONLY)
+
+    def copy_chunk(offset: int):
+        data = os.pread(src_fd, min(chunk_size, size - offset), offset)
+        os.pwrite(fd, data, offset)
+
+    try:
+        try:
+            os.ftruncate(fd, size)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(copy_chunk, range(0, size, chunk_size)))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+            os.close(src_fd)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def download(url: str, dest: str, timeout: float = 60) -> str:
+    """Download a file to a temporary file and rename it into place.
+
+    Args:
+        url (str): URL of the file.
+        dest (str): Destination path.
+        timeout (float, optional): Socket timeout in seconds. Defaults to 60.
+
+    Returns:
+        str: SHA-256 hex digest of the downloaded bytes.
+    """
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as reply, os.fdopen(fd, "wb") as f:
+            while chunk := reply.read(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return digest.hexdigest()
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """Streams the served file and counts the completed transfers."""
+
+    server: "FileHTTPServer"
+
+    def do_GET(self):
+        size = os.stat(self.server.path).st_size
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+
+        with open(self.server.path, "rb") as f:
+            self.wfile.flush()
+            self.request.sendfile(f)
+
+        with self.server.condition:
+            self.server.served += 1
+            self.server.condition.notify_all()
+
+    def log_message(self, format, *args):
+        pass  # keep the launch log clean
+
+
+class FileHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    path: str
+    served: int
+    condition: threading.Condition
+
+
+class FileServer:
+    """Serve one file to the children of a node in the broadcast tree."""
+
+    def __init__(self, path: str, host: str = "0.0.0.0", port: int = 0):
+        """Initialize the server.
+
+        Args:
+            path (str): File to serve.
+            host (str, optional): Interface to bind to. Defaults to "0.0.0.0".
+            port (int, optional): Port to bind to, 0 picks a free port. Defaults to 0.
+        """
+        self.httpd = FileHTTPServer((host, port), FileHandler)
+        self.httpd.path = path
+        self.httpd.served = 0
+        self.httpd.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, host: str | None = None) -> str:
+        return f"http://{host or socket.getfqdn()}:{self.httpd.server_address[1]}/image"
+
+    def wait(self, count: int, timeout: float | None = None) -> bool:
+        """Block until a number of transfers completed.
+
+        Args:
+            count (int): Number of transfers.
+            timeout (float | None, optional): Maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if every transfer completed.
+        """
+        with self.httpd.condition:
+            return self.httpd.condition.wait_for(lambda: self.httpd.served >= count, timeout)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+
+def tree_key(job: str, rank: int) -> str:
+    return f"fanout_{job}_{rank}"
+
+
+def distribute(
+    strategy: Strategy,
+    src: str,
+    target: str,
+    rank: int = 0,
+    size: int = 1,
+    rendezvous: str | None = None,
+    job: str = "0",
+    workers: int = 4,
+    timeout: float = 600,
+    host: str | None = None,
+    **cache_options,
+) -> dict:
+    """Bring a container image into the node-local cache with a fan-out strategy.
+
+    Nodes that already cache the image skip the transfer.  In a :code:`tree` the node still serves its cached image to its children, so the shared file system is read once for the whole allocation.  If the parent of a node does not publish its address in time, the node falls back to the shared file system.
+
+    Args:
+        strategy (Strategy): Fan-out strategy.
+        src (str): Source image on the shared file system.
+        target (str): Node-local path of the image.
+        rank (int, optional): Rank of this node (SLURM_PROCID). Defaults to 0.
+        size (int, optional): Number of nodes (SLURM_NTASKS). Defaults to 1.
+        rendezvous (str | None, optional): Rendezvous used to exchange the tree addresses. Defaults to None.
+        job (str, optional): Identifier of the launch step, keeps the tree addresses of different steps apart. Defaults to "0".
+        workers (int, optional): Concurrent reads of the chunked strategy. Defaults to 4.
+        timeout (float, optional): Time to wait for the parent or the children in seconds. Defaults to 600.
+        host (str | None, optional): Host name advertised to the children. Defaults to the fully qualified name.
+        **cache_options: Options passed to :code:`src.container.cache.sync()`.
+
+    Returns:
+        dict: Result of the sync, with the source of the bytes (shared, parent, staged or cache).
+    """
+    origin = "shared"
+
+    def from_parent(src: str, dest: str) -> str:
+        nonlocal origin
+        parent = tree_parent(rank)
+        if parent is not None and rendezvous:
+            try:
+                url = client.get(rendezvous, tree_key(job, parent), timeout=timeout).strip()
+                origin = f"rank {parent}"
+                return download(url, dest)
+            except (TimeoutError, urllib.error.URLError, OSError):
+                origin = "shared"  # parent failed, read the source
+        return copy_atomic(src, dest)
+
+    def from_stage(src: str, dest: str) -> str | None:
+        nonlocal origin
+        if not os.path.exists(staging_path(target)):
+            return copy_atomic(src, dest)  # broadcast did not reach this node
+        origin = "staged"
+        shutil.move(staging_path(target), dest)
+        return None
+
+    copy = {
+        Strategy.copy: copy_atomic,
+        Strategy.chunked: lambda s, d: chunked_copy(s, d, workers=workers),
+        Strategy.tree: from_parent,
+        Strategy.sbcast: from_stage,
+    }[strategy]
+
+    result = sync(src, target, copy=copy, **cache_options)
+    result["origin"] = "cache" if result["hit"] else origin
+
+    # Remove an unused broadcast copy
+    if strategy == Strategy.sbcast and os.path.exists(staging_path(target)):
+        os.remove(staging_path(target))
+
+    # Serve the image to the children of this node
+    children = tree_children(rank, size)
+    if strategy == Strategy.tree and children and rendezvous:
+        with FileServer(result["path"]) as server:
+            client.put(rendezvous, tree_key(job, rank), server.url(host))
+            server.wait(len(children), timeout=timeout)
+
+    return result
+
+
+def staging_path(target: str) -> str:
+    """Node-local path the image is broadcast to by :code:`sbcast`.
+
+    Args:
+        target (str): Node-local path of the image.
+
+    Returns:
+        str: Staging path.
+    """
+    return f"{target}.sbcast"
+
+
+def report_line(result: dict, rank: int, strategy: Strategy) -> str:
+    """One line of the per-node report.
+
+    Args:
+        result (dict): Result of :code:`distribute()`.
+        rank (int): Rank of the node.
+        strategy (Strategy): Fan-out strategy.
+
+    Returns:
+        str: Report line.
+    """
+    return (
+        f"{REPORT_PREFIX} host={socket.gethostname()} rank={rank} strategy={strategy} "
+        f"origin={result['origin'].replace(' ', '_')} bytes={result['bytes']} "
+        f"seconds={result['seconds']:.3f}"
+    )
+
+
+def parse_report(log_path: str) -> list[dict]:
+    """Read the per-node report lines of a log.
+
+    Args:
+        log_path (str): Path to the log.
+
+    Returns:
+        list[dict]: One entry per node.
+    """
+    nodes = []
+    with open(log_path) as f:
+        for line in f:
+            if line.startswith(REPORT_PREFIX + " "):
+                fields = dict([field.split("=", 1) for field in line.split()[1:]])
+                fields["bytes"] = int(fields["bytes"])
+                fields["seconds"] = float(fields["seconds"])
+                nodes.append(fields)
+    return nodes
+
+
+@app.command(name="sync", help="**Distribute** a container image to this node.")
+def sync_command(
+    src: Annotated[str, typer.Argument(help="source image on the shared file system")],
+    target: Annotated[str, typer.Argument(help="node-local path of the image")],
+    strategy: Annotated[Strategy, typer.Option(help="copy|chunked|tree|sbcast")] = Strategy.copy,
+    rendezvous: Annotated[str, typer.Option(help="rendezvous for the tree addresses")] = "",
+    cache_dir: Annotated[str, typer.Option(help="node-local cache directory")] = "",
+    max_images: Annotated[int, typer.Option(help="images to keep in the cache")] = 3,
+    workers: Annotated[int, typer.Option(help="concurrent reads (chunked)")] = 4,
+    timeout: Annotated[float, typer.Option(help="timeout of the tree in seconds")] = 600,
+):
+    rank = int(os.getenv("SLURM_PROCID", "0"))
+    size = int(os.getenv("SLURM_NTASKS", "1"))
+    job = f"{os.getenv('SLURM_JOB_ID', '0')}_{os.getenv('SLURM_STEP_ID', '0')}"
+
+    result = distribute(
+        strategy,
+        src,
+        target,
+        rank=rank,
+        size=size,
+        rendezvous=rendezvous or None,
+        job=job,
+        workers=workers,
+        timeout=timeout,
+        cache_dir=cache_dir or None,
+        max_images=max_images,
+    )
+    print(report_line(result, rank, strategy), flush=True)
+
+
+@app.command(help="**Summarize** the per-node copy times of a launch log.")
+def summary(
+    log_path: Annotated[str, typer.Argument(help="log holding the FANOUT lines")],
+    wall_ms: Annotated[int, typer.Option(help="wall time of the distribution step in ms")] = 0,
+):
+    nodes = parse_report(log_path)
+    if not nodes:
+        console.print("No container distribution reported.")
+        return
+
+    table = Table(title="Container Distribution")
+    for column in ["Host", "Rank", "Origin", "MB", "Seconds", "MB/s"]:
+        table.add_column(column, justify="right")
+
+    for node in sorted(nodes, key=lambda node: int(node["rank"])):
+        mb = node["bytes"] / 1e6
+        rate = mb / node["seconds"] if node["seconds"] > 0 else 0
+        table.add_row(
+            node["host"],
+            node["rank"],
+            node["origin"],
+            f"{mb:.1f}",
+            f"{node['seconds']:.2f}",
+            f"{rate:.1f}",
+        )
+    console.print(table)
+
+    total_mb = sum([node["bytes"] for node in nodes]) / 1e6
+    wall = wall_ms / 1000 or max([node["seconds"] for node in nodes])
+    console.print(
+        f"{len(nodes)} nodes, {total_mb:.1f} MB in {wall:.2f} s "
+        f"(aggregate {total_mb / wall if wall > 0 else 0:.1f} MB/s)"
+    )
+
+
+if __name__ == "__main__":
+    app()
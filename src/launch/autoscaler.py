@@ -0,0 +1,99 @@
+from src.launch.hetjob import gpus_per_node
+
+# Node provider loaded by the Ray autoscaler running on the head ("external" provider)
+PROVIDER_MODULE = "src.launch.provider.SlurmNodeProvider"
+
+# Type of the head node, it is started by Syndeo and never launched by the autoscaler
+HEAD_NODE_TYPE = "head"
+
+
+def node_resources(config: dict) -> dict[str, int]:
+    """Ray resources of one worker node of a tier.
+
+    Args:
+        config (dict): CPU/GPU configuration (cpus_per_task, gres).
+
+    Returns:
+        dict[str, int]: Resources advertised to the autoscaler (CPU, GPU).
+    """
+    resources = {"CPU": int(config["cpus_per_task"])}
+    gpus = gpus_per_node(config["gres"])
+    if gpus > 0:
+        resources["GPU"] = gpus
+    return resources
+
+
+def node_values(master_dict: dict) -> dict:
+    """Values a worker job launched by the autoscaler is rendered from: one node, on the first partition of a tier split across partitions.
+
+    Args:
+        master_dict (dict): Master dictionary of the tier (configuration and runtime values).
+
+    Returns:
+        dict: Template values.
+    """
+    values = dict(master_dict)
+    values |= (values.pop("parts", None) or [{}])[0]
+    values["nodes"] = 1
+    return values
+
+
+def cluster_config(
+    cluster_id: str,
+    tiers: dict[str, dict],
+    idle_timeout: float,
+    provider: dict,
+) -> dict:
+    """Ray autoscaler configuration of a cluster whose worker nodes are SLURM jobs.
+
+    Every worker tier is a node type with its own bounds, each node is a one-node job rendered from the tier template by :code:`SlurmNodeProvider`.  Node updaters are disabled since the jobs start Ray themselves.
+
+    Args:
+        cluster_id (str): Identifier of the cluster.
+        tiers (dict[str, dict]): Node type by tier name (template, values, min_workers, max_workers).
+        idle_timeout (float): Seconds a worker node stays idle before it is released.
+        provider (dict): Options of the node provider (workdir, state_path, registry, use_node_id_as_ip).
+
+    Returns:
+        dict: Autoscaler configuration (also valid as YAML).
+    """
+    node_types = {
+        HEAD_NODE_TYPE: {"resources": {"CPU": 0}, "node_config": {}, "max_workers": 0},
+    }
+    for tier, node_type in tiers.items():
+        values = node_values(node_type["values"])
+        node_types[tier] = {
+            "min_workers": node_type["min_workers"],
+            "max_workers": node_type["max_workers"],
+            "resources": node_resources(values),
+            "node_config": {"tier": tier, "template": node_type["template"], "values": values},
+        }
+
+    return {
+        "cluster_name": cluster_id,
+        "max_workers": sum([node_type["max_workers"] for node_type in tiers.values()]),
+        "upscaling_speed": 1.0,
+        "idle_timeout_minutes": idle_timeout / 60,
+        "provider": {
+            "type": "external",
+            "module": PROVIDER_MODULE,
+            "cluster_id": cluster_id,
+            "disable_node_updaters": True,
+            "disable_launch_config_check": True,
+        }
+        | provider,
+        "auth": {"ssh_user": "syndeo"},
+        "available_node_types": node_types,
+        "head_node_type": HEAD_NODE_TYPE,
+        "file_mounts": {},
+        "cluster_synced_files": [],
+        "file_mounts_sync_continuously": False,
+        "rsync_exclude": [],
+        "rsync_filter": [],
+        "initialization_commands": [],
+        "setup_commands": [],
+        "head_setup_commands": [],
+        "worker_setup_commands": [],
+        "head_start_ray_commands": [],
+        "worker_start_ray_commands": [],
+    }
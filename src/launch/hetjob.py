@@ -0,0 +1,116 @@
+from collections.abc import Sequence
+
+SETUP_HEAD = "src/scripts/setup_ray_head.sh"
+SETUP_WORKERS = "src/scripts/setup_ray_workers.sh"
+
+
+def gpus_per_node(gres: str) -> int:
+    """Number of GPUs per node requested by a gres string.
+
+    Args:
+        gres (str): SLURM gres request (i.e. gpu:volta:2) or n/a.
+
+    Returns:
+        int: Number of GPUs, 0 if no GPUs are requested.
+    """
+    count = str(gres).split(":")[-1]
+    return int(count) if count.isdigit() else 0
+
+
+def component_header(config: dict) -> list[str]:
+    """The #SBATCH directives of one heterogeneous job component.
+
+    Args:
+        config (dict): Head/CPU/GPU configuration of the component.
+
+    Returns:
+        list[str]: #SBATCH lines.
+    """
+    lines = [
+        "#SBATCH --exclusive",
+        f"#SBATCH --cpus-per-task={config['cpus_per_task']}",
+        f"#SBATCH --nodes={config['nodes']}",
+        f"#SBATCH --ntasks={config['nodes']}",
+        "#SBATCH --ntasks-per-node=1",
+        f"#SBATCH --time {config['time']}",
+        f"#SBATCH --partition={config['partition']}",
+    ]
+    if gpus_per_node(config["gres"]) > 0:
+        lines.append(f"#SBATCH --gres={config['gres']}")
+
+    return lines
+
+
+def setup_command(script: str, config: dict, arguments: list[str]) -> list[str]:
+    """The lines that source a setup script for one component.
+
+    Args:
+        script (str): Setup script to source.
+        config (dict): Head/CPU/GPU configuration of the component.
+        arguments (list[str]): Arguments passed to the setup script before the container arguments.
+
+    Returns:
+        list[str]: Shell lines.
+    """
+    lines = []
+    arguments = [f"--tmpdir={config['tmpdir']}"] + arguments
+
+    if config["hostenv"] == "container":
+        lines.append(f"export SINGULARITY_TMPDIR={config['tmpdir']}")
+        arguments += [
+            f"--container_src={config['container_src_path']}",
+            f"--container_tgt={config['container_tgt_path']}",
+            f"--container_cache={config.get('container_cache', '')}",
+            f"--container_cache_images={config.get('container_cache_images', 3)}",
+            f"--container_fanout={config.get('container_fanout', 'copy')}",
+        ]
+
+    lines.append(f"source {script} \\")
+    lines += [f"    {argument} \\" for argument in arguments[:-1]]
+    lines.append(f"    {arguments[-1]}")
+
+    return lines
+
+
+def hetjob_values(head: dict, workers: Sequence[tuple[str, dict]]) -> dict:
+    """Values that fill the heterogeneous job template.
+
+    Args:
+        head (dict): Head configuration (component 0).
+        workers (Sequence[tuple[str, dict]]): Name and configuration of each worker tier (components 1..N).
+
+    Returns:
+        dict: Replacement values for :code:`src/templates/template_hetjob.sh`.
+    """
+    components = component_header(head)
+    setup = ["# Ray head (component 0)"]
+    head_arguments = ["--het_group=0"]
+    if head.get("autoscaling_config"):
+        head_arguments.append(f"--autoscaling_config={head['autoscaling_config']}")
+    setup += setup_command(SETUP_HEAD, head, head_arguments)
+
+    for group, (tier, config) in enumerate(workers, start=1):
+        components.append("#SBATCH hetjob")
+        components += component_header(config)
+
+        setup.append("")
+        setup.append(f"# Ray workers - {tier.upper()} (component {group})")
+        setup += setup_command(
+            SETUP_WORKERS,
+            config,
+            [
+                f"--het_group={group}",
+                "--address=$HEAD_NODE_ADDR",
+                f"--gpus={gpus_per_node(config['gres'])}",
+                "--index=0",
+            ],
+        )
+
+    return {
+        "job_name": head["job_name"],
+        "output": head["output"],
+        "nodes": head["nodes"] + sum([config["nodes"] for _, config in workers]),
+        "partition": ",".join([head["partition"]] + [c["partition"] for _, c in workers]),
+        "hetjob_components": "\n".join(components),
+        "hetjob_setup": "\n".join(setup),
+    }
@@ -0,0 +1,702 @@
+import datetime
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from src.launch.partitions import parse_time
+
+# Commands replaced by the local backend (the scheduler, and Ray for the sockets of its nodes), each shim runs this module
+COMMANDS = ["ray", "sacct", "sbatch", "scancel", "scontrol", "sinfo", "squeue", "srun"]
+
+# Directory of the local scheduler state, exported to the jobs so their srun calls find it
+LOCAL_DIR_ENV = "SYNDEO_LOCAL_DIR"
+
+ACTIVE_STATES = frozenset(["PENDING", "RUNNING"])
+
+# Seconds between SIGTERM and SIGKILL of a cancelled or expired job (SLURM KillWait)
+KILL_WAIT = 2.0
+
+# Seconds between two checks of the supervisor of a job
+POLL_INTERVAL = 0.1
+
+SHIM = """#!/bin/sh
+export PYTHONPATH="{root}${{PYTHONPATH:+:$PYTHONPATH}}"
+exec {python} -m src.launch.local {command} "$@"
+"""
+
+
+def activate(local_dir: str, nodes: int) -> str:
+    """Use the local backend in this process and in everything it starts.
+
+    The shims of the commands are installed in :code:`<local_dir>/bin` and put first on the :code:`PATH`, so the gateway, the job scripts and the autoscaler of the head all reach the local scheduler instead of SLURM.
+
+    Args:
+        local_dir (str): Directory of the local scheduler state.
+        nodes (int): Number of simulated nodes.
+
+    Returns:
+        str: Directory of the shims.
+    """
+    local_dir = os.path.abspath(local_dir)
+    scheduler = LocalScheduler(local_dir)
+    scheduler.resize(nodes)
+
+    bin_dir = os.path.join(local_dir, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for command in COMMANDS:
+        path = os.path.join(bin_dir, command)
+        with open(path, "w") as fp:
+            fp.write(SHIM.format(root=root, python=sys.executable, command=command))
+        os.chmod(path, 0o755)
+
+    os.environ[LOCAL_DIR_ENV] = local_dir
+    if os.environ.get("PATH", "").split(os.pathsep)[0] != bin_dir:
+        os.environ["PATH"] = os.pathsep.join([bin_dir, os.environ.get("PATH", "")])
+    return bin_dir
+
+
+def expand_hostlist(text: str) -> list[str]:
+    """Host names of a SLURM host list (i.e. local[0-2,5],other).
+
+    Args:
+        text (str): Host list.
+
+    Returns:
+        list[str]: Host names in order.
+    """
+    hosts = []
+    for prefix, ranges, suffix in re.findall(r"([^,\[]*)(?:\[([^\]]*)\])?([^,\[]*),?", text):
+        if not ranges:
+            if prefix + suffix:
+                hosts.append(prefix + suffix)
+            continue
+        for item in ranges.split(","):
+            first, _, last = item.partition("-")
+            for index in range(int(first), int(last or first) + 1):
+                hosts.append(f"{prefix}{index:0{len(first)}d}{suffix}")
+    return hosts
+
+
+def batch_options(content: str) -> list[dict[str, str]]:
+    """#SBATCH options of every component of a batch script (one unless the job is heterogeneous).
+
+    Args:
+        content (str): Batch script.
+
+    Returns:
+        list[dict[str, str]]: Options by name (without dashes), flags map to an empty string.
+    """
+    components: list[dict[str, str]] = [{}]
+    for line in content.splitlines()[1:]:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            break  # SLURM stops reading directives at the first command
+        if line == "#SBATCH hetjob":
+            components.append({})
+        elif line.startswith("#SBATCH --"):
+            name, _, value = line[len("#SBATCH --") :].replace("=", " ", 1).partition(" ")
+            components[-1][name] = value.strip()
+    return components
+
+
+def command_options(args: list[str], valued: dict[str, str]) -> tuple[dict[str, str], list[str]]:
+    """Options of a command line up to its first operand.
+
+    Args:
+        args (list[str]): Arguments of the command.
+        valued (dict[str, str]): Long name of the short options that take a value (i.e. w -> nodelist).
+
+    Returns:
+        tuple[dict[str, str], list[str]]: Options by long name (flags map to an empty string), then the operands.
+    """
+    options: dict[str, str] = {}
+    index = 0
+    while index < len(args) and args[index].startswith("-"):
+        arg = args[index]
+        if arg.startswith("--"):
+            name, _, value = arg[2:].partition("=")
+            options[name] = value
+        elif arg[1:2] in valued:
+            value = arg[2:] or (args[index + 1] if index + 1 < len(args) else "")
+            index += 0 if arg[2:] else 1
+            options[valued[arg[1:2]]] = value
+        index += 1
+    return options, args[index:]
+
+
+def exported(export: str, env: dict[str, str]) -> dict[str, str]:
+    """Environment of a job or step for an :code:`--export` option (ALL, NONE, with name=value pairs).
+
+    Args:
+        export (str): Value of --export, empty for ALL.
+        env (dict[str, str]): Environment of the caller.
+
+    Returns:
+        dict[str, str]: Environment.
+    """
+    items = [item for item in export.split(",") if item] or ["ALL"]
+    result = dict(env) if items[0] != "NONE" else {"PATH": env.get("PATH", "")}
+    for item in items:
+        if "=" in item:
+            name, value = item.split("=", 1)
+            result[name] = value
+    return result
+
+
+def timestamp(epoch: float | None) -> str:
+    """Time formatted as squeue does, N/A if unknown."""
+    if epoch is None:
+        return "N/A"
+    return datetime.datetime.fromtimestamp(epoch).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def signal_groups(pgids: list[int], signum: int):
+    """Send a signal to process groups, ignoring the ones that already exited."""
+    for pgid in pgids:
+        try:
+            os.killpg(pgid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+class LocalScheduler:
+    """A scheduler running batch jobs as local processes on a pool of simulated nodes.
+
+    Every job, its allocated nodes and its job steps are kept as JSON files in one directory, shared by the shims of the scheduler commands and guarded by a file lock.  Each job is run by a supervisor process: it waits until enough simulated nodes are free (FIFO), runs the batch script with the SLURM environment of the allocation, enforces the time limit (and the :code:`--signal` notice) and records the final state.  Every simulated node has its own directory, the node-local :code:`TMPDIR` of the steps that run on it.
+    """
+
+    def __init__(self, local_dir: str):
+        """Initialize the scheduler.
+
+        Args:
+            local_dir (str): Directory of the scheduler state.
+        """
+        self.local_dir = local_dir
+        self.jobs_dir = os.path.join(local_dir, "jobs")
+        self.nodes_path = os.path.join(local_dir, "nodes.json")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the lock of the scheduler state."""
+        with open(os.path.join(self.local_dir, "lock"), "w") as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            yield
+
+    def nodes(self) -> dict[str, str]:
+        """Job id holding each simulated node, empty for idle nodes."""
+        if not os.path.exists(self.nodes_path):
+            return {}
+        with open(self.nodes_path) as fp:
+            return json.load(fp)
+
+    def resize(self, count: int):
+        """Add or remove idle simulated nodes so the pool has :code:`count` nodes (busy nodes are kept).
+
+        Args:
+            count (int): Number of simulated nodes.
+        """
+        with self.lock():
+            nodes = self.nodes()
+            for index in range(count):
+                nodes.setdefault(f"local{index}", "")
+            for name in list(nodes)[count:]:
+                if not nodes[name]:
+                    nodes.pop(name)
+            self._write(self.nodes_path, nodes)
+
+    def node_dir(self, node: str, path: str = "") -> str:
+        """Node-local directory of a simulated node.
+
+        Args:
+            node (str): Node name.
+            path (str, optional): Absolute path on the node. Defaults to "" (the node root).
+
+        Returns:
+            str: Directory standing for the path on this node.
+        """
+        return os.path.join(self.local_dir, "nodes", node, path.lstrip("/"))
+
+    def job(self, job_id: str) -> dict | None:
+        """Record of a job, None if unknown."""
+        path = os.path.join(self.jobs_dir, f"{job_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as fp:
+            return json.load(fp)
+
+    def all_jobs(self) -> list[dict]:
+        """Records of every job, in submission order."""
+        jobs = [self.job(name[: -len(".json")]) for name in os.listdir(self.jobs_dir)]
+        return sorted([job for job in jobs if job], key=lambda job: (job["submitted"], job["id"]))
+
+    def save(self, job: dict):
+        """Write the record of a job."""
+        self._write(os.path.join(self.jobs_dir, f"{job['id']}.json"), job)
+
+    def select(self, job_ids: list[str]) -> list[dict]:
+        """Records of jobs by id, a job array id selects all of its tasks."""
+        return [
+            job for job in self.all_jobs() if job["id"] in job_ids or job["array_id"] in job_ids
+        ]
+
+    def submit(self, args: list[str], env: dict[str, str]) -> str:
+        """Queue a batch script and start the supervisors of its jobs.
+
+        Args:
+            args (list[str]): Arguments of sbatch, the script last.
+            env (dict[str, str]): Environment of the caller.
+
+        Returns:
+            str: Job id.
+        """
+        options, operands = command_options(args, {"J": "job-name", "o": "output"})
+        with open(operands[0]) as fp:
+            content = fp.read()
+        components = batch_options(content)
+        components[0] |= options  # the command line overrides the directives
+        first = components[0]
+
+        with self.lock():
+            counter = os.path.join(self.local_dir, "job_id")
+            job_id = int(open(counter).read()) + 1 if os.path.exists(counter) else 1000
+            self._write(counter, job_id)
+
+        script = os.path.join(self.jobs_dir, f"{job_id}.sh")
+        with open(script, "w") as fp:
+            fp.write(content)
+
+        tasks = [None]
+        if first.get("array"):
+            tasks = []
+            for item in first["array"].split("%")[0].split(","):
+                start, _, stop = item.partition("-")
+                tasks += list(range(int(start), int(stop or start) + 1))
+
+        signal_notice = re.match(r"(?:B:)?(\w+)@(\d+)", first.get("signal", ""))
+        now = time.time()
+        for task in tasks:
+            job = {
+                "id": str(job_id) if task is None else f"{job_id}_{task}",
+                "array_id": str(job_id),
+                "task": task,
+                "name": first.get("job-name", os.path.basename(operands[0])),
+                "partition": first.get("partition", "local"),
+                "cwd": os.path.abspath(first.get("chdir") or os.getcwd()),
+                "output": first.get("output", "slurm-%j.out"),
+                "script": script,
+                "env": exported(first.get("export", ""), env),
+                "limit": parse_time(first["time"]) if first.get("time") else None,
+                "notice": list(signal_notice.groups()) if signal_notice else None,
+                "components": [
+                    {
+                        "nodes": int(component.get("nodes", "1").split("-")[0]),
+                        "ntasks": int(component.get("ntasks", component.get("nodes", "1"))),
+                        "cpus": int(component.get("cpus-per-task", "1")),
+                    }
+                    for component in components
+                ],
+                "nodelist": [],
+                "state": "PENDING",
+                "reason": "Priority",
+                "submitted": now,
+                "start": None,
+                "end": None,
+                "pid": None,
+                "steps": [],
+                "exit_code": None,
+            }
+            with self.lock():
+                self.save(job)
+            subprocess.Popen(
+                [sys.executable, "-m", "src.launch.local", "supervise", job["id"]],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+
+        return str(job_id)
+
+    def supervise(self, job_id: str):
+        """Run a job from its allocation to its final state (the supervisor process of the job).
+
+        Args:
+            job_id (str): Job id.
+        """
+        while not self._allocate(job_id):
+            time.sleep(POLL_INTERVAL)
+
+        job = self.job(job_id)
+        if job["state"] != "RUNNING":
+            return
+
+        output = job["output"].replace("%j", job["array_id"] if job["task"] is None else job["id"])
+        output = output.replace("%A", job["array_id"]).replace("%a", str(job["task"]))
+        output = output.replace("%x", job["name"])
+        with open(os.path.join(job["cwd"], output), "w") as log:
+            process = subprocess.Popen(
+                ["bash", job["script"]],
+                cwd=job["cwd"],
+                env=self._environment(job),
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        with self.lock():
+            job = self.job(job_id)
+            job["pid"] = process.pid
+            self.save(job)
+
+        notified, terminated = False, None
+        while process.poll() is None:
+            time.sleep(POLL_INTERVAL)
+            job = self.job(job_id)
+            elapsed = time.time() - job["start"]
+
+            # SIGTERM to the job steps ahead of the time limit (--signal)
+            if job["notice"] and job["limit"] and not notified:
+                if elapsed >= job["limit"] - int(job["notice"][1]):
+                    signal_groups(job["steps"], getattr(signal, f"SIG{job['notice'][0]}"))
+                    notified = True
+
+            if job["state"] == "RUNNING" and job["limit"] and elapsed >= job["limit"]:
+                with self.lock():
+                    job = self.job(job_id)
+                    job["state"], job["reason"] = "TIMEOUT", "TimeLimit"
+                    self.save(job)
+
+            # Cancelled or expired: SIGTERM, then SIGKILL after the kill wait
+            if job["state"] != "RUNNING":
+                if terminated is None:
+                    terminated = time.monotonic()
+                    signal_groups([process.pid] + job["steps"], signal.SIGTERM)
+                elif time.monotonic() - terminated >= KILL_WAIT:
+                    signal_groups([process.pid] + job["steps"], signal.SIGKILL)
+
+        with self.lock():
+            job = self.job(job_id)
+            if job["state"] == "RUNNING":
+                job["state"] = "COMPLETED" if process.returncode == 0 else "FAILED"
+            job["exit_code"] = process.returncode
+            job["end"] = time.time()
+            signal_groups(job["steps"], signal.SIGKILL)  # steps left behind by the script
+            job["steps"] = []
+
+            nodes = self.nodes()
+            for node in [node for group in job["nodelist"] for node in group]:
+                nodes[node] = ""
+            self._write(self.nodes_path, nodes)
+            self.save(job)
+
+    def cancel(self, job_ids: list[str], signum: int | None = None):
+        """Cancel jobs, or only send a signal to their job steps.
+
+        Args:
+            job_ids (list[str]): Job ids, a job array id cancels all of its tasks.
+            signum (int | None, optional): Signal of the job steps, the jobs keep running. Defaults to None.
+        """
+        with self.lock():
+            for job in self.select(job_ids):
+                if job["state"] not in ACTIVE_STATES:
+                    continue
+                if signum is not None:
+                    signal_groups(job["steps"], signum)
+                    continue
+                job["state"], job["reason"], job["end"] = "CANCELLED", "None", time.time()
+                self.save(job)
+                signal_groups(([job["pid"]] if job["pid"] else []) + job["steps"], signal.SIGTERM)
+
+    def run_step(self, args: list[str], env: dict[str, str]) -> int:
+        """Run a job step on nodes of the allocation of a job (srun), one process per task.
+
+        Args:
+            args (list[str]): Arguments of srun, the command of the tasks after the options.
+            env (dict[str, str]): Environment of the caller.
+
+        Returns:
+            int: Highest exit code of the tasks.
+        """
+        short = {"N": "nodes", "n": "ntasks", "w": "nodelist", "x": "exclude", "c": "cpus-per-task"}
+        options, command = command_options(args, short)
+        job_id = options.get("jobid") or env.get("SLURM_JOB_ID", "")
+        job = self.job(job_id)
+        if job is None or job["state"] != "RUNNING" or not command:
+            print(f"srun: error: no running job {job_id!r} to run the step in", file=sys.stderr)
+            return 1
+
+        groups = range(len(job["nodelist"]))
+        if options.get("het-group"):
+            first, _, last = options["het-group"].partition("-")
+            groups = range(int(first), int(last or first) + 1)
+        pool = [node for group in groups for node in job["nodelist"][group]]
+
+        wanted = expand_hostlist(options.get("nodelist", ""))
+        excluded = set(expand_hostlist(options.get("exclude", "")))
+        candidates = [n for n in pool if (not wanted or n in wanted) and n not in excluded]
+        count = int(options["nodes"].split("-")[0]) if options.get("nodes") else len(candidates)
+        if count > len(candidates) or count == 0:
+            print("srun: error: Requested node configuration is not available", file=sys.stderr)
+            return 1
+        nodes = candidates[:count]
+        ntasks = int(options.get("ntasks") or count)
+
+        step_env = exported(options.get("export", ""), env)
+        processes = []
+        for task in range(ntasks):
+            node = nodes[task % count]
+            tmpdir = self.node_dir(node, step_env.get("TMPDIR", "/tmp"))
+            os.makedirs(tmpdir, exist_ok=True)
+            task_env = step_env | {
+                "SLURMD_NODENAME": node,
+                "SLURM_PROCID": str(task),
+                "SLURM_NODEID": str(nodes.index(node)),
+                "SLURM_STEP_NODELIST": ",".join(nodes),
+                "SLURM_STEP_NUM_TASKS": str(ntasks),
+                "TMPDIR": tmpdir,
+            }
+            processes.append(subprocess.Popen(command, env=task_env, start_new_session=True))
+
+        pgids = [process.pid for process in processes]
+        with self.lock():
+            job = self.job(job_id)
+            job["steps"] += pgids
+            self.save(job)
+
+        # Signals of the step (scancel --signal, or the batch script) reach every task
+        def forward(signum, frame):
+            signal_groups(pgids, signum)
+
+        for signum in [signal.SIGTERM, signal.SIGINT, signal.SIGUSR1, signal.SIGUSR2]:
+            signal.signal(signum, forward)
+
+        codes = [process.wait() for process in processes]
+        with self.lock():
+            job = self.job(job_id)
+            job["steps"] = [pgid for pgid in job["steps"] if pgid not in pgids]
+            self.save(job)
+        return max(codes)
+
+    def _allocate(self, job_id: str) -> bool:
+        """Allocate the nodes of a pending job if they are free and no older job waits (FIFO).
+
+        Returns:
+            bool: True once the job left the queue (allocated or cancelled).
+        """
+        with self.lock():
+            job = self.job(job_id)
+            if job["state"] != "PENDING":
+                return True
+
+            nodes = self.nodes()
+            idle = [node for node, holder in nodes.items() if not holder]
+            needed = [component["nodes"] for component in job["components"]]
+            older = [
+                other
+                for other in self.all_jobs()
+                if other["state"] == "PENDING"
+                and (other["submitted"], other["id"]) < (job["submitted"], job["id"])
+                and sum([component["nodes"] for component in other["components"]]) <= len(nodes)
+            ]
+            if sum(needed) > len(nodes):
+                job["reason"] = "PartitionNodeLimit"
+            elif sum(needed) > len(idle) or older:
+                job["reason"] = "Resources"
+            else:
+                job["nodelist"] = []
+                for count in needed:
+                    job["nodelist"].append(idle[:count])
+                    idle = idle[count:]
+                for node in [node for group in job["nodelist"] for node in group]:
+                    nodes[node] = job["id"]
+                job["state"], job["reason"], job["start"] = "RUNNING", "None", time.time()
+                self._write(self.nodes_path, nodes)
+            self.save(job)
+            return job["state"] != "PENDING"
+
+    def _environment(self, job: dict) -> dict[str, str]:
+        """SLURM environment of the batch script of a job."""
+        nodes = [node for group in job["nodelist"] for node in group]
+        first = job["components"][0]
+        env = job["env"] | {
+            LOCAL_DIR_ENV: self.local_dir,
+            "SLURM_JOB_ID": job["array_id"] if job["task"] is None else job["id"],
+            "SLURM_JOBID": job["array_id"] if job["task"] is None else job["id"],
+            "SLURM_JOB_NAME": job["name"],
+            "SLURM_JOB_PARTITION": job["partition"],
+            "SLURM_JOB_NODELIST": ",".join(nodes),
+            "SLURM_JOB_NUM_NODES": str(len(nodes)),
+            "SLURM_NNODES": str(len(nodes)),
+            "SLURM_NTASKS": str(first["ntasks"]),
+            "SLURM_CPUS_PER_TASK": str(first["cpus"]),
+            "SLURM_SUBMIT_DIR": job["cwd"],
+            "SLURMD_NODENAME": nodes[0],
+            "TMPDIR": self.node_dir(nodes[0], job["env"].get("TMPDIR", "/tmp")),
+        }
+        os.makedirs(env["TMPDIR"], exist_ok=True)
+        if job["task"] is not None:
+            env |= {"SLURM_ARRAY_JOB_ID": job["array_id"], "SLURM_ARRAY_TASK_ID": str(job["task"])}
+        if len(job["components"]) > 1:
+            env["SLURM_HET_SIZE"] = str(len(job["components"]))
+            for index, (component, group) in enumerate(zip(job["components"], job["nodelist"])):
+                env |= {
+                    f"SLURM_JOB_NODELIST_HET_GROUP_{index}": ",".join(group),
+                    f"SLURM_NTASKS_HET_GROUP_{index}": str(component["ntasks"]),
+                    f"SLURM_CPUS_PER_TASK_HET_GROUP_{index}": str(component["cpus"]),
+                }
+        return env
+
+    def _write(self, path: str, value):
+        """Replace a state file atomically (readers never see a partial file)."""
+        with open(f"{path}.tmp", "w") as fp:
+            json.dump(value, fp)
+        os.replace(f"{path}.tmp", path)
+
+
+def squeue(scheduler: LocalScheduler, args: list[str]) -> int:
+    """Queued and running jobs in the --format of the caller (%i %T %r %S %j %P %D %N)."""
+    options, _ = command_options(args, {"j": "jobs", "t": "states", "p": "partition"})
+    job_ids = [job_id for job_id in options.get("jobs", "").split(",") if job_id]
+    states = [state for state in options.get("states", "").split(",") if state]
+    jobs = scheduler.select(job_ids) if job_ids else scheduler.all_jobs()
+    for job in jobs:
+        if job["state"] not in ACTIVE_STATES or (states and job["state"] not in states):
+            continue
+        if options.get("partition") and job["partition"] != options["partition"]:
+            continue
+        fields = {
+            "i": job["id"],
+            "T": job["state"],
+            "r": job["reason"],
+            "S": timestamp(job["start"]),
+            "j": job["name"],
+            "P": job["partition"],
+            "D": str(sum([component["nodes"] for component in job["components"]])),
+            "N": ",".join([node for group in job["nodelist"] for node in group]),
+        }
+        text = options.get("format", "%i %j %T %r")
+        print(re.sub(r"%(\w)", lambda match: fields.get(match.group(1), ""), text))
+    return 0
+
+
+def ray(scheduler: LocalScheduler, args: list[str]) -> int:
+    """Ray CLI, :code:`ray start` of a worker node in a job step gets sockets of its own.
+
+    Every node of a cluster uses the session directory of the head, where a node picks the first free socket names.  Nodes sharing one machine and starting together pick the same names and all but one fail, so each simulated node gets its own, in /tmp rather than its long node-local TMPDIR (socket paths are limited to 107 bytes).
+    """
+    node = os.environ.get("SLURMD_NODENAME", "")
+    if args[:1] == ["start"] and "--head" not in args and node:
+        digest = hashlib.sha1(scheduler.local_dir.encode()).hexdigest()[:8]
+        sockets = os.path.join("/tmp", f"syndeo-{digest}", node)
+        args = [
+            *args,
+            f"--raylet-socket-name={sockets}/raylet",
+            f"--plasma-store-socket-name={sockets}/plasma_store",
+        ]
+
+    bin_dir = os.path.join(scheduler.local_dir, "bin")
+    path = os.pathsep.join([p for p in os.environ["PATH"].split(os.pathsep) if p != bin_dir])
+    executable = shutil.which("ray", path=path)
+    os.execv(executable, [executable, *args])
+
+
+def sacct(scheduler: LocalScheduler, args: list[str]) -> int:
+    """Final state of the finished jobs (JobID|State)."""
+    options, _ = command_options(args, {"j": "jobs"})
+    job_ids = [job_id for job_id in options.get("jobs", "").split(",") if job_id]
+    for job in scheduler.select(job_ids):
+        if job["state"] not in ACTIVE_STATES:
+            print(f"{job['id']}|{job['state']}")
+    return 0
+
+
+def sbatch(scheduler: LocalScheduler, args: list[str]) -> int:
+    """Submit a batch script, or estimate its start (--test-only)."""
+    if "--test-only" in args:
+        options, _ = command_options(args, {"N": "nodes", "p": "partition"})
+        nodes = int(options.get("nodes", "1").split("-")[0])
+        if nodes > len(scheduler.nodes()):
+            print("sbatch: error: Requested node configuration is not available", file=sys.stderr)
+            return 1
+        start = timestamp(time.time())
+        print(
+            f"sbatch: Job 0 to start at {start} using {nodes} processors "
+            f"on nodes local0 in partition {options.get('partition', 'local')}",
+            file=sys.stderr,
+        )
+        return 0
+
+    print(f"Submitted batch job {scheduler.submit(args, dict(os.environ))}")
+    return 0
+
+
+def scancel(scheduler: LocalScheduler, args: list[str]) -> int:
+    """Cancel jobs, or signal their steps (--signal)."""
+    options, job_ids = command_options(args, {"s": "signal"})
+    name = options.get("signal")
+    scheduler.cancel(job_ids, getattr(signal, f"SIG{name.upper()}") if name else None)
+    return 0
+
+
+def scontrol(scheduler: LocalScheduler, args: list[str]) -> int:
+    """Only :code:`scontrol show hostnames [list]`."""
+    if args[:2] != ["show", "hostnames"]:
+        print(f"scontrol: error: {' '.join(args)} is not simulated locally", file=sys.stderr)
+        return 1
+
+    for host in expand_hostlist(args[2] if len(args) > 2 else os.environ["SLURM_JOB_NODELIST"]):
+        print(host)
+    return 0
+
+
+def sinfo(scheduler: LocalScheduler, args: list[str]) -> int:
+    """No partitions: requests are not checked against partition limits."""
+    return 0
+
+
+def srun(scheduler: LocalScheduler, args: list[str]) -> int:
+    """Run a job step."""
+    return scheduler.run_step(args, dict(os.environ))
+
+
+def main(argv: list[str]) -> int:
+    """Entry point of the shims: <command> <arguments>.
+
+    Args:
+        argv (list[str]): Command name, then its arguments.
+
+    Returns:
+        int: Exit code.
+    """
+    scheduler = LocalScheduler(os.environ[LOCAL_DIR_ENV])
+    if argv[0] == "supervise":
+        scheduler.supervise(argv[1])
+        return 0
+
+    commands = {
+        "ray": ray,
+        "sacct": sacct,
+        "sbatch": sbatch,
+        "scancel": scancel,
+        "scontrol": scontrol,
+        "sinfo": sinfo,
+        "squeue": squeue,
+        "srun": srun,
+    }
+    return commands[argv[0]](scheduler, argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,214 @@
+import json
+import os
+import re
+import time
+
+from src.launch.slurm import Gateway
+from src.launch.slurm import GATEWAY
+
+# One line per partition and node configuration: name|availability|time limit|nodes|cpus|gres|A/I/O/T
+SINFO_FORMAT = "%R|%a|%l|%D|%c|%G|%F"
+
+
+def parse_gres(gres: str) -> dict[str, int]:
+    """Generic resources of a node (sinfo %G) or of a request.
+
+    Args:
+        gres (str): Comma separated gres (i.e. gpu:volta:2(S:0-1)), "(null)" or "n/a" for none.
+
+    Returns:
+        dict[str, int]: Count by resource name, with and without type (i.e. gpu:volta and gpu).
+    """
+    resources: dict[str, int] = {}
+    for item in str(gres).split(","):
+        item = re.sub(r"\(.*\)", "", item).strip()
+        fields = item.split(":")
+        if len(fields) < 2 or not fields[-1].isdigit():
+            continue
+
+        count = int(fields[-1])
+        names = {fields[0], ":".join(fields[:-1])}
+        for name in names:
+            resources[name] = resources.get(name, 0) + count
+    return resources
+
+
+def parse_time(text: str) -> int | None:
+    """Duration in seconds of a SLURM time (days-hours:minutes:seconds and its short forms).
+
+    Args:
+        text (str): SLURM time (i.e. 2-00:00:00, 30:00, 90).
+
+    Returns:
+        int | None: Seconds, None if unlimited.
+    """
+    text = str(text).strip()
+    if text.lower() in ("infinite", "unlimited", "n/a", ""):
+        return None
+
+    days, _, clock = text.rpartition("-")
+    fields = [int(field) for field in clock.split(":")]
+    if days:
+        # days-hours, days-hours:minutes and days-hours:minutes:seconds
+        hours, minutes, seconds = (fields + [0, 0])[:3]
+    elif len(fields) == 3:
+        hours, minutes, seconds = fields
+    elif len(fields) == 2:
+        hours, minutes, seconds = 0, fields[0], fields[1]
+    else:
+        hours, minutes, seconds = 0, fields[0], 0
+
+    return ((int(days or 0) * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def parse_sinfo(stdout: str) -> dict[str, dict]:
+    """Build the partition index from sinfo output (:code:`SINFO_FORMAT`).
+
+    Args:
+        stdout (str): Output of sinfo.
+
+    Returns:
+        dict[str, dict]: Partition by name, with its availability, walltime limit (seconds, None if unlimited) and node groups (nodes, idle, cpus per node, gres per node).
+    """
+    index: dict[str, dict] = {}
+    for line in stdout.splitlines():
+        fields = line.strip().split("|")
+        if len(fields) != 7:
+            continue
+
+        name, available, limit, nodes, cpus, gres, counts = fields
+        partition = index.setdefault(
+            name, {"available": available == "up", "max_time": parse_time(limit), "groups": []}
+        )
+        partition["groups"].append(
+            {
+                "nodes": int(nodes),
+                "idle": int(counts.split("/")[1]),
+                "cpus": int(re.sub(r"\D.*", "", cpus) or 0),
+                "gres": parse_gres(gres),
+            }
+        )
+    return index
+
+
+def build_index(gateway: Gateway | None = None) -> dict[str, dict]:
+    """Query sinfo for the partition index.
+
+    Args:
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+
+    Returns:
+        dict[str, dict]: Partition by name, empty if sinfo is not available.
+    """
+    try:
+        results = (gateway or GATEWAY).run(["sinfo", "--noheader", f"--format={SINFO_FORMAT}"])
+    except FileNotFoundError:
+        return {}
+    return parse_sinfo(results.stdout) if results.returncode == 0 else {}
+
+
+def load_index(path: str, ttl: float = 600, refresh: bool = False) -> dict[str, dict]:
+    """Partition index cached in a file, rebuilt from sinfo when older than the TTL.
+
+    Args:
+        path (str): Path of the cache file.
+        ttl (float, optional): Seconds the cached index is used. Defaults to 600.
+        refresh (bool, optional): Rebuild the index regardless of its age. Defaults to False.
+
+    Returns:
+        dict[str, dict]: Partition by name, empty if the partitions are unknown.
+    """
+    if not refresh and os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+        with open(path) as f:
+            return json.load(f)
+
+    index = build_index()
+    if index:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(index, f)
+    return index
+
+
+def matching_groups(partition: dict, gres: str) -> list[dict]:
+    """Node groups of a partition that provide the requested generic resources per node.
+
+    Args:
+        partition (dict): Partition of the index.
+        gres (str): Requested gres per node (i.e. gpu:volta:2) or n/a.
+
+    Returns:
+        list[dict]: Node groups.
+    """
+    request = parse_gres(gres)
+    return [
+        group
+        for group in partition["groups"]
+        if all([group["gres"].get(name, 0) >= count for name, count in request.items()])
+    ]
+
+
+def node_cpus(index: dict[str, dict], config: dict) -> int | None:
+    """Cores of a full node for a request, i.e. the cpus per task of an exclusive job with one task per node.
+
+    Args:
+        index (dict[str, dict]): Partition index.
+        config (dict): Head/CPU/GPU configuration (partition, gres).
+
+    Returns:
+        int | None: Smallest core count of the nodes that can run the request, None if unknown.
+    """
+    cpus = [
+        group["cpus"]
+        for name in config["partition"].split(",")
+        if name in index
+        for group in matching_groups(index[name], config["gres"])
+    ]
+    return min(cpus) if cpus else None
+
+
+def check_request(index: dict[str, dict], config: dict) -> list[str]:
+    """Reasons a request can never be satisfied by any of its partitions.
+
+    Args:
+        index (dict[str, dict]): Partition index, an empty index accepts everything.
+        config (dict): Head/CPU/GPU configuration (partition, nodes, cpus_per_task, gres, time).
+
+    Returns:
+        list[str]: Problems, empty if at least one partition can run the request.
+    """
+    if not index:
+        return []
+
+    problems = []
+    for name in config["partition"].split(","):
+        partition = index.get(name)
+        if partition is None:
+            problems.append(f"unknown partition {name} (known: {', '.join(sorted(index))})")
+            continue
+
+        found = []
+        groups = matching_groups(partition, config["gres"])
+        nodes = sum([group["nodes"] for group in groups])
+        cpus = max([group["cpus"] for group in groups], default=0)
+        limit = partition["max_time"]
+        requested = parse_time(config["time"])
+
+        if not partition["available"]:
+            found.append(f"{name} is not available")
+        if not groups:
+            found.append(f"{name} has no nodes with gres {config['gres']}")
+        elif config["nodes"] > nodes:
+            found.append(
+                f"{name} has {nodes} nodes with gres {config['gres']}, {config['nodes']} requested"
+            )
+        if groups and config["cpus_per_task"] > cpus:
+            found.append(f"{name} has {cpus} cores per node, {config['cpus_per_task']} requested")
+        if limit is not None and (requested is None or requested > limit):
+            found.append(f"{name} allows {limit} s of walltime, {config['time']} requested")
+
+        if not found:
+            return []
+        problems += found
+
+    return problems
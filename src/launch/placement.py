@@ -0,0 +1,268 @@
+import datetime
+import itertools
+import json
+import math
+import os
+import re
+import time
+
+from src.launch.partitions import matching_groups
+from src.launch.partitions import parse_gres
+from src.launch.slurm import Gateway
+from src.launch.slurm import GATEWAY
+
+# Decisions are ranked by expected start, then by number of jobs, then by number of nodes
+UNKNOWN_START = math.inf
+
+
+def parse_timestamp(text: str) -> float | None:
+    """Epoch seconds of a SLURM timestamp (i.e. 2024-02-05T11:19:07).
+
+    Args:
+        text (str): Timestamp printed by sbatch or squeue.
+
+    Returns:
+        float | None: Epoch seconds, None if the time is unknown (N/A, Unknown).
+    """
+    try:
+        return datetime.datetime.fromisoformat(text.strip()).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_test_only(text: str) -> float | None:
+    """Expected start of a job from the output of :code:`sbatch --test-only`.
+
+    Args:
+        text (str): Output of sbatch ("sbatch: Job 1234 to start at 2024-02-05T11:19:07 using 48 processors on nodes c-1 in partition normal").
+
+    Returns:
+        float | None: Epoch seconds, None if the scheduler gave no estimate.
+    """
+    match = re.search(r"to start at (\S+)", text)
+    return parse_timestamp(match.group(1)) if match else None
+
+
+def parse_start_times(stdout: str) -> list[float]:
+    """Expected start times of pending jobs from :code:`squeue --start --format=%S`.
+
+    Args:
+        stdout (str): Output of squeue, one timestamp per line.
+
+    Returns:
+        list[float]: Epoch seconds of the jobs with an estimate.
+    """
+    starts = [parse_timestamp(line) for line in stdout.splitlines()]
+    return [start for start in starts if start is not None]
+
+
+def estimate_start(
+    config: dict, partition: str, nodes: int, gateway: Gateway | None = None
+) -> float | None:
+    """Ask the scheduler when a request would start, without submitting it.
+
+    Args:
+        config (dict): CPU/GPU configuration (gres, time).
+        partition (str): Partition of the request.
+        nodes (int): Number of exclusive nodes.
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+
+    Returns:
+        float | None: Expected start in epoch seconds, None if the scheduler gave no estimate.
+    """
+    args = [
+        "sbatch",
+        "--test-only",
+        "--exclusive",
+        f"--partition={partition}",
+        f"--nodes={nodes}",
+        "--ntasks-per-node=1",
+        f"--time={config['time']}",
+    ]
+    if parse_gres(config["gres"]):
+        args.append(f"--gres={config['gres']}")
+
+    try:
+        results = (gateway or GATEWAY).run(args + ["--wrap=true"])
+    except FileNotFoundError:
+        return None
+    return parse_test_only(results.stderr + results.stdout) if results.returncode == 0 else None
+
+
+def queue_start(partition: str, gateway: Gateway | None = None) -> float | None:
+    """Latest expected start of the jobs pending on a partition (:code:`squeue --start`), a new job waits at least that long for nodes that are not idle.
+
+    Args:
+        partition (str): Partition name.
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+
+    Returns:
+        float | None: Epoch seconds, None if no pending job has an estimate.
+    """
+    try:
+        results = (gateway or GATEWAY).run(
+            [
+                "squeue",
+                "--start",
+                "--noheader",
+                "--states=PENDING",
+                f"--partition={partition}",
+                "--format=%S",
+            ]
+        )
+    except FileNotFoundError:
+        return None
+    starts = parse_start_times(results.stdout) if results.returncode == 0 else []
+    return max(starts) if starts else None
+
+
+def candidate_options(
+    index: dict[str, dict], config: dict, cores: int, candidates: list[str]
+) -> dict[str, list[dict]]:
+    """Requests worth estimating on each candidate partition: enough nodes for the whole request and, when fewer nodes are idle, only the idle nodes (one part of a split request).
+
+    Args:
+        index (dict[str, dict]): Partition index.
+        config (dict): CPU/GPU configuration (nodes, cpus_per_task, gres).
+        cores (int): Total cores requested, 0 to request :code:`config["nodes"]` nodes.
+        candidates (list[str]): Acceptable partitions, empty for every available partition.
+
+    Returns:
+        dict[str, list[dict]]: Options (nodes, cpus per node, capacity in cores or nodes, idle nodes) by partition.
+    """
+    options = {}
+    for name in candidates or sorted(index):
+        partition = index.get(name)
+        if partition is None or not partition["available"]:
+            continue
+        groups = matching_groups(partition, config["gres"])
+        if not groups:
+            continue
+
+        # An exclusive node runs one task, which uses all of its cores unless cpus_per_task is set
+        cpus = min([group["cpus"] for group in groups])
+        used = min(cpus, config["cpus_per_task"] or cpus)
+        total = sum([group["nodes"] for group in groups])
+        idle = sum([group["idle"] for group in groups])
+        needed = math.ceil(cores / used) if cores else config["nodes"]
+
+        sizes = sorted({min(needed, total)} | ({idle} if 0 < idle < needed else set()))
+        options[name] = [
+            {
+                "nodes": nodes,
+                "cpus": cpus,
+                "capacity": nodes * used if cores else nodes,
+                "idle": idle,
+            }
+            for nodes in sizes
+        ]
+    return options
+
+
+def choose(options: dict[str, list[dict]], target: int) -> list[dict]:
+    """Parts of the request with the earliest expected start of the whole request.
+
+    Every combination of at most one option per partition that covers the target is considered.  A split request starts when its last part starts, so it only wins when it is expected to start sooner than any single partition.  Ties go to fewer jobs, then fewer nodes.
+
+    Args:
+        options (dict[str, list[dict]]): Options (nodes, cpus, capacity, start) by partition.
+        target (int): Cores (or nodes) to cover.
+
+    Returns:
+        list[dict]: Parts (partition, nodes, cpus, start), empty if no combination covers the target.
+    """
+    names = list(options)
+    best, best_key = [], None
+    for choice in itertools.product(*[[None] + options[name] for name in names]):
+        parts = [
+            option | {"partition": name}
+            for name, option in zip(names, choice)
+            if option is not None
+        ]
+        if not parts or sum([part["capacity"] for part in parts]) < target:
+            continue
+
+        # Take the cores from the parts expected to start first, drop what is not needed
+        parts = sorted(parts, key=lambda part: start_key(part["start"]))
+        trimmed, remaining = [], target
+        for part in parts:
+            if remaining <= 0:
+                break
+            per_node = part["capacity"] // part["nodes"]
+            nodes = min(part["nodes"], math.ceil(remaining / per_node))
+            trimmed.append(part | {"nodes": nodes, "capacity": nodes * per_node})
+            remaining -= nodes * per_node
+
+        key = (
+            max([start_key(part["start"]) for part in trimmed]),
+            len(trimmed),
+            sum([part["nodes"] for part in trimmed]),
+        )
+        if best_key is None or key < best_key:
+            best, best_key = trimmed, key
+
+    return [{key: part[key] for key in ["partition", "nodes", "cpus", "start"]} for part in best]
+
+
+def start_key(start: float | None) -> float:
+    """Sort key of an expected start, unknown starts come last."""
+    return UNKNOWN_START if start is None else start
+
+
+def place(
+    index: dict[str, dict],
+    config: dict,
+    cores: int = 0,
+    candidates: list[str] | None = None,
+    gateway: Gateway | None = None,
+    now: float | None = None,
+) -> dict:
+    """Choose the partitions and node counts of a worker tier with the earliest expected start.
+
+    Each option is estimated with :code:`sbatch --test-only`.  When the scheduler gives no estimate, a request that fits in the idle nodes starts now, otherwise it starts after the jobs pending on the partition (:code:`squeue --start`).
+
+    Args:
+        index (dict[str, dict]): Partition index.
+        config (dict): CPU/GPU configuration (nodes, cpus_per_task, gres, time).
+        cores (int, optional): Total cores requested, 0 to request :code:`config["nodes"]` nodes. Defaults to 0.
+        candidates (list[str] | None, optional): Acceptable partitions. Defaults to every available partition.
+        gateway (Gateway | None, optional): Gateway running the commands. Defaults to the shared gateway.
+        now (float | None, optional): Current epoch seconds. Defaults to the current time.
+
+    Returns:
+        dict: Decision with the request, the estimated options and the chosen parts (empty if nothing fits).
+    """
+    now = time.time() if now is None else now
+    options = candidate_options(index, config, cores, candidates or [])
+
+    for name, partition_options in options.items():
+        for option in partition_options:
+            start = estimate_start(config, name, option["nodes"], gateway)
+            if start is None:
+                start = now if option["nodes"] <= option["idle"] else queue_start(name, gateway)
+            option["start"] = None if start is None else max(start, now)
+
+    target = cores or config["nodes"]
+    parts = choose(options, target)
+    return {
+        "time": now,
+        "cores": cores,
+        "nodes": config["nodes"],
+        "gres": config["gres"],
+        "walltime": config["time"],
+        "candidates": candidates or [],
+        "options": options,
+        "parts": parts,
+    }
+
+
+def log_decision(path: str, decision: dict):
+    """Append a placement decision to a JSON lines file, so the decisions can be evaluated against the actual start times.
+
+    Args:
+        path (str): Path of the log.
+        decision (dict): Decision returned by :code:`place`.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(decision) + "\n")
@@ -0,0 +1,226 @@
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+from typing import Any
+
+from ray.autoscaler.node_launch_exception import NodeLaunchException
+from ray.autoscaler.node_provider import NodeProvider
+from ray.autoscaler.tags import NODE_KIND_HEAD
+from ray.autoscaler.tags import STATUS_UP_TO_DATE
+from ray.autoscaler.tags import TAG_RAY_NODE_KIND
+from ray.autoscaler.tags import TAG_RAY_NODE_STATUS
+from ray.autoscaler.tags import TAG_RAY_USER_NODE_TYPE
+from ray.util import get_node_ip_address
+
+from src.launch.autoscaler import HEAD_NODE_TYPE
+
+from src.launch.registry import Registry
+from src.launch.slurm import GATEWAY
+from src.launch.slurm import job_states
+from src.launch.slurm import parse_job_id
+from src.launch.slurm import sbatch
+from src.launch.slurm import scancel
+from src.launch.slurm import TERMINAL_STATES
+from src.launch.template import render_file
+
+# Node id of the head in the provider, and its Ray node id when nodes are identified by node id (all f is the nil id)
+HEAD_NODE_ID = "f" * 51 + "0" * 5
+
+
+class SlurmNodeProvider(NodeProvider):
+    """Ray autoscaler node provider that runs every worker node as a one-node SLURM job.
+
+    The head is started by Syndeo, it is reported as a running node the provider never launches nor terminates.  The jobs are rendered from the tier templates (:code:`template_cpu.sh`, :code:`template_gpu.sh`) with the values of the running cluster, so a launched node joins the head through the same rendezvous as the static workers.  Nodes are identified by a random Ray node id, the SLURM job of each node and its autoscaler tags are kept in a state file so a restarted autoscaler finds its nodes again.  Launched jobs are recorded in the job registry, so :code:`status` and :code:`teardown` see them.
+
+    Provider options (:code:`provider` section of the autoscaler configuration):
+
+    * :code:`workdir`: directory the jobs are submitted from (templates, logs),
+    * :code:`state_path`: JSON file of the launched nodes,
+    * :code:`registry`: job registry database,
+    * :code:`cluster_id`: cluster the jobs are recorded under,
+    * :code:`use_node_id_as_ip`: identify nodes by Ray node id instead of IP, when several nodes share a host (single machine tests, the head is then started with the node id :code:`HEAD_NODE_ID`).
+    """
+
+    # Seconds a job unknown to squeue and sacct is still considered starting (right after sbatch)
+    UNKNOWN_GRACE = 60.0
+
+    def __init__(self, provider_config: dict[str, Any], cluster_name: str):
+        super().__init__(provider_config, cluster_name)
+        self.workdir = provider_config["workdir"]
+        self.state_path = provider_config["state_path"]
+        self.registry_path = provider_config["registry"]
+        self.cluster_id = provider_config["cluster_id"]
+        self.use_node_id_as_ip = provider_config.get("use_node_id_as_ip", False)
+
+        self.lock = threading.RLock()
+        self.state: dict = {"submitted": 0, "nodes": {}}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+
+        self.head = {
+            "tags": {
+                TAG_RAY_NODE_KIND: NODE_KIND_HEAD,
+                TAG_RAY_USER_NODE_TYPE: HEAD_NODE_TYPE,
+                TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE,
+            },
+            "state": "RUNNING",
+            "ip": HEAD_NODE_ID if self.use_node_id_as_ip else get_node_ip_address(),
+        }
+
+    def non_terminated_nodes(self, tag_filters: dict[str, str]) -> list[str]:
+        with self.lock:
+            self._refresh()
+            return [
+                node_id
+                for node_id, node in self._nodes().items()
+                if all([node["tags"].get(key) == value for key, value in tag_filters.items()])
+            ]
+
+    def is_running(self, node_id: str) -> bool:
+        with self.lock:
+            node = self._nodes().get(node_id)
+            return node is not None and node["state"] == "RUNNING"
+
+    def is_terminated(self, node_id: str) -> bool:
+        with self.lock:
+            return node_id not in self._nodes()
+
+    def node_tags(self, node_id: str) -> dict[str, str]:
+        with self.lock:
+            return dict(self._nodes()[node_id]["tags"])
+
+    def external_ip(self, node_id: str) -> str | None:
+        return self.internal_ip(node_id)
+
+    def internal_ip(self, node_id: str) -> str | None:
+        if self.use_node_id_as_ip:
+            return node_id
+
+        with self.lock:
+            node = self._nodes()[node_id]
+            if node.get("ip") is None:
+                node["ip"] = self._node_ip(node["job_id"])
+            return node["ip"]
+
+    def create_node(
+        self, node_config: dict[str, Any], tags: dict[str, str], count: int
+    ) -> dict[str, Any]:
+        created = {}
+        with self.lock:
+            for _ in range(count):
+                node_id = secrets.token_hex(28)
+                job_id = self._submit(node_config, node_id)
+                created[node_id] = self.state["nodes"][node_id] = {
+                    "job_id": job_id,
+                    "tier": node_config["tier"],
+                    "tags": tags | {TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE},
+                    "state": "SUBMITTED",
+                    "submitted": time.time(),
+                }
+            self._save()
+        return created
+
+    def set_node_tags(self, node_id: str, tags: dict[str, str]):
+        with self.lock:
+            self._nodes()[node_id]["tags"].update(tags)
+            self._save()
+
+    def terminate_node(self, node_id: str) -> dict[str, Any] | None:
+        return self.terminate_nodes([node_id])
+
+    def terminate_nodes(self, node_ids: list[str]) -> dict[str, Any] | None:
+        with self.lock:
+            nodes = {
+                node_id: self.state["nodes"].pop(node_id)
+                for node_id in node_ids
+                if node_id in self.state["nodes"]
+            }
+            self._save()
+
+        # One scancel for every node terminated in this round
+        job_ids = [node["job_id"] for node in nodes.values()]
+        scancel(job_ids)
+        with Registry(self.registry_path) as registry:
+            registry.update_states({job_id: "CANCELLED" for job_id in job_ids})
+        return nodes
+
+    def _nodes(self) -> dict[str, dict]:
+        """Every node of the cluster by node id, head included."""
+        return {HEAD_NODE_ID: self.head} | self.state["nodes"]
+
+    def _submit(self, node_config: dict[str, Any], node_id: str) -> str:
+        """Render the tier template of a one-node worker job and submit it.
+
+        Args:
+            node_config (dict[str, Any]): Node type configuration (tier, template, values).
+            node_id (str): Ray node id of the new node.
+
+        Raises:
+            NodeLaunchException: sbatch rejected the job.
+
+        Returns:
+            str: SLURM job id.
+        """
+        self.state["submitted"] += 1
+        suffix = f"auto{self.state['submitted']}"
+        values = node_config["values"] | {
+            "job_name": f"{node_config['values']['job_name']}_auto",
+            "output": f"{node_config['values']['output']}_{suffix}",
+        }
+
+        script = os.path.join(
+            os.path.dirname(self.state_path), f"{node_config['tier']}_{suffix}.sh"
+        )
+        render_file(values, os.path.join(self.workdir, node_config["template"]), script)
+
+        options = [f"--chdir={self.workdir}"]
+        if self.use_node_id_as_ip:
+            options.append(f"--export=ALL,RAY_OVERRIDE_NODE_ID_FOR_TESTING={node_id}")
+        results = sbatch(script, options=options)
+        if results.returncode != 0:
+            raise NodeLaunchException("sbatch", results.stderr.strip(), None)
+
+        job_id = parse_job_id(results.stdout)
+        log = os.path.join(self.workdir, "logs", f"{values['output']}.log")
+        with Registry(self.registry_path) as registry:
+            registry.add(job_id, self.cluster_id, node_config["tier"], values, log)
+        return job_id
+
+    def _refresh(self):
+        """Update the state of every node with one batched query, forget the nodes whose job ended."""
+        nodes = self.state["nodes"]
+        if not nodes:
+            return
+
+        states = job_states([node["job_id"] for node in nodes.values()])
+        now = time.time()
+        for node in nodes.values():
+            state = states[node["job_id"]]
+            if state != "UNKNOWN" or now - node["submitted"] > self.UNKNOWN_GRACE:
+                node["state"] = state
+
+        ended = [node_id for node_id, node in nodes.items() if node["state"] in TERMINAL_STATES]
+        with Registry(self.registry_path) as registry:
+            registry.update_states({node["job_id"]: node["state"] for node in nodes.values()})
+        for node_id in ended:
+            nodes.pop(node_id)
+        self._save()
+
+    def _node_ip(self, job_id: str) -> str | None:
+        """IP address of the node allocated to a job, None while the job is pending."""
+        results = GATEWAY.run(["squeue", "--noheader", "--format=%N", f"--jobs={job_id}"])
+        hosts = results.stdout.split() if results.returncode == 0 else []
+        if not hosts or hosts[0] in ("", "(null)"):
+            return None
+        return socket.gethostbyname(hosts[0])
+
+    def _save(self):
+        """Write the node state atomically."""
+        path = f"{self.state_path}.tmp"
+        with open(path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(path, self.state_path)
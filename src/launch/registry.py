@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+
+from src.launch.slurm import TERMINAL_STATES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    cluster_id TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    job_name TEXT,
+    config_hash TEXT,
+    nodes INTEGER,
+    partition TEXT,
+    tmpdir TEXT,
+    log TEXT,
+    ray_ip_dir TEXT,
+    head_addr TEXT,
+    submitted REAL NOT NULL,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_cluster ON jobs (cluster_id);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+CREATE TABLE IF NOT EXISTS transitions (
+    job_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transitions_job ON transitions (job_id);
+CREATE TABLE IF NOT EXISTS clusters (
+    cluster_id TEXT PRIMARY KEY,
+    config_hash TEXT NOT NULL,
+    runtime TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS clusters_hash ON clusters (config_hash);
+"""
+
+
+def config_hash(config: dict) -> str:
+    """Short hash identifying a configuration.
+
+    Args:
+        config (dict): Configuration of a job.
+
+    Returns:
+        str: First 12 hex characters of the SHA-256 of the configuration.
+    """
+    text = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+class Registry:
+    """Record of every job submitted by Syndeo and of its state transitions, stored in SQLite.
+
+    The job ids are captured from sbatch at submission, so the jobs of a cluster can be queried, monitored and cancelled in bulk without scraping logs or :code:`squeue`.
+    """
+
+    def __init__(self, path: str):
+        """Open (and create) a registry.
+
+        Args:
+            path (str): Path of the SQLite database.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "Registry":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add(self, job_id: str, cluster_id: str, tier: str, config: dict, log: str = ""):
+        """Record a submitted job.
+
+        Args:
+            job_id (str): SLURM job id (array tasks as <job>_<task>).
+            cluster_id (str): Identifier of the cluster (or sweep) the job belongs to.
+            tier (str): Role of the job (head, cpu, gpu, hetjob, sweep).
+            config (dict): Configuration the job was rendered from.
+            log (str, optional): Path of the SLURM log. Defaults to "".
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    cluster_id,
+                    tier,
+                    config.get("job_name"),
+                    config_hash(config),
+                    config.get("nodes"),
+                    config.get("partition"),
+                    config.get("tmpdir"),
+                    log,
+                    config.get("ray_ip_dir"),
+                    None,
+                    now,
+                    "SUBMITTED",
+                    now,
+                ),
+            )
+            self.conn.execute(
+                "INSERT INTO transitions VALUES (?, ?, ?)", (job_id, "SUBMITTED", now)
+            )
+
+    def add_cluster(self, cluster_id: str, launch_hash: str, runtime: dict):
+        """Record a launched cluster, so a later run of the same configuration can find it.
+
+        Args:
+            cluster_id (str): Identifier of the cluster.
+            launch_hash (str): Hash of the configuration the cluster was launched from.
+            runtime (dict): Runtime values of the cluster (rendezvous, ray_ip_dir, ...).
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO clusters VALUES (?, ?, ?, ?)",
+                (cluster_id, launch_hash, json.dumps(runtime), time.time()),
+            )
+
+    def clusters(self, launch_hash: str | None = None) -> list[dict]:
+        """Recorded clusters in launch order.
+
+        Args:
+            launch_hash (str | None, optional): Only the clusters launched from this configuration, None for every cluster. Defaults to None.
+
+        Returns:
+            list[dict]: Cluster records (cluster_id, config_hash, runtime, created).
+        """
+        query, params = "SELECT * FROM clusters", []
+        if launch_hash is not None:
+            query, params = query + " WHERE config_hash = ?", [launch_hash]
+        rows = self.conn.execute(query + " ORDER BY created, cluster_id", params)
+
+        return [dict(row) | {"runtime": json.loads(row["runtime"])} for row in rows]
+
+    def update_states(self, states: dict[str, str]) -> dict[str, str]:
+        """Record the current state of jobs, a transition is only recorded when the state changed.
+
+        Args:
+            states (dict[str, str]): State by job id.
+
+        Returns:
+            dict[str, str]: The jobs whose state changed, with their new state.
+        """
+        if not states:
+            return {}
+
+        placeholders = ",".join("?" * len(states))
+        current = {
+            row["job_id"]: row["state"]
+            for row in self.conn.execute(
+                f"SELECT job_id, state FROM jobs WHERE job_id IN ({placeholders})", list(states)
+            )
+        }
+        changed = {
+            job_id: state
+            for job_id, state in states.items()
+            if job_id in current and current[job_id] != state
+        }
+
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE jobs SET state = ?, updated = ? WHERE job_id = ?",
+                [(state, now, job_id) for job_id, state in changed.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO transitions VALUES (?, ?, ?)",
+                [(job_id, state, now) for job_id, state in changed.items()],
+            )
+
+        return changed
+
+    def set_head(self, cluster_id: str, head_addr: str):
+        """Record the Ray head address of a cluster.
+
+        Args:
+            cluster_id (str): Identifier of the cluster.
+            head_addr (str): Address of the Ray head (ip:port).
+        """
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET head_addr = ? WHERE cluster_id = ?", (head_addr, cluster_id)
+            )
+
+    def jobs(self, cluster_ids: Iterable[str] | None = None, active: bool = False) -> list[dict]:
+        """Recorded jobs in submission order.
+
+        Args:
+            cluster_ids (Iterable[str] | None, optional): Only the jobs of these clusters, None for every cluster. Defaults to None.
+            active (bool, optional): Only the jobs that have not reached a terminal state. Defaults to False.
+
+        Returns:
+            list[dict]: Job records.
+        """
+        query, params = "SELECT * FROM jobs WHERE 1", []
+        if cluster_ids is not None:
+            cluster_ids = list(cluster_ids)
+            query += f" AND cluster_id IN ({','.join('?' * len(cluster_ids))})"
+            params += cluster_ids
+        if active:
+            query += f" AND state NOT IN ({','.join('?' * len(TERMINAL_STATES))})"
+            params += sorted(TERMINAL_STATES)
+        query += " ORDER BY submitted, job_id"
+
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def transitions(self, job_id: str) -> list[tuple[str, float]]:
+        """State transitions of a job.
+
+        Args:
+            job_id (str): SLURM job id.
+
+        Returns:
+            list[tuple[str, float]]: (state, epoch seconds) in order.
+        """
+        rows = self.conn.execute(
+            "SELECT state, time FROM transitions WHERE job_id = ? ORDER BY rowid", (job_id,)
+        )
+        return [(row["state"], row["time"]) for row in rows]
+
+    def latest_cluster(self) -> str | None:
+        """Identifier of the most recently submitted cluster.
+
+        Returns:
+            str | None: Cluster id, None if the registry is empty.
+        """
+        row = self.conn.execute(
+            "SELECT cluster_id FROM jobs ORDER BY submitted DESC LIMIT 1"
+        ).fetchone()
+        return row["cluster_id"] if row else None
@@ -0,0 +1,532 @@
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import typer
+from typing_extensions import Annotated
+
+from src.validation.wait import Backoff
+
+# States after which a job no longer holds nodes
+TERMINAL_STATES = frozenset(
+    [
+        "BOOT_FAIL",
+        "CANCELLED",
+        "COMPLETED",
+        "DEADLINE",
+        "FAILED",
+        "NODE_FAIL",
+        "OUT_OF_MEMORY",
+        "PREEMPTED",
+        "TIMEOUT",
+        "UNKNOWN",
+    ]
+)
+
+# Commands that only read the scheduler state, their results can be cached and shared
+READ_ONLY_COMMANDS = frozenset(["sacct", "sinfo", "squeue", "scontrol show"])
+
+# Errors of an overloaded or throttling slurmctld, the call is retried after a backoff
+TRANSIENT_ERRORS = (
+    "Socket timed out",
+    "Unable to contact slurm controller",
+    "Slurm temporarily unable",
+)
+
+# Typer application CLI
+app = typer.Typer(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    rich_markup_mode="markdown",
+)
+
+
+@dataclass
+class CommandStats:
+    """Counters of the calls of one scheduler command."""
+
+    calls: int = 0  # processes started
+    errors: int = 0  # non-zero exit codes (after the retries)
+    retries: int = 0  # calls repeated after a transient error
+    cache_hits: int = 0  # answered from the TTL cache
+    coalesced: int = 0  # answered by an identical call in flight
+    seconds: float = 0.0  # total latency of the calls
+    max_seconds: float = 0.0  # slowest call
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+class Gateway:
+    """Single entry point of every scheduler command.
+
+    Busy slurmctld daemons throttle users that poll aggressively, so the gateway keeps the number of calls down and spreads them out:
+
+    * read-only queries (squeue, sinfo, sacct, scontrol show) are cached for :code:`ttl` seconds,
+    * concurrent identical queries are coalesced into one call,
+    * per-job state queries issued concurrently are batched into one multi-job squeue call,
+    * calls are rate limited (token bucket) and retried with an exponential backoff on transient errors such as :code:`Socket timed out`,
+    * the latency of every command is counted.
+
+    The gateway is thread safe.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 2.0,
+        rate: float = 5.0,
+        burst: int = 5,
+        retries: int = 5,
+        batch_window: float = 0.02,
+    ):
+        """Initialize the gateway.
+
+        Args:
+            ttl (float, optional): Seconds a read-only query result is reused. Defaults to 2.0.
+            rate (float, optional): Sustained scheduler calls per second. Defaults to 5.0.
+            burst (int, optional): Calls allowed back to back before the rate applies. Defaults to 5.
+            retries (int, optional): Retries of a call that failed with a transient error. Defaults to 5.
+            batch_window (float, optional): Seconds per-job queries are collected before one call is made. Defaults to 0.02.
+        """
+        self.ttl = ttl
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.batch_window = batch_window
+
+        self._lock = threading.Lock()
+        self._cache: dict[tuple, tuple[float, subprocess.CompletedProcess]] = {}
+        self._inflight: dict[tuple, tuple[threading.Event, list]] = {}
+        self._stats: dict[str, CommandStats] = defaultdict(CommandStats)
+        self._tokens: float = burst
+        self._refilled: float = time.monotonic()
+
+        # Per-job state cache and the pending batch of job ids
+        self._cond = threading.Condition()
+        self._jobs: dict[str, tuple[float, dict | None]] = {}
+        self._pending: set[str] = set()
+        self._batching: bool = False
+
+    def run(
+        self, args: Sequence[str], ttl: float | None = None, timeout: float | None = None
+    ) -> subprocess.CompletedProcess:
+        """Run a scheduler command.
+
+        Args:
+            args (Sequence[str]): Command and arguments.
+            ttl (float | None, optional): Seconds a read-only result is reused, 0 to bypass the cache. Defaults to the gateway TTL.
+            timeout (float | None, optional): Seconds before the command is killed. Defaults to None.
+
+        Raises:
+            subprocess.TimeoutExpired: The command did not finish within the timeout.
+
+        Returns:
+            subprocess.CompletedProcess: Result of the command (text output).
+        """
+        args = list(args)
+        ttl = self.ttl if ttl is None else ttl
+        if command_name(args) not in READ_ONLY_COMMANDS or ttl <= 0:
+            return self._execute(args, timeout)
+
+        key = tuple(args)
+        while True:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    self._stats[command_name(args)].cache_hits += 1
+                    return cached[1]
+
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    inflight = self._inflight[key] = (threading.Event(), [])
+                    break
+
+            # An identical call is running, share its result (or run again if it raised)
+            event, result = inflight
+            event.wait()
+            if result:
+                with self._lock:
+                    self._stats[command_name(args)].coalesced += 1
+                return result[0]
+
+        event, result = inflight
+        try:
+            result.append(self._execute(args, timeout))
+            if result[0].returncode == 0:
+                with self._lock:
+                    self._cache[key] = (time.monotonic() + ttl, result[0])
+        finally:
+            with self._lock:
+                self._inflight.pop(key)
+            event.set()
+
+        return result[0]
+
+    def job_info(self, job_ids: Iterable[str]) -> dict[str, dict]:
+        """State, pending reason and expected start time of jobs.
+
+        Job states are cached per job for :code:`ttl` seconds.  The job ids missing from the cache are batched with the ids requested by other threads within :code:`batch_window` seconds, so the scheduler receives one squeue call (and one sacct call for the jobs that left the queue) per batch.
+
+        Args:
+            job_ids (Iterable[str]): SLURM job ids (array tasks as <job>_<task>).
+
+        Returns:
+            dict[str, dict]: Information (state, reason, start) by job id, jobs unknown to the scheduler are missing.
+        """
+        job_ids = list(job_ids)
+
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                missing = [job_id for job_id in job_ids if self._job_expiry(job_id) <= now]
+                if not missing:
+                    return {
+                        job_id: self._jobs[job_id][1]
+                        for job_id in job_ids
+                        if self._jobs[job_id][1] is not None
+                    }
+
+                self._pending.update(missing)
+                if self._batching:
+                    self._cond.wait()
+                    continue
+                self._batching = True
+
+            # This thread queries the batch on behalf of every waiting thread
+            time.sleep(self.batch_window)
+            with self._cond:
+                batch, self._pending = sorted(self._pending), set()
+
+            info = {}
+            try:
+                info = squeue_info(batch, gateway=self, ttl=0)
+                missing = [job_id for job_id in batch if job_id not in info]
+                for job_id, state in sacct_states(missing, gateway=self, ttl=0).items():
+                    info[job_id] = {"state": state, "reason": "", "start": ""}
+            finally:
+                with self._cond:
+                    expiry = time.monotonic() + self.ttl
+                    for job_id in batch:
+                        self._jobs[job_id] = (expiry, info.get(job_id))
+                    self._batching = False
+                    self._cond.notify_all()
+
+    def invalidate(self, job_ids: Iterable[str] | None = None):
+        """Forget cached results, i.e. after a command changed the state of jobs.
+
+        Args:
+            job_ids (Iterable[str] | None, optional): Only forget the state of these jobs. Defaults to None (everything).
+        """
+        with self._cond:
+            if job_ids is None:
+                self._jobs.clear()
+            else:
+                for job_id in job_ids:
+                    self._jobs.pop(job_id, None)
+        if job_ids is None:
+            with self._lock:
+                self._cache.clear()
+
+    def stats(self) -> dict[str, CommandStats]:
+        """Counters of every command called so far.
+
+        Returns:
+            dict[str, CommandStats]: Counters by command name.
+        """
+        with self._lock:
+            return {name: CommandStats(**vars(stats)) for name, stats in self._stats.items()}
+
+    def _job_expiry(self, job_id: str) -> float:
+        cached = self._jobs.get(job_id)
+        return cached[0] if cached is not None else 0.0
+
+    def _acquire(self):
+        """Block until the rate limit allows one more call."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def _execute(self, args: list[str], timeout: float | None) -> subprocess.CompletedProcess:
+        """Run a command with rate limiting, retries on transient errors and latency counters."""
+        name = command_name(args)
+        backoff = Backoff(initial=0.5, factor=2.0, maximum=8.0)
+
+        for attempt in range(self.retries + 1):
+            self._acquire()
+            tic = time.perf_counter()
+            try:
+                result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+            finally:
+                elapsed = time.perf_counter() - tic
+                with self._lock:
+                    stats = self._stats[name]
+                    stats.calls += 1
+                    stats.seconds += elapsed
+                    stats.max_seconds = max(stats.max_seconds, elapsed)
+
+            transient = any([error in result.stderr for error in TRANSIENT_ERRORS])
+            if result.returncode == 0 or not transient or attempt == self.retries:
+                break
+            with self._lock:
+                self._stats[name].retries += 1
+            time.sleep(backoff.next())
+
+        if result.returncode != 0:
+            with self._lock:
+                self._stats[name].errors += 1
+
+        return result
+
+
+def command_name(args: Sequence[str]) -> str:
+    """Name of a scheduler command used for caching and counters (i.e. "squeue", "scontrol show").
+
+    Args:
+        args (Sequence[str]): Command and arguments.
+
+    Returns:
+        str: Command name.
+    """
+    name = os.path.basename(args[0])
+    if name == "scontrol" and len(args) > 1:
+        name = f"{name} {args[1]}"
+    return name
+
+
+# Gateway shared by the whole process
+GATEWAY = Gateway()
+
+
+def parse_job_id(stdout: str) -> str:
+    """Job id printed by sbatch.
+
+    Args:
+        stdout (str): Output of sbatch ("Submitted batch job 1234").
+
+    Raises:
+        ValueError: The output does not contain a job id.
+
+    Returns:
+        str: SLURM job id.
+    """
+    match = re.search(r"Submitted batch job (\d+)", stdout)
+    if match is None:
+        raise ValueError(f"No job id in the sbatch output: {stdout!r}")
+    return match.group(1)
+
+
+def base_job_id(job_id: str) -> str:
+    """Job id of a heterogeneous job component (<job>+<component>), the first component stands for the job.
+
+    Args:
+        job_id (str): Job id reported by squeue or sacct.
+
+    Returns:
+        str: Job id passed to sbatch-level commands.
+    """
+    return job_id.split("+")[0]
+
+
+def parse_states(stdout: str) -> dict[str, str]:
+    """Parse "<job id> <state>" lines (squeue and sacct output).
+
+    Args:
+        stdout (str): Command output.
+
+    Returns:
+        dict[str, str]: State by job id, reasons such as "CANCELLED by 1234" are dropped.
+    """
+    states = {}
+    for line in stdout.splitlines():
+        fields = line.replace("|", " ").split()
+        if len(fields) >= 2:
+            states.setdefault(base_job_id(fields[0]), fields[1].rstrip("+"))
+    return states
+
+
+def sbatch(
+    script_path: str, gateway: Gateway | None = None, options: Sequence[str] = ()
+) -> subprocess.CompletedProcess:
+    """Submit a batch script.
+
+    Args:
+        script_path (str): Path of the script.
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+        options (Sequence[str], optional): sbatch options that override the #SBATCH directives (i.e. --chdir). Defaults to ().
+
+    Returns:
+        subprocess.CompletedProcess: Result of sbatch.
+    """
+    return (gateway or GATEWAY).run(["sbatch", *options, script_path])
+
+
+def squeue_info(
+    job_ids: Iterable[str], gateway: Gateway | None = None, ttl: float | None = None
+) -> dict[str, dict]:
+    """State, pending reason and expected start time of the queued and running jobs among the job ids, with a single squeue call.
+
+    Args:
+        job_ids (Iterable[str]): SLURM job ids (array tasks as <job>_<task>).
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+        ttl (float | None, optional): Seconds a cached result is reused. Defaults to the gateway TTL.
+
+    Returns:
+        dict[str, dict]: Information (state, reason, start) by job id, jobs that left the queue are missing.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return {}
+
+    results = (gateway or GATEWAY).run(
+        ["squeue", "--noheader", "--array", "--format=%i|%T|%r|%S", f"--jobs={','.join(job_ids)}"],
+        ttl=ttl,
+    )
+    # squeue fails when none of the jobs are known anymore
+    if results.returncode != 0:
+        return {}
+
+    info = {}
+    for line in results.stdout.splitlines():
+        fields = line.strip().split("|")
+        if len(fields) == 4:
+            job_id, state, reason, start = fields
+            info.setdefault(base_job_id(job_id), {"state": state, "reason": reason, "start": start})
+    return info
+
+
+def squeue_states(job_ids: Iterable[str], gateway: Gateway | None = None) -> dict[str, str]:
+    """States of the queued and running jobs among the job ids, with a single squeue call.
+
+    Args:
+        job_ids (Iterable[str]): SLURM job ids (array tasks as <job>_<task>).
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+
+    Returns:
+        dict[str, str]: State by job id, jobs that left the queue are missing.
+    """
+    return {job_id: info["state"] for job_id, info in squeue_info(job_ids, gateway).items()}
+
+
+def sacct_states(
+    job_ids: Iterable[str], gateway: Gateway | None = None, ttl: float | None = None
+) -> dict[str, str]:
+    """Final states of finished jobs from the accounting database, with a single sacct call.
+
+    Args:
+        job_ids (Iterable[str]): SLURM job ids.
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+        ttl (float | None, optional): Seconds a cached result is reused. Defaults to the gateway TTL.
+
+    Returns:
+        dict[str, str]: State by job id, empty if accounting is not available.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return {}
+
+    try:
+        results = (gateway or GATEWAY).run(
+            [
+                "sacct",
+                "--noheader",
+                "--parsable2",
+                "--allocations",
+                "--format=JobID,State",
+                f"--jobs={','.join(job_ids)}",
+            ],
+            ttl=ttl,
+        )
+    except FileNotFoundError:
+        return {}
+    return parse_states(results.stdout) if results.returncode == 0 else {}
+
+
+def job_info(job_ids: Iterable[str], gateway: Gateway | None = None) -> dict[str, dict]:
+    """State, pending reason and expected start time of jobs, batched and cached per job by the gateway.
+
+    Args:
+        job_ids (Iterable[str]): SLURM job ids.
+        gateway (Gateway | None, optional): Gateway running the commands. Defaults to the shared gateway.
+
+    Returns:
+        dict[str, dict]: Information (state, reason, start) by job id, jobs unknown to the scheduler are missing.
+    """
+    return (gateway or GATEWAY).job_info(job_ids)
+
+
+def job_states(job_ids: Iterable[str], gateway: Gateway | None = None) -> dict[str, str]:
+    """Current state of every job: squeue for the live jobs, then sacct for the ones that left the queue.
+
+    Args:
+        job_ids (Iterable[str]): SLURM job ids.
+        gateway (Gateway | None, optional): Gateway running the commands. Defaults to the shared gateway.
+
+    Returns:
+        dict[str, str]: State by job id, "UNKNOWN" when neither command knows the job.
+    """
+    job_ids = list(job_ids)
+    info = job_info(job_ids, gateway)
+    return {job_id: info[job_id]["state"] if job_id in info else "UNKNOWN" for job_id in job_ids}
+
+
+def scancel(
+    job_ids: Iterable[str], gateway: Gateway | None = None, signal: str | None = None
+) -> subprocess.CompletedProcess | None:
+    """Cancel jobs with a single scancel call.
+
+    Args:
+        job_ids (Iterable[str]): SLURM job ids.
+        gateway (Gateway | None, optional): Gateway running the command. Defaults to the shared gateway.
+        signal (str | None, optional): Only send this signal (i.e. TERM) to the job steps, the jobs keep running. Defaults to None.
+
+    Returns:
+        subprocess.CompletedProcess | None: Result of scancel, None if there was nothing to cancel.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return None
+
+    gateway = gateway or GATEWAY
+    options = [f"--signal={signal}"] if signal else []
+    results = gateway.run(["scancel", *options, *job_ids])
+    gateway.invalidate(job_ids)
+    return results
+
+
+@app.command(help="**Query** the state of jobs through the gateway and print the call counters.")
+def states(
+    job_ids: Annotated[list[str], typer.Argument(help="SLURM job ids")],
+    repeat: Annotated[int, typer.Option(help="number of queries")] = 1,
+):
+    for _ in range(repeat):
+        for job_id, state in job_states(job_ids).items():
+            print(f"{job_id} {state}")
+    for name, stats in GATEWAY.stats().items():
+        print(
+            f"{name}: {stats.calls} calls, {stats.cache_hits} cached, {stats.coalesced} coalesced, "
+            f"{stats.retries} retries, {stats.errors} errors, {stats.mean_seconds * 1e3:.1f} ms mean"
+        )
+
+
+@app.command(help="**Cancel** jobs through the gateway (one scancel call).")
+def cancel(job_ids: Annotated[list[str], typer.Argument(help="SLURM job ids")]):
+    results = scancel(job_ids)
+    if results is not None and results.returncode != 0:
+        print(results.stderr.strip())
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,156 @@
+import itertools
+from collections.abc import Sequence
+
+from src.launch.hetjob import component_header
+from src.launch.hetjob import gpus_per_node
+from src.launch.hetjob import setup_command
+from src.launch.hetjob import SETUP_HEAD
+from src.launch.hetjob import SETUP_WORKERS
+
+# Parameters that change the resource request, variants that share them can share a job array
+SHAPE_KEYS = ("nodes", "cpus_per_task", "partition", "gres", "time")
+
+
+def expand_grid(base: dict, grid: dict[str, Sequence], repeats: int = 1) -> list[dict]:
+    """Every combination of the swept parameters applied to a base configuration.
+
+    Args:
+        base (dict): Configuration shared by all variants.
+        grid (dict[str, Sequence]): Values of each swept parameter.
+        repeats (int, optional): Number of times each combination is run. Defaults to 1.
+
+    Returns:
+        list[dict]: One configuration per variant, with its "variant" index and "repeat".
+    """
+    keys = list(grid)
+    combinations = itertools.product(*[grid[key] for key in keys], range(repeats))
+
+    variants = []
+    for index, values in enumerate(combinations):
+        variant = base | dict(zip(keys, values[:-1]))
+        variant["variant"] = index
+        variant["repeat"] = values[-1]
+        variants.append(variant)
+
+    return variants
+
+
+def shape(variant: dict) -> tuple:
+    """Resource request of a variant.
+
+    Args:
+        variant (dict): Variant configuration.
+
+    Returns:
+        tuple: Values of the resource parameters.
+    """
+    return tuple([variant[key] for key in SHAPE_KEYS])
+
+
+def group_variants(variants: list[dict], array: bool = True) -> list[list[dict]]:
+    """Split the variants into submissions.
+
+    With job arrays, the variants sharing a resource request are submitted together (one sbatch call per shape), otherwise each variant is its own submission.
+
+    Args:
+        variants (list[dict]): Variant configurations.
+        array (bool, optional): Group the variants into job arrays. Defaults to True.
+
+    Returns:
+        list[list[dict]]: Variants of each submission, the position in the list is the array task id.
+    """
+    if not array:
+        return [[variant] for variant in variants]
+
+    groups: dict[tuple, list[dict]] = {}
+    for variant in variants:
+        groups.setdefault(shape(variant), []).append(variant)
+
+    return list(groups.values())
+
+
+def log_path(sweep_id: str, group: int, task: int | str) -> str:
+    """SLURM log of a variant (the array task id is :code:`%a` in the sbatch script).
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+        group (int): Index of the submission.
+        task (int | str): Array task id.
+
+    Returns:
+        str: Path of the log.
+    """
+    return f"logs/{sweep_id}_g{group}_{task}.log"
+
+
+def variant_tmpdir(sweep_id: str, variant: dict) -> str:
+    """Node-local temporary directory of a variant, so array tasks sharing a node do not collide.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+        variant (dict): Variant configuration.
+
+    Returns:
+        str: Path of the directory.
+    """
+    return f"{variant['tmpdir']}/{sweep_id}_{variant['variant']}"
+
+
+def variant_setup(variant: dict) -> list[str]:
+    """The lines that start a single-job Ray cluster for one variant: the head on the first node and the workers on the others.
+
+    Args:
+        variant (dict): Variant configuration.
+
+    Returns:
+        list[str]: Shell lines.
+    """
+    config = variant | {"tmpdir": variant_tmpdir(variant["sweep_id"], variant)}
+
+    lines = [f"export SYNDEO_VARIANT={variant['variant']}"]
+    lines += setup_command(SETUP_HEAD, config, [])
+    lines += setup_command(
+        SETUP_WORKERS,
+        config,
+        [
+            "--address=$HEAD_NODE_ADDR",
+            f"--gpus={gpus_per_node(config['gres'])}",
+            "--index=1",
+        ],
+    )
+
+    return lines
+
+
+def sweep_values(sweep_id: str, group: int, variants: list[dict], command: str = "") -> dict:
+    """Values that fill the sweep template for one submission.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+        group (int): Index of the submission.
+        variants (list[dict]): Variants of the submission (same resource request).
+        command (str, optional): Command run on the batch host once the cluster is up. Defaults to "".
+
+    Returns:
+        dict: Replacement values for :code:`src/templates/template_sweep.sh`.
+    """
+    # One extra node for the Ray head
+    first = variants[0]
+    header = component_header(first | {"nodes": first["nodes"] + 1})
+
+    cases = []
+    for task, variant in enumerate(variants):
+        cases.append(f"    {task})")
+        cases += [f"        {line}" for line in variant_setup(variant | {"sweep_id": sweep_id})]
+        cases.append("        ;;")
+
+    return {
+        "job_name": f"{sweep_id}_g{group}",
+        "output": log_path(sweep_id, group, "%a"),
+        "array": f"0-{len(variants) - 1}",
+        "sweep_header": "\n".join(header),
+        "sweep_variants": "\n".join(cases),
+        "log": log_path(sweep_id, group, "${SLURM_ARRAY_TASK_ID}"),
+        "nodes": first["nodes"] + 1,
+        "command": command or "# no command, the variant ends once every node started",
+    }
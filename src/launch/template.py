@@ -0,0 +1,91 @@
+import functools
+import os
+import re
+
+# {KEY} placeholders, shell expansions such as ${VAR} are left alone
+PLACEHOLDER = re.compile(r"(?<!\$)\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+class Template:
+    """A template compiled once into literal text and placeholder tokens.
+
+    Rendering joins the literals with the values in a single pass, so the cost is linear in the size of the output rather than proportional to :code:`lines x keys` as with repeated :code:`str.replace`.  A value is never scanned for placeholders, so values cannot inject further substitutions.
+    """
+
+    def __init__(self, text: str, name: str = "<template>"):
+        """Compile a template.
+
+        Args:
+            text (str): Template text with :code:`{KEY}` placeholders.
+            name (str, optional): Name used in error messages. Defaults to "<template>".
+
+        Raises:
+            ValueError: The template contains placeholders that are not upper case (i.e. :code:`{gres}`).
+        """
+        parts = PLACEHOLDER.split(text)
+
+        self.name = name
+        self.literals: list[str] = parts[0::2]
+        self.keys: list[str] = parts[1::2]
+        self.placeholders: frozenset[str] = frozenset(self.keys)
+
+        unknown = sorted([key for key in self.placeholders if not key.isupper()])
+        if unknown:
+            raise ValueError(f"Unknown placeholders in {name}: {unknown}")
+
+    def render(self, values: dict) -> str:
+        """Fill the placeholders with values.
+
+        Args:
+            values (dict): Values by key, the keys are matched case-insensitively (job_name fills {JOB_NAME}).
+
+        Raises:
+            KeyError: A placeholder of the template has no value.
+
+        Returns:
+            str: Rendered text.
+        """
+        lookup = {str(key).upper(): value for key, value in values.items()}
+
+        missing = self.placeholders - lookup.keys()
+        if missing:
+            raise KeyError(f"Unresolved placeholders in {self.name}: {sorted(missing)}")
+
+        parts = [self.literals[0]]
+        for key, literal in zip(self.keys, self.literals[1:]):
+            parts.append(str(lookup[key]))
+            parts.append(literal)
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(path: str, mtime_ns: int) -> Template:
+    with open(path) as f:
+        return Template(f.read(), name=path)
+
+
+def load(path: str) -> Template:
+    """Compiled template of a file, cached until the file is modified.
+
+    Args:
+        path (str): Path of the template.
+
+    Returns:
+        Template: Compiled template.
+    """
+    return _compile(path, os.stat(path).st_mtime_ns)
+
+
+def render_file(values: dict, src: str, dest: str):
+    """Render a template file to a destination file.
+
+    The template is fully rendered before the destination is opened, so an unresolved placeholder never leaves a partial script behind.
+
+    Args:
+        values (dict): Values by key.
+        src (str): Path of the template.
+        dest (str): Path of the rendered file.
+    """
+    text = load(src).render(values)
+    with open(dest, "w") as f:
+        f.write(text)
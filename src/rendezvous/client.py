@@ -0,0 +1,142 @@
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from urllib.parse import urlparse
+
+import typer
+from typing_extensions import Annotated
+
+from src.validation.wait import Backoff
+from src.validation.wait import read_when_ready
+
+# Typer application CLI
+app = typer.Typer(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    rich_markup_mode="markdown",
+)
+
+
+def put(url: str, key: str, value: str, timeout: float = 60):
+    """Publish a value to a rendezvous.
+
+    Two protocols are supported:
+
+    * :code:`file://<dir>`: the value is written to :code:`<dir>/<key>.txt` on a shared file system.  It is written to a temporary file and renamed into place, so a reader never sees a partially written value.
+    * :code:`http://<host>:<port>/<id>`: the value is sent to a :code:`RendezvousServer`.
+
+    Args:
+        url (str): Location of the rendezvous.
+        key (str): Key to publish (i.e. ray_head_node_addr).
+        value (str): Value of the key.
+        timeout (float, optional): Time to keep retrying an unreachable server in seconds. Defaults to 60.
+    """
+    if urlparse(url).scheme in ("", "file"):
+        directory = os.path.dirname(file_path(url, key))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{key}.", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{value}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path(url, key))
+        return
+
+    request = urllib.request.Request(f"{url}/{key}", data=value.encode(), method="PUT")
+    retry(lambda: urllib.request.urlopen(request, timeout=10).close(), timeout)
+
+
+def get(url: str, key: str, timeout: float | None = None) -> str:
+    """Block until a value is published to a rendezvous and return it.
+
+    Args:
+        url (str): Location of the rendezvous (see :code:`put()`).
+        key (str): Key to read.
+        timeout (float | None, optional): Maximum time to wait in seconds, None waits forever. Defaults to None.
+
+    Raises:
+        TimeoutError: The value was not published within the timeout.
+
+    Returns:
+        str: Value of the key.
+    """
+    if urlparse(url).scheme in ("", "file"):
+        return read_when_ready(file_path(url, key), timeout=timeout)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    backoff = Backoff(maximum=5.0)
+
+    while True:
+        remaining = 30.0 if deadline is None else deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Timeout reached: {timeout}")
+
+        # Long-poll the server, it answers as soon as the key is published
+        try:
+            wait = min(remaining, 30.0)
+            with urllib.request.urlopen(f"{url}/{key}?wait={wait}", timeout=wait + 10) as reply:
+                return reply.read().decode()
+        except urllib.error.HTTPError as error:
+            if error.code != 404:
+                raise
+        except (urllib.error.URLError, OSError):
+            time.sleep(min(backoff.next(), max(remaining, 0)))  # server not reachable yet
+
+
+def file_path(url: str, key: str) -> str:
+    """Path of the file holding a key of a file rendezvous.
+
+    Args:
+        url (str): Location of the rendezvous (:code:`file://<dir>`).
+        key (str): Key to read or write.
+
+    Returns:
+        str: Path to the file.
+    """
+    directory = url.removeprefix("file://")
+    directory = os.path.expandvars(os.path.expanduser(directory))
+    return os.path.join(directory, f"{key}.txt")
+
+
+def retry(call: Callable[[], None], timeout: float):
+    """Retry a call that fails because the server is not reachable (yet).
+
+    Args:
+        call (Callable[[], None]): Call to retry.
+        timeout (float): Time to keep retrying in seconds.
+    """
+    deadline = time.monotonic() + timeout
+    backoff = Backoff(maximum=5.0)
+
+    while True:
+        try:
+            return call()
+        except (urllib.error.URLError, OSError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(backoff.next())
+
+
+@app.command(help="**Publish** a value to the rendezvous.")
+def publish(
+    url: Annotated[str, typer.Argument(help="file://<dir> or http://<host>:<port>/<id>")],
+    key: Annotated[str, typer.Argument(help="key to publish")],
+    value: Annotated[str, typer.Argument(help="value of the key")],
+):
+    put(url, key, value)
+
+
+@app.command(help="**Wait** for a value of the rendezvous and print it.")
+def lookup(
+    url: Annotated[str, typer.Argument(help="file://<dir> or http://<host>:<port>/<id>")],
+    key: Annotated[str, typer.Argument(help="key to read")],
+    timeout: Annotated[float, typer.Option(help="timeout in seconds")] = 600,
+):
+    print(get(url, key, timeout=timeout))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,143 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+# Longest time a single GET blocks before the client has to ask again
+MAX_WAIT: float = 30.0
+
+
+class RendezvousStore:
+    """Thread-safe key/value store where readers can block until a key is published."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.condition = threading.Condition()
+
+    def put(self, key: str, value: str):
+        """Publish a value and wake up every reader waiting on it.
+
+        Args:
+            key (str): Key to publish.
+            value (str): Value of the key.
+        """
+        with self.condition:
+            self.values[key] = value
+            self.condition.notify_all()
+
+    def get(self, key: str, timeout: float = 0) -> str | None:
+        """Read a value, blocking until it is published or the timeout expires.
+
+        Args:
+            key (str): Key to read.
+            timeout (float, optional): Maximum time to block in seconds. Defaults to 0.
+
+        Returns:
+            str | None: Value of the key, None if it was not published in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while key not in self.values:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+            return self.values[key]
+
+
+class RendezvousHandler(BaseHTTPRequestHandler):
+    """HTTP interface of the store: :code:`PUT /<key>` publishes, :code:`GET /<key>?wait=<secs>` long-polls."""
+
+    server: "RendezvousHTTPServer"
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        value = self.rfile.read(length).decode()
+        self.server.store.put(urlparse(self.path).path, value)
+        self._reply(200, "OK")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+        value = self.server.store.get(url.path, timeout=min(wait, MAX_WAIT))
+
+        if value is None:
+            self._reply(404, "Not Found")
+        else:
+            self._reply(200, value)
+
+    def log_message(self, format, *args):
+        pass  # keep the CLI output clean
+
+    def _reply(self, code: int, body: str):
+        data = body.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class RendezvousHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    store: RendezvousStore
+
+
+class RendezvousServer:
+    """Small HTTP key/value endpoint started by the CLI.  The Ray head publishes its address to it and the workers block on it until the address is available.
+
+    Refs:
+        * https://docs.python.org/3/library/http.server.html
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 0):
+        """Initialize the server.
+
+        Args:
+            host (str, optional): Interface to bind to. Defaults to "0.0.0.0" (reachable from the compute nodes).
+            port (int, optional): Port to bind to, 0 picks a free port. Defaults to 0.
+        """
+        self.httpd = RendezvousHTTPServer((host, port), RendezvousHandler)
+        self.httpd.store = RendezvousStore()
+        self.thread: threading.Thread | None = None
+
+    @property
+    def store(self) -> RendezvousStore:
+        return self.httpd.store
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def url(self, host: str | None = None) -> str:
+        """URL the clients should use to reach this server.
+
+        Args:
+            host (str | None, optional): Host name to advertise. Defaults to the fully qualified name of this machine.
+
+        Returns:
+            str: Base URL of the server.
+        """
+        return f"http://{host or socket.getfqdn()}:{self.port}"
+
+    def start(self):
+        """Serve requests from a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
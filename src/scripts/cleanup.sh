@@ -1,8 +0,0 @@
-#!/bin/bash
-
-rm -rf ./tmp/*.txt
-rm -rf ./logs/*.log
-rm -rf ./logs/*.txt
-rm -rf ./save
-rm -rf ~/ray_tmp/
-rm -f *.out
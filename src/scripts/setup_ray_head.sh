@@ -11,10 +11,22 @@
 #                                       (default=~/tmp)
 #                 --dir:                directory to export head's IP address, if setting up a
 #                                       multi-partition Ray Cluster, this should be a shared
-#                                       directory where all nodes can access (default=/tmp)
+#                                       directory where all nodes can access (no export if unset)
+#                 --rendezvous:         rendezvous to publish the head's IP address to, either
+#                                       file://<dir> (same as --dir) or http://<host>:<port>/<id>
+#                 --het_group:          heterogeneous job component to run the head on
+#                 --autoscaling_config: Ray autoscaler configuration launching worker jobs
+#                                       (no autoscaler if empty)
 #                 --container_src:      source path of the container to use
 #                 --container_tgt:      path of the file system to copy the container source for
 #                                       the head node
+#                 --container_cache:    node-local directory caching container images between
+#                                       runs (defaults to .syndeo_cache next to --container_tgt)
+#                 --container_cache_images: number of images kept in the cache (least recently
+#                                       used images are evicted)
+#                 --container_fanout:   how the image reaches the nodes: copy (every node reads the
+#                                       shared file system), chunked (parallel reads), tree (nodes
+#                                       that have the image serve it to others) or sbcast
 #
 #        AUTHOR:  William Li, william.li@ll.mit.edu
 #       COMPANY:  MIT Lincoln Laboratory
@@ -27,17 +39,32 @@
 CONTAINER_SETUP=0
 CONTAINER_SYNC=0                                # 0=<no sync>,  1=<sync containers>
 CONTAINER_TGT_PATH="/tmp/ray_container.sif"     # target path to copy container to
+CONTAINER_CACHE=""                              # defaults to .syndeo_cache next to the target
+CONTAINER_CACHE_IMAGES=3                        # images kept in the node-local cache
+CONTAINER_FANOUT="copy"                         # copy|chunked|tree|sbcast
 EXPORT_IP_DIR="$HOME/tmp"
+EXPORT_INFO=0                                   # 0=<no export head IP>,    1=<export head IP>
+RENDEZVOUS=""                                   # defaults to file://$EXPORT_IP_DIR
+HET_GROUP=""                                    # heterogeneous job component (empty=not hetjob)
+AUTOSCALING_CONFIG=""                           # Ray autoscaler configuration (empty=no autoscaler)
 TMPDIR="/tmp"                                   # should be same as RAY_TMPDIR
 RAY_TMPDIR="/tmp"                               # should be same as RAY_TMPDIR
+STEP_TIMEOUT=300                                # seconds before a setup step (mkdir) is aborted
+READY_TIMEOUT=600                               # seconds to wait for the head to accept connections
 
 function info {
 cat <<BANNER
 setup_ray_head.sh:
     -td     --tmpdir            # temporary directory for writing Ray cluster files
     -d      --dir               # target directory for head IP info
+    -rv     --rendezvous        # rendezvous to publish the head IP info to
+    -hg     --het_group         # heterogeneous job component to run on
+    -ac     --autoscaling_config # Ray autoscaler configuration (empty for none)
     -cs     --container_src     # specify path to a source container to use
     -ct     --container_tgt     # location to copy container onto target file system
+    -cc     --container_cache   # node-local cache directory for container images
+    -ci     --container_cache_images # images kept in the node-local cache
+    -cf     --container_fanout  # copy|chunked|tree|sbcast distribution of the container
 BANNER
 }
 
@@ -51,7 +78,20 @@ do
 
         -d=*|--dir=*)
             EXPORT_IP_DIR="${i#*=}"
-            mkdir -p "$EXPORT_IP_DIR"
+            EXPORT_INFO=1
+            ;;
+
+        -rv=*|--rendezvous=*)
+            RENDEZVOUS="${i#*=}"
+            EXPORT_INFO=1
+            ;;
+
+        -hg=*|--het_group=*)
+            HET_GROUP="${i#*=}"
+            ;;
+
+        -ac=*|--autoscaling_config=*)
+            AUTOSCALING_CONFIG="${i#*=}"
             ;;
 
         -cs=*|--container_src=*)
@@ -64,6 +104,18 @@ do
             CONTAINER_SETUP=1
             ;;
 
+        -cc=*|--container_cache=*)
+            CONTAINER_CACHE="${i#*=}"
+            ;;
+
+        -ci=*|--container_cache_images=*)
+            CONTAINER_CACHE_IMAGES="${i#*=}"
+            ;;
+
+        -cf=*|--container_fanout=*)
+            CONTAINER_FANOUT="${i#*=}"
+            ;;
+
         -h|--help)
             info
             exit 0
@@ -77,30 +129,43 @@ do
     esac
 done
 
+# The shared directory is a file rendezvous
+if [ -z "$RENDEZVOUS" ]; then
+    RENDEZVOUS="file://$EXPORT_IP_DIR"
+fi
+
+# The autoscaler runs on the head and imports the Syndeo node provider (src.launch.provider)
+AUTOSCALING_OPTS=""
+if [ -n "$AUTOSCALING_CONFIG" ]; then
+    AUTOSCALING_OPTS="--autoscaling-config=$AUTOSCALING_CONFIG"
+    export PYTHONPATH="$PWD${PYTHONPATH:+:$PYTHONPATH}"
+fi
+
+# Heterogeneous jobs address each component by group (default: the whole allocation)
+JOB_NODELIST=$SLURM_JOB_NODELIST
+CPUS_PER_TASK=$SLURM_CPUS_PER_TASK
+HET_OPTS=""
+if [ -n "$HET_GROUP" ]; then
+    JOB_NODELIST_VAR="SLURM_JOB_NODELIST_HET_GROUP_$HET_GROUP"
+    CPUS_PER_TASK_VAR="SLURM_CPUS_PER_TASK_HET_GROUP_$HET_GROUP"
+    JOB_NODELIST=${!JOB_NODELIST_VAR}
+    CPUS_PER_TASK=${!CPUS_PER_TASK_VAR}
+    HET_OPTS="--het-group=$HET_GROUP"
+fi
 
 # Initialization
 # --------------------------------------------------------------------------------------------------
 # Generate a list of node IP addresses for the nodes
-NODES=$(scontrol show hostnames "$SLURM_JOB_NODELIST")
+NODES=$(scontrol show hostnames "$JOB_NODELIST")
 NODES_ARRAY=($NODES)
 
 # Save the head node's IP address and port as environment variables
 export HEAD_NODE_ID=${NODES_ARRAY[0]}
-export HEAD_NODE_IP=$(srun --nodes=1 --ntasks=1 -w "$HEAD_NODE_ID" hostname --ip-address)
+export HEAD_NODE_IP=$(srun $HET_OPTS --nodes=1 --ntasks=1 -w "$HEAD_NODE_ID" hostname --ip-address)
 export HEAD_NODE_PORT=$(python -c 'import socket; s=socket.socket(); s.bind(("", 0)); print(s.getsockname()[1]); s.close()')
 export HEAD_NODE_ADDR="$HEAD_NODE_IP:$HEAD_NODE_PORT"
 
-# Export head node information
-# Note: This is only needed for multi-partition SLURM setup.  The reason is because the head node's IP address needs to be placed in a location where all of the worker nodes can access and connect do.  The default /tmp will likely not work because it is only locally accessible.
-echo "$HEAD_NODE_IP"   | tee $EXPORT_IP_DIR/ray_head_node_ip.txt
-echo "$HEAD_NODE_ADDR" | tee $EXPORT_IP_DIR/ray_head_node_addr.txt
-
 cat <<BANNER
-----------------------------------------------------------------------------------------------
-                                Ray Head - Exporting Head Info
-----------------------------------------------------------------------------------------------
-HEAD_NODE_IP PATH       = $EXPORT_IP_DIR/ray_head_node_ip.txt
-HEAD_NODE_ADDR PATH     = $EXPORT_IP_DIR/ray_head_node_addr.txt
 
 ----------------------------------------------------------------------------------------------
                                 Ray Head - Starting Node Setup
@@ -112,10 +177,15 @@ HEAD Node Address       = ${HEAD_NODE_ADDR}
 HEAD Node TMPDIR        = ${RAY_TMPDIR}
 BANNER
 
+# Readiness barriers: every step waits for its completion signal instead of a fixed sleep.  The time spent waiting is reported next to the fixed sleeps (FIXED_SLEEP) they replace.
+BARRIER_START=$(date +%s%N)
+FIXED_SLEEP=0
+
 # Make temporary directories if they do no exists (will hang unless you add & to command!)
 # srun mkdir -p ${RAY_TMPDIR} &
-srun --nodes=1 --ntasks=1 --nodelist=$NODES_ARRAY mkdir -p ${RAY_TMPDIR} &
-sleep 5s    # wait for previous command to finish
+timeout $STEP_TIMEOUT srun $HET_OPTS --nodes=1 --ntasks=1 --nodelist=$NODES_ARRAY mkdir -p ${RAY_TMPDIR} &
+wait $!     # wait for previous command to finish
+FIXED_SLEEP=$((FIXED_SLEEP + 5))
 
 
 if [ $CONTAINER_SYNC = 1 ]; then
@@ -125,15 +195,31 @@ cat <<BANNER
 ----------------------------------------------------------------------------------------------
 CONTAINER_SRC_PATH      = ${CONTAINER_SRC_PATH}
 CONTAINER_TGT_PATH      = ${CONTAINER_TGT_PATH}
-Copying $CONTAINER_SRC_PATH -> $CONTAINER_TGT_PATH...
+CONTAINER_CACHE         = ${CONTAINER_CACHE:-${CONTAINER_TGT_PATH%/*}/.syndeo_cache}
+CONTAINER_FANOUT        = ${CONTAINER_FANOUT}
+Copying $CONTAINER_SRC_PATH -> $CONTAINER_TGT_PATH (skipped if cached)...
 BANNER
     # Make container target directories if they do not exist
     echo " --------------------------------[ Creating a Directory ]--------------------------------"
-    srun --nodes=1 --ntasks=1 --nodelist=$HEAD_NODE_ID mkdir -p ${CONTAINER_TGT_PATH%/*} &
-    sleep 5s    # wait for previous command to finish
+    timeout $STEP_TIMEOUT srun $HET_OPTS --nodes=1 --ntasks=1 --nodelist=$HEAD_NODE_ID \
+        mkdir -p ${CONTAINER_TGT_PATH%/*} &
+    wait $!     # wait for previous command to finish
+    FIXED_SLEEP=$((FIXED_SLEEP + 5))
     echo " --------------------------------[ Copying a Container ]--------------------------------"
-    srun --nodes=1 --ntasks=1 --nodelist=$HEAD_NODE_ID \
-        cp -rf  $CONTAINER_SRC_PATH $CONTAINER_TGT_PATH
+    # The image is copied to a node-local cache only if the node does not already hold it, then linked to the target
+    FANOUT_LOG=$(mktemp)
+    FANOUT_START=$(date +%s%N)
+    if [ "$CONTAINER_FANOUT" = "sbcast" ]; then
+        sbcast --force --preserve $CONTAINER_SRC_PATH ${CONTAINER_TGT_PATH}.sbcast
+    fi
+    srun $HET_OPTS --nodes=1 --ntasks=1 --nodelist=$HEAD_NODE_ID \
+        python -m src.container.fanout sync $CONTAINER_SRC_PATH $CONTAINER_TGT_PATH \
+            --strategy=$CONTAINER_FANOUT \
+            --cache-dir="$CONTAINER_CACHE" \
+            --max-images=$CONTAINER_CACHE_IMAGES | tee "$FANOUT_LOG"
+    python -m src.container.fanout summary "$FANOUT_LOG" \
+        --wall-ms=$(( ($(date +%s%N) - FANOUT_START) / 1000000 ))
+    rm -f "$FANOUT_LOG"
 fi
 
 
@@ -159,6 +245,7 @@ fi
 #   --min-worker-port: minimum int for port (defaults to 10002)
 #   --max-worker-port: maximum int for port (defaults to 19999)
 #   --temp-dir: manually specify the root temporary dir of the Ray process, only works when –head is specified
+#   --autoscaling-config: run the Ray autoscaler on the head with this cluster configuration
 #
 # References:
 #   https://slurm.schedmd.com/srun.html
@@ -171,10 +258,10 @@ cat <<BANNER
 ----------------------------------------------------------------------------------------------
 BANNER
     # Run with container
-    srun \
+    srun $HET_OPTS \
         --nodes=1 \
         --ntasks=1 \
-        --cpus-per-task=${SLURM_CPUS_PER_TASK} \
+        --cpus-per-task=${CPUS_PER_TASK} \
         --nodelist=$HEAD_NODE_ID \
         --export=ALL,TMPDIR=${TMPDIR},RAY_TMPDIR=${RAY_TMPDIR} \
     singularity exec \
@@ -204,10 +291,10 @@ cat <<BANNER
 ----------------------------------------------------------------------------------------------
 BANNER
     # Run on host system
-    srun \
+    srun $HET_OPTS \
         --nodes=1 \
         --ntasks=1 \
-        --cpus-per-task=${SLURM_CPUS_PER_TASK} \
+        --cpus-per-task=${CPUS_PER_TASK} \
         --nodelist=$HEAD_NODE_ID \
         --export=ALL,TMPDIR=${TMPDIR},RAY_TMPDIR=${RAY_TMPDIR} \
     ray start \
@@ -222,7 +309,41 @@ BANNER
         --num-gpus 0 \
         --min-worker-port 10002 \
         --max-worker-port 19999 \
-        --temp-dir $RAY_TMPDIR &
+        --temp-dir $RAY_TMPDIR \
+        $AUTOSCALING_OPTS &
+fi
+HEAD_PID=$!
+
+# Block until the GCS of the head accepts connections (fails early if the head exits)
+if ! python -m src.validation.ready port "$HEAD_NODE_ADDR" --pid=$HEAD_PID --timeout=$READY_TIMEOUT; then
+    echo "Error: Ray head did not accept connections on $HEAD_NODE_ADDR!"
+    exit 1
 fi
+FIXED_SLEEP=$((FIXED_SLEEP + 5))
+BARRIER_MS=$(( ($(date +%s%N) - BARRIER_START) / 1000000 ))
 
-sleep 5s
+# Export head node information
+# Note: This is only needed for multi-partition SLURM setup.  The reason is because the head node's IP address needs to be placed in a location where all of the worker nodes can access and connect do.  The default /tmp will likely not work because it is only locally accessible.  A heterogeneous job passes the address to its workers directly and does not export it.
+# The values are published atomically and only once the head accepts connections, so a worker never reads a partially written address or connects too early.
+if [ $EXPORT_INFO = 1 ]; then
+python -m src.rendezvous.client publish "$RENDEZVOUS" ray_head_node_ip "$HEAD_NODE_IP"
+python -m src.rendezvous.client publish "$RENDEZVOUS" ray_head_node_addr "$HEAD_NODE_ADDR"
+
+cat <<BANNER
+----------------------------------------------------------------------------------------------
+                                Ray Head - Exporting Head Info
+----------------------------------------------------------------------------------------------
+HEAD_NODE_RENDEZVOUS    = $RENDEZVOUS
+HEAD_NODE_IP KEY        = ray_head_node_ip
+HEAD_NODE_ADDR KEY      = ray_head_node_addr
+BANNER
+fi
+
+cat <<BANNER
+----------------------------------------------------------------------------------------------
+                                Ray Head - Ready
+----------------------------------------------------------------------------------------------
+HEAD Node Address       = ${HEAD_NODE_ADDR}
+READINESS WAIT (ms)     = ${BARRIER_MS}
+FIXED SLEEP (ms)        = $((FIXED_SLEEP * 1000))
+BANNER
@@ -9,11 +9,23 @@
 #       OPTIONS:  --tmpdir:             a temporary directory to write files to (host system)
 #                 --gpus:               GPUs per worker to allocate
 #                 --dir:                directory for reading head's IP address
+#                 --rendezvous:         rendezvous to read the head's IP address from, either
+#                                       file://<dir> (same as --dir) or http://<host>:<port>/<id>
+#                 --address:            head's IP address (instead of reading it from --dir)
+#                 --het_group:          heterogeneous job component to run the workers on
+#                 --timeout:            seconds to wait for the head's IP address to be exported
 #                 --index:              used to determine where worker indexing should start,
 #                                       (index=0 for all nodes) or (index=1 to remove first node)
 #                 --container_src:      source path of the container to use
 #                 --container_tgt:      path of the file system to copy the container source for
 #                                       the head node
+#                 --container_cache:    node-local directory caching container images between
+#                                       runs (defaults to .syndeo_cache next to --container_tgt)
+#                 --container_cache_images: number of images kept in the cache (least recently
+#                                       used images are evicted)
+#                 --container_fanout:   how the image reaches the nodes: copy (every node reads the
+#                                       shared file system), chunked (parallel reads), tree (nodes
+#                                       that have the image serve it to others) or sbcast
 #
 #        AUTHOR:  William Li, william.li@ll.mit.edu
 #       COMPANY:  MIT Lincoln Laboratory
@@ -25,14 +37,21 @@
 # --------------------------------------------------------------------------------------------------
 IMPORT_DIR="$HOME/tmp"                          # defaults to ~/tmp
 IMPORT_INFO=0                                   # 0=<no import head IP>,    1=<import head IP>
+RENDEZVOUS=""                                   # defaults to file://$IMPORT_DIR
+IMPORT_TIMEOUT=600                              # seconds to wait for the head IP to be exported
 CONTAINER_SETUP=0                               # 0=<no container>,         1=<container>
 CONTAINER_SYNC=0                                # 0=<no sync>,              1=<sync>
 CONTAINER_TGT_PATH="/tmp/ray_container.sif"     # target path to copy container to
+CONTAINER_CACHE=""                              # defaults to .syndeo_cache next to the target
+CONTAINER_CACHE_IMAGES=3                        # images kept in the node-local cache
+CONTAINER_FANOUT="copy"                         # copy|chunked|tree|sbcast
 N_GPU_PER_WORKER=0                              # number of GPUs to assign per worker
+HET_GROUP=""                                    # heterogeneous job component (empty=not hetjob)
 START_IDX=0                     # start index of nodes to allocate to worker from Slurm
-FINAL_IDX=(${SLURM_NTASKS})     # final index of nodes to allocate to worker from Slurm
 TMPDIR="/tmp"
 RAY_TMPDIR="/tmp"
+STEP_TIMEOUT=300                                # seconds before a setup step (mkdir) is aborted
+READY_TIMEOUT=600                               # seconds to wait for the workers to join the head
 
 function info {
 cat <<BANNER
@@ -40,9 +59,16 @@ setup_ray_workers.sh:
     -td     --tmpdir            # temporary directory for writing Ray cluster files
     -g      --gpus              # GPUs per worker
     -d      --dir               # Import directory for reading head IP info.
+    -rv     --rendezvous        # Rendezvous to read the head IP info from.
+    -a      --address           # Head IP address (instead of reading it from --dir).
+    -hg     --het_group         # Heterogeneous job component to run on.
+    -t      --timeout           # Seconds to wait for the head IP info to be exported.
     -i      --index             # Indexing (index=0 for all nodes) | (index=1 to remove first node)
     -cs     --container_src     # specify path to a source container to use
     -ct     --container_tgt     # location to copy container onto target file system
+    -cc     --container_cache   # node-local cache directory for container images
+    -ci     --container_cache_images # images kept in the node-local cache
+    -cf     --container_fanout  # copy|chunked|tree|sbcast distribution of the container
 BANNER
 }
 
@@ -64,6 +90,23 @@ do
             IMPORT_INFO=1
             ;;
 
+        -rv=*|--rendezvous=*)
+            RENDEZVOUS="${i#*=}"
+            IMPORT_INFO=1
+            ;;
+
+        -a=*|--address=*)
+            HEAD_NODE_ADDR="${i#*=}"
+            ;;
+
+        -hg=*|--het_group=*)
+            HET_GROUP="${i#*=}"
+            ;;
+
+        -t=*|--timeout=*)
+            IMPORT_TIMEOUT="${i#*=}"
+            ;;
+
         -i=*|--index=*)
             START_IDX="${i#*=}"
             ;;
@@ -78,6 +121,18 @@ do
             CONTAINER_SETUP=1
             ;;
 
+        -cc=*|--container_cache=*)
+            CONTAINER_CACHE="${i#*=}"
+            ;;
+
+        -ci=*|--container_cache_images=*)
+            CONTAINER_CACHE_IMAGES="${i#*=}"
+            ;;
+
+        -cf=*|--container_fanout=*)
+            CONTAINER_FANOUT="${i#*=}"
+            ;;
+
         -h|--help)
             info
             exit 0
@@ -91,16 +146,44 @@ do
     esac
 done
 
+# The shared directory is a file rendezvous
+if [ -z "$RENDEZVOUS" ]; then
+    RENDEZVOUS="file://$IMPORT_DIR"
+fi
+
+# Heterogeneous jobs address each component by group (default: the whole allocation)
+JOB_NODELIST=$SLURM_JOB_NODELIST
+CPUS_PER_TASK=$SLURM_CPUS_PER_TASK
+N_TASKS=$SLURM_NTASKS
+EXCLUDE_OPTS="--exclude=$HEAD_NODE_ID"
+HET_OPTS=""
+if [ -n "$HET_GROUP" ]; then
+    JOB_NODELIST_VAR="SLURM_JOB_NODELIST_HET_GROUP_$HET_GROUP"
+    CPUS_PER_TASK_VAR="SLURM_CPUS_PER_TASK_HET_GROUP_$HET_GROUP"
+    N_TASKS_VAR="SLURM_NTASKS_HET_GROUP_$HET_GROUP"
+    JOB_NODELIST=${!JOB_NODELIST_VAR}
+    CPUS_PER_TASK=${!CPUS_PER_TASK_VAR}
+    N_TASKS=${!N_TASKS_VAR}
+    EXCLUDE_OPTS=""                             # the head runs in a different component
+    HET_OPTS="--het-group=$HET_GROUP"
+fi
+FINAL_IDX=(${N_TASKS})                          # final index of nodes to allocate to worker from Slurm
+
 # Import head node information
 # Note: This is only needed for multi-partition SLURM configurations where the worker nodes need to read the address of the head node and connect to it.
 # --------------------------------------------------------------------------------------------------
 if [ $IMPORT_INFO = 1 ]; then
-HEAD_NODE_ADDR=$(<$IMPORT_DIR/ray_head_node_addr.txt)
+# Block until the head has published its address (the workers may start before the head)
+HEAD_NODE_ADDR=$(python -m src.rendezvous.client lookup "$RENDEZVOUS" ray_head_node_addr --timeout=$IMPORT_TIMEOUT)
+if [ -z "$HEAD_NODE_ADDR" ]; then
+    echo "Error: Ray head address not found at $RENDEZVOUS after $IMPORT_TIMEOUT seconds!"
+    exit 1
+fi
 cat <<BANNER
 ----------------------------------------------------------------------------------------------
                             Ray Workers - Importing Ray Head Info
 ----------------------------------------------------------------------------------------------
-HEAD_NODE_PATH          = $IMPORT_DIR/ray_head_node_addr.txt
+HEAD_NODE_RENDEZVOUS    = $RENDEZVOUS
 HEAD_NODE_ADDR          = ${HEAD_NODE_ADDR}
 BANNER
 fi
@@ -115,8 +198,13 @@ WORKER Node TMPDIR      = ${TMPDIR}
 Generating Directory: ${TMPDIR} across all nodes...
 BANNER
 
-NODES=$(scontrol show hostnames "$SLURM_JOB_NODELIST")
+# Readiness barriers: every step waits for its completion signal instead of a fixed sleep.  The time spent waiting is reported next to the fixed sleeps (FIXED_SLEEP) they replace.
+BARRIER_START=$(date +%s%N)
+FIXED_SLEEP=0
+
+NODES=$(scontrol show hostnames "$JOB_NODELIST")
 NODES_ARRAY=($NODES)
+MKDIR_PIDS=()
 for ((  i=$START_IDX; i<$FINAL_IDX; i++ ))
 do
     # Get the worker ID
@@ -124,14 +212,16 @@ do
 
     # Perform operations on each worker ID
     # worker_node_ip=$(srun --nodes=1 --ntasks=1 -w "$worker_node_id" hostname --ip-address)
-    srun --nodes=1 --ntasks=1 -w "$worker_node_id" mkdir -p ${TMPDIR} &
+    timeout $STEP_TIMEOUT srun $HET_OPTS --nodes=1 --ntasks=1 -w "$worker_node_id" mkdir -p ${TMPDIR} &
+    MKDIR_PIDS+=($!)
     echo "WORKER Node ID $i       = $worker_node_id"
 done
 
-sleep 5s
+wait "${MKDIR_PIDS[@]}"     # wait for every directory to be created
+FIXED_SLEEP=$((FIXED_SLEEP + 5))
 
 # TODO: Determine whether the head node needs to be excluded
-let "WORKER_N_NODES=(${SLURM_NTASKS} - ${START_IDX})"
+let "WORKER_N_NODES=(${N_TASKS} - ${START_IDX})"
 
 if [ $CONTAINER_SYNC = 1 ]; then
 cat <<BANNER
@@ -141,21 +231,37 @@ cat <<BANNER
 CONTAINER_SRC_PATH      = ${CONTAINER_SRC_PATH}
 CONTAINER_TGT_PATH      = ${CONTAINER_TGT_PATH}
 NODE_CONTAINER_DIR      = ${CONTAINER_TGT_PATH%/*}
-Copying $CONTAINER_SRC_PATH -> $CONTAINER_TGT_PATH...
+CONTAINER_CACHE         = ${CONTAINER_CACHE:-${CONTAINER_TGT_PATH%/*}/.syndeo_cache}
+CONTAINER_FANOUT        = ${CONTAINER_FANOUT}
+Copying $CONTAINER_SRC_PATH -> $CONTAINER_TGT_PATH (skipped if cached)...
 BANNER
     # Make container target directories if they do not exist
     echo " ----------------------[ Creating Directories for Each Container ]-----------------------"
-    srun --nodes=${WORKER_N_NODES} --ntasks=${WORKER_N_NODES} --exclude=$HEAD_NODE_ID \
+    timeout $STEP_TIMEOUT srun $HET_OPTS --nodes=${WORKER_N_NODES} --ntasks=${WORKER_N_NODES} \
+        $EXCLUDE_OPTS \
         mkdir -p ${CONTAINER_TGT_PATH%/*} &
-    sleep 5s
+    wait $!     # wait for previous command to finish
+    FIXED_SLEEP=$((FIXED_SLEEP + 5))
     echo " ---------------------------------[ Copying Containers ]---------------------------------"
-    srun \
+    # Each image is copied to a node-local cache only if the node does not already hold it, then linked to the target.  The fan-out strategy decides where the bytes come from (shared file system, a peer or sbcast).
+    FANOUT_LOG=$(mktemp)
+    FANOUT_START=$(date +%s%N)
+    if [ "$CONTAINER_FANOUT" = "sbcast" ]; then
+        sbcast --force --preserve $CONTAINER_SRC_PATH ${CONTAINER_TGT_PATH}.sbcast
+    fi
+    srun $HET_OPTS \
         --nodes=${WORKER_N_NODES} \
         --ntasks=${WORKER_N_NODES} \
         --cpus-per-task=1 \
-        --exclude=$HEAD_NODE_ID \
-        cp -rf $CONTAINER_SRC_PATH $CONTAINER_TGT_PATH
-    # sbcast --force $CONTAINER_SRC_PATH $CONTAINER_TGT_PATH
+        $EXCLUDE_OPTS \
+        python -m src.container.fanout sync $CONTAINER_SRC_PATH $CONTAINER_TGT_PATH \
+            --strategy=$CONTAINER_FANOUT \
+            --rendezvous="$RENDEZVOUS" \
+            --cache-dir="$CONTAINER_CACHE" \
+            --max-images=$CONTAINER_CACHE_IMAGES | tee "$FANOUT_LOG"
+    python -m src.container.fanout summary "$FANOUT_LOG" \
+        --wall-ms=$(( ($(date +%s%N) - FANOUT_START) / 1000000 ))
+    rm -f "$FANOUT_LOG"
 fi
 
 # Start Ray workers
@@ -175,6 +281,7 @@ fi
 #   --num-cpus: the number of CPUs on this node
 #   --num-gpus: the number of GPUs on this node
 #   --temp-dir: manually specify the root temporary dir of the Ray process, only works when –head is specified
+#   --labels: node labels, the SLURM job of the node lets `watch` match Ray nodes to jobs
 #
 # References:
 #   https://slurm.schedmd.com/srun.html
@@ -188,11 +295,11 @@ cat <<BANNER
 BANNER
 
     # Run with container
-    srun \
+    srun $HET_OPTS \
         --nodes=${WORKER_N_NODES} \
         --ntasks=${WORKER_N_NODES} \
-        --cpus-per-task=${SLURM_CPUS_PER_TASK} \
-        --exclude=$HEAD_NODE_ID \
+        --cpus-per-task=${CPUS_PER_TASK} \
+        $EXCLUDE_OPTS \
         --export=ALL,TMPDIR=${TMPDIR},RAY_TMPDIR=${RAY_TMPDIR} \
     singularity exec \
         --tmp-sandbox \
@@ -204,8 +311,9 @@ BANNER
                 -v \
                 --address $HEAD_NODE_ADDR \
                 --block \
-                --num-cpus ${SLURM_CPUS_PER_TASK} \
-                --num-gpus ${N_GPU_PER_WORKER} &
+                --num-cpus ${CPUS_PER_TASK} \
+                --num-gpus ${N_GPU_PER_WORKER} \
+                --labels "{\"syndeo.io/job-id\": \"${SLURM_JOB_ID}\"}" &
 else
 cat <<BANNER
 ----------------------------------------------------------------------------------------------
@@ -214,18 +322,35 @@ cat <<BANNER
 BANNER
 
     # Run on host system
-    srun \
+    srun $HET_OPTS \
         --nodes=${WORKER_N_NODES} \
         --ntasks=${WORKER_N_NODES} \
-        --cpus-per-task=${SLURM_CPUS_PER_TASK} \
-        --exclude=$HEAD_NODE_ID \
+        --cpus-per-task=${CPUS_PER_TASK} \
+        $EXCLUDE_OPTS \
         --export=ALL,TMPDIR=${TMPDIR},RAY_TMPDIR=${RAY_TMPDIR} \
     ray start \
         -v \
         --address $HEAD_NODE_ADDR \
         --block \
-        --num-cpus ${SLURM_CPUS_PER_TASK} \
-        --num-gpus ${N_GPU_PER_WORKER} &
+        --num-cpus ${CPUS_PER_TASK} \
+        --num-gpus ${N_GPU_PER_WORKER} \
+        --labels "{\"syndeo.io/job-id\": \"${SLURM_JOB_ID}\"}" &
 fi
 
-sleep 10s
+# Block until every worker joined the head (nodes counted by their job id label)
+WORKER_HOSTS=$(echo ${NODES_ARRAY[@]:$START_IDX} | tr ' ' ',')
+if ! python -m src.validation.ready nodes "$HEAD_NODE_ADDR" "$WORKER_HOSTS" $WORKER_N_NODES \
+        --timeout=$READY_TIMEOUT --job-id="$SLURM_JOB_ID"; then
+    echo "Error: Ray workers did not join $HEAD_NODE_ADDR after $READY_TIMEOUT seconds!"
+fi
+FIXED_SLEEP=$((FIXED_SLEEP + 10))
+BARRIER_MS=$(( ($(date +%s%N) - BARRIER_START) / 1000000 ))
+
+cat <<BANNER
+----------------------------------------------------------------------------------------------
+                            Ray Workers - Ready
+----------------------------------------------------------------------------------------------
+WORKER Nodes            = ${WORKER_N_NODES}
+READINESS WAIT (ms)     = ${BARRIER_MS}
+FIXED SLEEP (ms)        = $((FIXED_SLEEP * 1000))
+BANNER
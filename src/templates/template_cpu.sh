@@ -14,6 +14,7 @@
 #                 --ntasks:             number of parallel tasks allowed (should match --nodes)
 #                 --ntasks-per-node:    number of tasks to assign per node
 #                 --time:               maximum time before killing job "days-hours:min:secs"
+#                 --signal:             SIGTERM to the Ray workers before the time limit (drain)
 #                 --constraint:         type of hardware to use
 #                 --partition:          type of partition used
 #                 --gres:               gpu resource request
@@ -32,6 +33,7 @@
 #SBATCH --ntasks={NODES}
 #SBATCH --ntasks-per-node=1
 #SBATCH --time {TIME}
+#SBATCH --signal=TERM@{DRAIN_NOTICE}
 #SBATCH --partition={PARTITION}
 
 # Local variable initialization
@@ -40,10 +42,14 @@ export HOSTENV={HOSTENV}
 # Setup Ray head
 # --tmpdir            # temporary directory to write files to (host system)
 # --gpus              # GPUs per worker
-# --dir               # directory to import head info from
+# --rendezvous        # rendezvous to import head info from
+# --timeout           # seconds to wait for the head info to be exported
 # --index             # index to start node allocation (0 means all nodes)
 # --container_src     # specify path to a source container to use
 # --container_tgt     # location to copy container onto target file system
+# --container_cache   # node-local cache directory for container images
+# --container_cache_images # images kept in the node-local cache
+# --container_fanout  # copy|chunked|tree|sbcast distribution of the container
 
 case $HOSTENV in
     "container")
@@ -54,17 +60,22 @@ case $HOSTENV in
         source src/scripts/setup_ray_workers.sh \
             --tmpdir={TMPDIR} \
             --gpus=0 \
-            --dir={RAY_IP_DIR} \
+            --rendezvous={RENDEZVOUS} \
+            --timeout={HEAD_TIMEOUT} \
             --index=0 \
             --container_src={CONTAINER_SRC_PATH} \
             --container_tgt={CONTAINER_TGT_PATH} \
+            --container_cache={CONTAINER_CACHE} \
+            --container_cache_images={CONTAINER_CACHE_IMAGES} \
+            --container_fanout={CONTAINER_FANOUT} \
             ;;
 
     "bare_metal")
         source src/scripts/setup_ray_workers.sh \
             --tmpdir={TMPDIR} \
             --gpus=0 \
-            --dir={RAY_IP_DIR} \
+            --rendezvous={RENDEZVOUS} \
+            --timeout={HEAD_TIMEOUT} \
             --index=0
             ;;
 
@@ -78,6 +89,6 @@ esac
 # Provides verification of Ray runtimes.
 # Argument 1: Slurm log file.
 # Argument 2: Number of nodes to check for.
-python src/validation/nodes.py "logs/{OUTPUT}.log" {NODES}
+python -m src.validation.nodes "logs/{OUTPUT}.log" {NODES}
 
 sleep infinity
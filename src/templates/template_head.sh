@@ -38,7 +38,8 @@
 HOSTENV={HOSTENV}
 
 # Setup Ray head
-# --dir: directory to export the head's IP information to
+# --rendezvous: rendezvous to publish the head's IP information to
+# --autoscaling_config: Ray autoscaler configuration (empty without autoscaling)
 # --container: path to container that holds the environment code to use
 
 case $HOSTENV in
@@ -49,15 +50,19 @@ case $HOSTENV in
         # Setup Ray Head
         source src/scripts/setup_ray_head.sh \
             --tmpdir={TMPDIR} \
-            --dir={RAY_IP_DIR} \
+            --rendezvous={RENDEZVOUS} \
             --container_src={CONTAINER_SRC_PATH} \
             --container_tgt={CONTAINER_TGT_PATH} \
+            --container_cache={CONTAINER_CACHE} \
+            --container_cache_images={CONTAINER_CACHE_IMAGES} \
+            --container_fanout={CONTAINER_FANOUT} \
             ;;
 
     "bare_metal")
         source src/scripts/setup_ray_head.sh \
             --tmpdir={TMPDIR} \
-            --dir={RAY_IP_DIR}
+            --rendezvous={RENDEZVOUS} \
+            --autoscaling_config={AUTOSCALING_CONFIG}
             ;;
 
     *)
@@ -70,6 +75,6 @@ esac
 # Provides verification of Ray runtimes.
 # Argument 1: Slurm log file.
 # Argument 2: Number of nodes to check for.
-python src/validation/nodes.py "logs/{OUTPUT}.log" {NODES}
+python -m src.validation.nodes "logs/{OUTPUT}.log" {NODES}
 
 sleep infinity
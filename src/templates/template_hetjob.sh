@@ -0,0 +1,49 @@
+#!/bin/bash
+
+#===================================================================================================
+#
+#         USAGE:  sbatch <file>.sh
+#
+#   DESCRIPTION:  Setup a multi-node, multi-partition Ray cluster as a single heterogeneous job.
+#                 Component 0 is the Ray head, every following component is a group of Ray
+#                 workers.  SLURM co-schedules all components, so the cluster starts atomically
+#                 and the head address is passed to the workers directly (no shared files).
+#
+#       OPTIONS:  --exclusive:          sets hardware to be exclusive to this job
+#                 --job-name:           name of the job
+#                 --output:             output file name
+#                 --cpus-per-task:      number of cpus set per task
+#                 --nodes:              number of nodes to assign to this job
+#                 --ntasks:             number of parallel tasks allowed (should match --nodes)
+#                 --ntasks-per-node:    number of tasks to assign per node
+#                 --time:               maximum time before killing job "days-hours:min:secs"
+#                 --partition:          type of partition used
+#                 --gres:               gpu resource request
+#                 hetjob:               separates the components of a heterogeneous job
+#
+#    REFERENCES:  https://slurm.schedmd.com/heterogeneous_jobs.html
+#===================================================================================================
+
+#SBATCH --job-name {JOB_NAME}
+#SBATCH --output logs/{OUTPUT}.log
+{HETJOB_COMPONENTS}
+
+# Setup Ray head (component 0), then Ray workers (components 1..N)
+# --tmpdir            # temporary directory to write files to (host system)
+# --het_group         # heterogeneous job component to run on
+# --address           # head address to connect the workers to
+# --gpus              # GPUs per worker
+# --index             # index to start node allocation (0 means all nodes)
+# --container_src     # specify path to a source container to use
+# --container_tgt     # location to copy container onto target file system
+
+{HETJOB_SETUP}
+
+# Verification
+# --------------------------------------------------------------------------------------------------
+# Provides verification of Ray runtimes.
+# Argument 1: Slurm log file.
+# Argument 2: Number of nodes to check for (all components).
+python -m src.validation.nodes "logs/{OUTPUT}.log" {NODES}
+
+sleep infinity
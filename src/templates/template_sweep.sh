@@ -0,0 +1,46 @@
+#!/bin/bash
+
+#===================================================================================================
+#
+#         USAGE:  sbatch <file>.sh
+#
+#   DESCRIPTION:  One submission of a parameter sweep.  Every variant that shares the same resource
+#                 request is an array task of this job.  Each task starts a single-job Ray
+#                 cluster (head on the first node, workers on the others), waits for every node,
+#                 then runs the sweep command.
+#
+#       OPTIONS:  --job-name:           name of the job
+#                 --output:             output file name (%a is the array task id)
+#                 --array:              array task ids, one per variant
+#                 --exclusive:          sets hardware to be exclusive to this job
+#                 --cpus-per-task:      number of cpus set per task
+#                 --nodes:              number of nodes to assign to this job (workers + head)
+#                 --ntasks:             number of parallel tasks allowed (should match --nodes)
+#                 --ntasks-per-node:    number of tasks to assign per node
+#                 --time:               maximum time before killing job "days-hours:min:secs"
+#                 --partition:          type of partition used
+#                 --gres:               gpu resource request
+#
+#    REFERENCES:  https://slurm.schedmd.com/job_array.html
+#===================================================================================================
+
+#SBATCH --job-name {JOB_NAME}
+#SBATCH --output {OUTPUT}
+#SBATCH --array={ARRAY}
+{SWEEP_HEADER}
+
+# Setup the Ray cluster of this variant
+case ${SLURM_ARRAY_TASK_ID:-0} in
+{SWEEP_VARIANTS}
+esac
+
+# Verification
+# --------------------------------------------------------------------------------------------------
+# Provides verification of Ray runtimes.
+# Argument 1: Slurm log file.
+# Argument 2: Number of nodes to check for (workers + head).
+python -m src.validation.nodes "{LOG}" {NODES}
+
+# Sweep command
+# --------------------------------------------------------------------------------------------------
+{COMMAND}
@@ -0,0 +1,86 @@
+import time
+
+# Label set by setup_ray_workers.sh on every worker node: the SLURM job the node runs in
+JOB_ID_LABEL = "syndeo.io/job-id"
+
+# Job states of a worker job that ended before its time limit without being asked to
+LOST_STATES = frozenset(
+    ["BOOT_FAIL", "DEADLINE", "FAILED", "NODE_FAIL", "OUT_OF_MEMORY", "PREEMPTED"]
+)
+
+
+class NodeCensus:
+    """Alive Ray nodes of a cluster by SLURM job, used to notice worker nodes that died.
+
+    All nodes are read with one call to the GCS of the head (no driver is connected and no node is probed) and the result is cached for :code:`interval` seconds, so checking the cluster often does not load the head.
+
+    Refs:
+        * https://docs.ray.io/en/latest/ray-core/fault_tolerance/nodes.html
+    """
+
+    def __init__(self, address: str, interval: float = 5.0, timeout: float = 5.0):
+        """Initialize the census.
+
+        Args:
+            address (str): Address of the Ray head (<host>:<port>).
+            interval (float, optional): Minimum seconds between two GCS queries. Defaults to 5.0.
+            timeout (float, optional): Seconds a GCS query may take. Defaults to 5.0.
+        """
+        self.address = address
+        self.interval = interval
+        self.timeout = timeout
+        self.queries: int = 0
+        self.nodes: dict[str, str] | None = None
+        self._client = None
+        self._checked: float | None = None
+
+    def refresh(self, force: bool = False) -> dict[str, str] | None:
+        """Query the GCS unless the cached nodes are recent enough.
+
+        Args:
+            force (bool, optional): Ignore the cache. Defaults to False.
+
+        Returns:
+            dict[str, str] | None: SLURM job id (empty for nodes without the label, i.e. the head) by id of the alive nodes, None if the GCS did not answer.
+        """
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.interval:
+            return self.nodes
+
+        # Imported here so the commands that never query the GCS do not pay for importing Ray
+        from ray._raylet import GcsClient
+
+        self._checked = now
+        self.queries += 1
+        try:
+            if self._client is None:
+                self._client = GcsClient(address=self.address)
+            infos = self._client.get_all_node_info(timeout=self.timeout)
+        except Exception:
+            self._client = None
+            self.nodes = None
+            return self.nodes
+
+        # state 0 is ALIVE (GcsNodeInfo.GcsNodeState), dead nodes are kept by the GCS for a while
+        self.nodes = {
+            node_id.hex(): info["labels"].get(JOB_ID_LABEL.encode(), b"").decode()
+            for node_id, info in infos.items()
+            if info["state"] == 0
+        }
+        return self.nodes
+
+    def by_job(self) -> dict[str, set[str]] | None:
+        """Ids of the alive nodes grouped by SLURM job.
+
+        Returns:
+            dict[str, set[str]] | None: Node ids by job id, None if the GCS did not answer.
+        """
+        nodes = self.refresh()
+        if nodes is None:
+            return None
+
+        jobs: dict[str, set[str]] = {}
+        for node_id, job_id in nodes.items():
+            if job_id:
+                jobs.setdefault(job_id, set()).add(node_id)
+        return jobs
@@ -0,0 +1,116 @@
+import os
+from collections.abc import Iterable
+
+RAY_RUNTIME_STARTED = "Ray runtime started"
+
+
+class LogFollower:
+    """Incrementally follow a SLURM log file and count marker occurrences.
+
+    The follower remembers the byte offset it has read up to, so each call to :code:`poll()` only reads the bytes that were appended since the previous call.  A short tail of the previous read is carried over so that a marker split across two reads is still counted exactly once.  If the log is truncated or deleted and recreated (different inode), the offset and counts are reset and the file is read from the beginning.
+
+    Refs:
+        * https://man7.org/linux/man-pages/man2/stat.2.html
+    """
+
+    def __init__(self, log_path: str, markers: str | Iterable[str], chunk_size: int = 1 << 20):
+        """Initialize the follower.
+
+        Args:
+            log_path (str): Path to the log file to follow.  The file does not need to exist yet.
+            markers (str | Iterable[str]): One or more markers to count in the log.
+            chunk_size (int, optional): Maximum number of bytes read per system call. Defaults to 1 MiB.
+        """
+        if isinstance(markers, str):
+            markers = [markers]
+
+        self.log_path = log_path
+        self.chunk_size = chunk_size
+        self.markers = {marker: marker.encode() for marker in markers}
+        self.counts: dict[str, int] = {marker: 0 for marker in self.markers}
+
+        # Bookkeeping for the incremental reads
+        self.offset: int = 0
+        self.bytes_read: int = 0
+        self._inode: int | None = None
+        self._tail: bytes = b""
+        self._tail_size: int = max([len(m) for m in self.markers.values()], default=1) - 1
+
+    def reset(self):
+        """Forget everything read so far and start again from the beginning of the file."""
+        self.offset = 0
+        self._inode = None
+        self._tail = b""
+        self.counts = {marker: 0 for marker in self.markers}
+
+    def poll(self) -> dict[str, int]:
+        """Read any newly appended bytes and update the marker counts.
+
+        Returns:
+            dict[str, int]: Number of occurrences of each marker in the current log file.
+        """
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            if self._inode is not None:
+                self.reset()  # log was removed, wait for it to be recreated
+            return self.counts
+
+        # Detect log recreation or truncation
+        if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self.offset):
+            self.reset()
+        self._inode = stat.st_ino
+
+        # Nothing new to read
+        if stat.st_size == self.offset:
+            return self.counts
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self.offset)
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                self._consume(data)
+
+        return self.counts
+
+    def count(self, marker: str) -> int:
+        """Number of occurrences of a marker after polling the log.
+
+        Args:
+            marker (str): The marker to count.  Must be one of the markers given at construction.
+
+        Returns:
+            int: Number of occurrences of the marker.
+        """
+        return self.poll()[marker]
+
+    def found(self, marker: str) -> bool:
+        """Check whether a marker has been written to the log.
+
+        Args:
+            marker (str): The marker to look for.  Must be one of the markers given at construction.
+
+        Returns:
+            bool: True if the marker has been found.
+        """
+        return self.count(marker) > 0
+
+    def _consume(self, data: bytes):
+        """Count markers in a newly read block of bytes.
+
+        Args:
+            data (bytes): Bytes appended to the log since the last read.
+        """
+        buffer = self._tail + data
+        n_tail = len(self._tail)
+
+        for marker, encoded in self.markers.items():
+            # Only count matches that end inside the new data (older matches were already counted)
+            start = max(0, n_tail - len(encoded) + 1)
+            self.counts[marker] += buffer.count(encoded, start)
+
+        self.offset += len(data)
+        self.bytes_read += len(data)
+        self._tail = buffer[-self._tail_size :] if self._tail_size > 0 else b""
@@ -0,0 +1,110 @@
+import time
+from collections.abc import Iterable
+
+from src.launch.slurm import GATEWAY
+from src.launch.slurm import job_info
+from src.launch.slurm import TERMINAL_STATES
+
+# Pending reasons of jobs that the scheduler will never start as submitted
+UNSATISFIABLE_REASONS = frozenset(
+    [
+        "AssocMaxNodesPerJobLimit",
+        "AssocMaxWallDurationPerJobLimit",
+        "BadConstraints",
+        "DependencyNeverSatisfied",
+        "InvalidAccount",
+        "InvalidQOS",
+        "PartitionConfig",
+        "PartitionNodeLimit",
+        "PartitionTimeLimit",
+        "QOSMaxNodePerJobLimit",
+        "QOSMaxWallDurationPerJobLimit",
+    ]
+)
+
+
+class JobFailedError(RuntimeError):
+    """A monitored job died or can never start."""
+
+
+class JobMonitor:
+    """Scheduler state of submitted jobs, used to stop waiting on jobs that will never start their nodes.
+
+    The state of all monitored jobs is queried in batch through the SLURM gateway (one squeue call, plus one sacct call for the jobs that left the queue) and cached for :code:`interval` seconds, so checking it on every log change does not load the scheduler.
+    """
+
+    def __init__(self, job_ids: Iterable[str], interval: float = 5.0):
+        """Initialize the monitor.
+
+        Args:
+            job_ids (Iterable[str]): SLURM job ids to monitor.
+            interval (float, optional): Minimum seconds between two scheduler queries. Defaults to 5.0.
+        """
+        self.job_ids = list(job_ids)
+        self.interval = interval
+        self.queries: int = 0
+        self.info: dict[str, dict] = {}
+        self._checked: float | None = None
+
+    def refresh(self, force: bool = False) -> dict[str, dict]:
+        """Query the scheduler unless the cached state is recent enough.
+
+        Args:
+            force (bool, optional): Ignore the cache. Defaults to False.
+
+        Returns:
+            dict[str, dict]: Information (state, reason, start) by job id.
+        """
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.interval:
+            return self.info
+        self._checked = now
+        self.queries += 1
+
+        if force:
+            GATEWAY.invalidate(self.job_ids)
+        info = job_info(self.job_ids)
+
+        # A job briefly unknown to both commands (i.e. right after sbatch) keeps its last state
+        self.info |= info
+        return self.info
+
+    def check(self, job_ids: Iterable[str] | None = None):
+        """Raise if one of the jobs died or can never start.
+
+        Args:
+            job_ids (Iterable[str] | None, optional): Only check these jobs. Defaults to every monitored job.
+
+        Raises:
+            JobFailedError: A job reached a terminal state or is pending for a reason that never clears.
+        """
+        info = self.refresh()
+        for job_id in self.job_ids if job_ids is None else job_ids:
+            job = info.get(job_id)
+            if job is None:
+                continue
+            if job["state"] in TERMINAL_STATES - {"UNKNOWN"}:
+                raise JobFailedError(f"Job {job_id} is {job['state']} before its nodes started")
+            if job["state"] == "PENDING" and job["reason"] in UNSATISFIABLE_REASONS:
+                raise JobFailedError(f"Job {job_id} can never start: {job['reason']}")
+
+    def describe(self, job_id: str) -> str:
+        """Short description of the last known state of a job (i.e. for a progress bar).
+
+        Args:
+            job_id (str): SLURM job id.
+
+        Returns:
+            str: State with the pending reason and the expected start time if known.
+        """
+        job = self.info.get(job_id)
+        if job is None:
+            return "SUBMITTED"
+
+        text = job["state"]
+        if job["state"] == "PENDING":
+            if job["reason"] not in ("", "None"):
+                text += f" ({job['reason']})"
+            if job["start"] not in ("", "N/A", "Unknown"):
+                text += f", start {job['start']}"
+        return text
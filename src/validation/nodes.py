@@ -1,10 +1,12 @@
-import time
-from os.path import exists
-
 import typer
 from rich.console import Console
 from typing_extensions import Annotated
 
+from src.validation.logs import LogFollower
+from src.validation.logs import RAY_RUNTIME_STARTED
+from src.validation.wait import wait_for_count
+from src.validation.wait import wait_for_file
+
 
 # Typer application CLI
 console = Console()
@@ -15,30 +17,12 @@ app = typer.Typer(
 
 
 def check_log(log_path: str, timeout: int = 30):
-    timeout_counter: float = 0
-
-    while exists(log_path) is False:
-        if timeout_counter > timeout:
-            raise ValueError(f"Timeout reached: {timeout}")
-
-        time.sleep(0.25)
-        timeout_counter += 0.25
+    wait_for_file(log_path, timeout=timeout)
 
 
 def check_nodes(log_path: str, requested_nodes: int, timeout: int = 300):
-    active_nodes: int = 0
-    timeout_counter: float = 0
-
-    while active_nodes < requested_nodes:
-        if timeout_counter > timeout:
-            raise ValueError(f"Timeout reached: {timeout}")
-
-        with open(log_path) as f:
-            content = f.read()
-            active_nodes = content.count("Ray runtime started")
-
-        time.sleep(0.25)
-        timeout_counter += 0.25
+    follower = LogFollower(log_path, RAY_RUNTIME_STARTED)
+    wait_for_count(follower, RAY_RUNTIME_STARTED, requested_nodes, timeout=timeout)
 
 
 @app.command(help="**Verify** Ray nodes are up and running.")
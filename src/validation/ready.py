@@ -0,0 +1,183 @@
+import os
+import socket
+
+import typer
+from typing_extensions import Annotated
+
+from src.validation.health import NodeCensus
+from src.validation.wait import Backoff
+from src.validation.wait import wait_for
+
+# Typer application CLI
+app = typer.Typer(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    rich_markup_mode="markdown",
+)
+
+
+def port_open(host: str, port: int, timeout: float = 1.0) -> bool:
+    """Check whether a TCP port accepts connections.
+
+    Args:
+        host (str): Host name or IP address.
+        port (int): Port number.
+        timeout (float, optional): Connection timeout in seconds. Defaults to 1.0.
+
+    Returns:
+        bool: True if a connection could be established.
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def pid_alive(pid: int) -> bool:
+    """Check whether a process is still running.
+
+    Args:
+        pid (int): Process ID.
+
+    Returns:
+        bool: True if the process exists.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def wait_for_port(address: str, timeout: float | None = None, pid: int | None = None):
+    """Block until a service listens on an address (i.e. the GCS of the Ray head).
+
+    Args:
+        address (str): Address formatted as <host>:<port>.
+        timeout (float | None, optional): Maximum time to wait in seconds, None waits forever. Defaults to None.
+        pid (int | None, optional): Process that starts the service, the wait fails as soon as it exits. Defaults to None.
+
+    Raises:
+        RuntimeError: The process exited before the port opened.
+        TimeoutError: The port did not open within the timeout.
+    """
+    host, port = address.rsplit(":", 1)
+
+    def ready() -> bool:
+        if port_open(host, int(port)):
+            return True
+        if pid is not None and not pid_alive(pid):
+            raise RuntimeError(f"Process {pid} exited before {address} opened")
+        return False
+
+    wait_for(ready, [], timeout=timeout, backoff=Backoff(initial=0.1, maximum=2.0))
+
+
+def short_name(hostname: str) -> str:
+    return hostname.split(".")[0]
+
+
+def alive_nodes(address: str, hosts: list[str]) -> int:
+    """Count the alive Ray nodes running on a set of hosts.
+
+    Args:
+        address (str): Address of the Ray head (<host>:<port>).
+        hosts (list[str]): Host names to count, compared without the domain.
+
+    Returns:
+        int: Number of alive nodes.
+    """
+    # Imported here so the port probe does not pay for importing Ray
+    import ray
+
+    hosts = {short_name(host) for host in hosts}
+    return len(
+        [
+            node
+            for node in ray.nodes()
+            if node["Alive"] and short_name(node["NodeManagerHostname"]) in hosts
+        ]
+    )
+
+
+def job_nodes(census: NodeCensus, job_id: str) -> int:
+    """Count the alive Ray nodes of a SLURM job (labelled by setup_ray_workers.sh).
+
+    Args:
+        census (NodeCensus): Census of the nodes of the Ray head.
+        job_id (str): SLURM job id.
+
+    Returns:
+        int: Number of alive nodes, 0 if the head did not answer.
+    """
+    return len((census.by_job() or {}).get(job_id, set()))
+
+
+def wait_for_nodes(
+    address: str, hosts: list[str], count: int, timeout: float | None = None, job_id: str = ""
+) -> int:
+    """Block until a number of Ray nodes on a set of hosts joined the cluster.
+
+    Args:
+        address (str): Address of the Ray head (<host>:<port>).
+        hosts (list[str]): Host names the nodes run on.
+        count (int): Number of nodes to wait for.
+        timeout (float | None, optional): Maximum time to wait in seconds, None waits forever. Defaults to None.
+        job_id (str, optional): Count the nodes labelled with this SLURM job instead of the nodes on the hosts (no driver connects). Defaults to "".
+
+    Raises:
+        TimeoutError: The nodes did not join within the timeout.
+
+    Returns:
+        int: Number of alive nodes.
+    """
+    nodes = 0
+    census = NodeCensus(address, interval=0)
+
+    def reached() -> bool:
+        nonlocal nodes
+        nodes = job_nodes(census, job_id) if job_id else alive_nodes(address, hosts)
+        return nodes >= count
+
+    backoff = Backoff(initial=0.5, maximum=5.0)
+    if job_id:
+        wait_for(reached, [], timeout=timeout, backoff=backoff)
+        return nodes
+
+    import ray
+
+    ray.init(address=address, logging_level="ERROR", log_to_driver=False)
+    try:
+        wait_for(reached, [], timeout=timeout, backoff=backoff)
+    finally:
+        ray.shutdown()
+
+    return nodes
+
+
+@app.command(help="**Wait** for a port to accept connections.")
+def port(
+    address: Annotated[str, typer.Argument(help="<host>:<port>")],
+    timeout: Annotated[float, typer.Option(help="timeout in seconds")] = 600,
+    pid: Annotated[int, typer.Option(help="fail when this process exits first (0 to ignore)")] = 0,
+):
+    wait_for_port(address, timeout=timeout, pid=pid or None)
+
+
+@app.command(help="**Wait** for Ray nodes on the given hosts to join the cluster.")
+def nodes(
+    address: Annotated[str, typer.Argument(help="<host>:<port> of the Ray head")],
+    hosts: Annotated[str, typer.Argument(help="comma separated host names")],
+    count: Annotated[int, typer.Argument(help="number of nodes to wait for")],
+    timeout: Annotated[float, typer.Option(help="timeout in seconds")] = 600,
+    job_id: Annotated[
+        str, typer.Option(help="count the nodes labelled with this SLURM job instead")
+    ] = "",
+):
+    print(wait_for_nodes(address, hosts.split(","), count, timeout=timeout, job_id=job_id))
+
+
+if __name__ == "__main__":
+    app()
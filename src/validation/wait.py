@@ -0,0 +1,289 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+
+import typer
+from typing_extensions import Annotated
+
+from src.validation.logs import LogFollower
+
+# Typer application CLI
+app = typer.Typer(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    rich_markup_mode="markdown",
+)
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class Backoff:
+    """Exponential backoff intervals used between checks when no change notification arrives."""
+
+    def __init__(self, initial: float = 0.05, factor: float = 2.0, maximum: float = 1.0):
+        """Initialize the backoff.
+
+        Args:
+            initial (float, optional): First interval in seconds. Defaults to 0.05.
+            factor (float, optional): Growth factor applied after every interval. Defaults to 2.0.
+            maximum (float, optional): Largest interval in seconds. Defaults to 1.0.
+        """
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+        self.interval = initial
+
+    def next(self) -> float:
+        """Return the current interval and grow the next one.
+
+        Returns:
+            float: Interval in seconds.
+        """
+        interval = self.interval
+        self.interval = min(self.interval * self.factor, self.maximum)
+        return interval
+
+    def reset(self):
+        """Start again from the initial interval (i.e. after something changed)."""
+        self.interval = self.initial
+
+
+class FileWatcher:
+    """Block until one of the watched directories changes.
+
+    On Linux the watcher uses inotify so that waiting costs no CPU and wakes up as soon as a file is created or written.  inotify does not report changes made by other clients of a network file system (NFS/Lustre), so every wait is also bounded by an exponential backoff interval and callers must re-check their condition after each wake up.  When inotify is not available the watcher simply sleeps for the backoff interval (polling).
+
+    Refs:
+        * https://man7.org/linux/man-pages/man7/inotify.7.html
+    """
+
+    def __init__(self, paths: Iterable[str], use_inotify: bool = True):
+        """Initialize the watcher.
+
+        Args:
+            paths (Iterable[str]): Files to watch.  The parent directory of each file is watched so that creation is also reported.
+            use_inotify (bool, optional): Use inotify when the kernel supports it. Defaults to True.
+        """
+        self.directories = sorted({os.path.dirname(os.path.abspath(p)) for p in paths})
+        self.fd: int | None = None
+        self.events: int = 0
+
+        if use_inotify:
+            self._open_inotify()
+
+    @property
+    def inotify(self) -> bool:
+        """True if change notifications are used, False if the watcher falls back to polling."""
+        return self.fd is not None
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a watched directory changes or the timeout expires.
+
+        Args:
+            timeout (float): Maximum time to block in seconds.
+
+        Returns:
+            bool: True if a change notification was received.
+        """
+        if self.fd is None:
+            time.sleep(timeout)
+            return False
+
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return False
+
+        # Drain all pending events, only the wake up matters
+        try:
+            while os.read(self.fd, 4096):
+                self.events += 1
+        except BlockingIOError:
+            pass
+
+        return True
+
+    def close(self):
+        """Release the inotify file descriptor."""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _open_inotify(self):
+        """Create an inotify instance and watch every directory that exists.  Leaves :code:`fd` as None on failure."""
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            return
+
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+
+        if fd < 0:
+            return
+
+        watches = 0
+        for directory in self.directories:
+            if os.path.isdir(directory):
+                wd = libc.inotify_add_watch(fd, directory.encode(), IN_MASK)
+                watches += wd >= 0
+
+        if watches == 0:
+            os.close(fd)
+            return
+
+        self.fd = fd
+
+
+def wait_for(
+    condition: Callable[[], bool],
+    paths: Iterable[str],
+    timeout: float | None = None,
+    backoff: Backoff | None = None,
+    use_inotify: bool = True,
+):
+    """Block until a condition becomes true, re-checking whenever one of the watched files changes.
+
+    Args:
+        condition (Callable[[], bool]): Condition to check.  It is called once up front and again after every wake up.
+        paths (Iterable[str]): Files whose changes may make the condition true.
+        timeout (float | None, optional): Maximum time to wait in seconds, None waits forever. Defaults to None.
+        backoff (Backoff | None, optional): Polling intervals used when no notification arrives. Defaults to None.
+        use_inotify (bool, optional): Use inotify when the kernel supports it. Defaults to True.
+
+    Raises:
+        TimeoutError: The condition did not become true within the timeout.
+    """
+    backoff = backoff or Backoff()
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with FileWatcher(paths, use_inotify=use_inotify) as watcher:
+        while condition() is False:
+            interval = backoff.next()
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timeout reached: {timeout}")
+                interval = min(interval, remaining)
+
+            if watcher.wait(interval):
+                backoff.reset()
+
+
+def wait_for_file(path: str, timeout: float | None = None, use_inotify: bool = True):
+    """Block until a file exists.
+
+    Args:
+        path (str): Path of the file.
+        timeout (float | None, optional): Maximum time to wait in seconds, None waits forever. Defaults to None.
+        use_inotify (bool, optional): Use inotify when the kernel supports it. Defaults to True.
+
+    Raises:
+        TimeoutError: The file was not created within the timeout.
+    """
+    wait_for(lambda: os.path.exists(path), [path], timeout=timeout, use_inotify=use_inotify)
+
+
+def wait_for_count(
+    follower: LogFollower,
+    marker: str,
+    count: int,
+    timeout: float | None = None,
+    callback: Callable[[int], None] | None = None,
+    use_inotify: bool = True,
+) -> int:
+    """Block until a marker appears at least :code:`count` times in a followed log.
+
+    Args:
+        follower (LogFollower): Follower of the log file.
+        marker (str): Marker to count.
+        count (int): Number of occurrences to wait for.
+        timeout (float | None, optional): Maximum time to wait in seconds, None waits forever. Defaults to None.
+        callback (Callable[[int], None] | None, optional): Called with the current count after every check (i.e. to update a progress bar). Defaults to None.
+        use_inotify (bool, optional): Use inotify when the kernel supports it. Defaults to True.
+
+    Raises:
+        TimeoutError: The marker count was not reached within the timeout.
+
+    Returns:
+        int: Final number of occurrences of the marker.
+    """
+
+    def reached() -> bool:
+        current = follower.count(marker)
+        if callback is not None:
+            callback(current)
+        return current >= count
+
+    wait_for(reached, [follower.log_path], timeout=timeout, use_inotify=use_inotify)
+
+    return follower.count(marker)
+
+
+def read_when_ready(path: str, timeout: float | None = None, use_inotify: bool = True) -> str:
+    """Wait for a file to be completely written (non-empty and newline terminated) and return its content.
+
+    Args:
+        path (str): Path of the file.
+        timeout (float | None, optional): Maximum time to wait in seconds, None waits forever. Defaults to None.
+        use_inotify (bool, optional): Use inotify when the kernel supports it. Defaults to True.
+
+    Raises:
+        TimeoutError: The file was not written within the timeout.
+
+    Returns:
+        str: Content of the file without surrounding whitespace.
+    """
+    content = ""
+
+    def ready() -> bool:
+        nonlocal content
+        try:
+            with open(path) as f:
+                content = f.read()
+        except FileNotFoundError:
+            return False
+        return content.strip() != "" and content.endswith("\n")
+
+    wait_for(ready, [path], timeout=timeout, use_inotify=use_inotify)
+
+    return content.strip()
+
+
+@app.command(help="**Wait** for a file to exist.")
+def exists(
+    path: Annotated[str, typer.Argument(help="path of the file")],
+    timeout: Annotated[float, typer.Option(help="timeout in seconds")] = 600,
+):
+    wait_for_file(path, timeout=timeout)
+
+
+@app.command(help="**Wait** for a file to be written and print its content.")
+def read(
+    path: Annotated[str, typer.Argument(help="path of the file")],
+    timeout: Annotated[float, typer.Option(help="timeout in seconds")] = 600,
+):
+    print(read_when_ready(path, timeout=timeout))
+
+
+if __name__ == "__main__":
+    app()
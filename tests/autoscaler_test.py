@@ -0,0 +1,159 @@
+import json
+import os
+import socket
+import subprocess
+import time
+
+import ray
+from ray.autoscaler._private.util import prepare_config
+from ray.autoscaler._private.util import validate_config
+from ray.autoscaler.tags import TAG_RAY_NODE_KIND
+from ray.autoscaler.tags import TAG_RAY_USER_NODE_TYPE
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from main import configure_autoscaler
+from main import generate_runtime_data
+from src.launch.provider import HEAD_NODE_ID
+from src.launch.provider import SlurmNodeProvider
+from src.launch.registry import Registry
+
+runner = CliRunner()
+
+
+def setup_autoscaling(*args: str) -> dict:
+    """Configure a head and autoscaled CPU workers, then generate the autoscaler config of a run."""
+
+    runner.invoke(app, ["setup-head", "--output", "autoscaler_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "autoscaler_test_cpu", "--cpus-per-task", "1"])
+    result = runner.invoke(app, ["autoscale", "--cpu-min", "0", "--cpu-max", "2", *args])
+    assert result.exit_code == 0, result.stdout
+
+    runtime_dict = generate_runtime_data()
+    configure_autoscaler(runtime_dict)
+    return runtime_dict
+
+
+def test_autoscale_run(workdir, slurm_stub):
+    """Verifies that `run` leaves the autoscaled tiers to the autoscaler of the head and writes a valid autoscaler config."""
+
+    runner.invoke(app, ["setup-head", "--output", "autoscaler_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "autoscaler_test_cpu", "--nodes", "2"])
+    runner.invoke(app, ["setup-gpu", "--output", "autoscaler_test_gpu"])
+    result = runner.invoke(app, ["autoscale", "--cpu-max", "4", "--idle-timeout", "120"])
+    assert result.exit_code == 0, result.stdout
+    slurm_stub.set_delay("*", 0.1)
+
+    result = runner.invoke(app, ["run", "--concurrent"])
+    assert result.exit_code == 0, result.stdout
+
+    submissions = slurm_stub.submissions()
+    assert [s["job_name"] for s in submissions] == ["ray_head_node", "ray_gpu_workers"]
+    config_path = os.path.join(workdir, Cfg.AUTOSCALER_CONFIG)
+    assert f"--autoscaling_config={config_path}" in slurm_stub.script(submissions[0]["job_id"])
+
+    config = json.loads(open(config_path).read())
+    validate_config(prepare_config(config))
+    assert config["idle_timeout_minutes"] == 2
+    assert config["available_node_types"]["cpu"]["max_workers"] == 4
+    assert config["available_node_types"]["cpu"]["node_config"]["values"]["nodes"] == 1
+
+    assert runner.invoke(app, ["autoscale", "--disable"]).exit_code == 0
+    assert not os.path.exists(Cfg.CONFIG_AUTOSCALE)
+
+
+def test_provider(workdir, slurm_stub):
+    """Verifies that the node provider submits one-node jobs from the tier template, keeps their tags and cancels them in bulk."""
+
+    setup_autoscaling()
+    config = json.loads(open(Cfg.AUTOSCALER_CONFIG).read())
+    provider = SlurmNodeProvider(config["provider"], config["cluster_name"])
+    node_config = config["available_node_types"]["cpu"]["node_config"]
+    tags = {TAG_RAY_NODE_KIND: "worker", TAG_RAY_USER_NODE_TYPE: "cpu"}
+
+    created = provider.create_node(node_config, tags, 2)
+    assert len(created) == 2
+    submissions = slurm_stub.submissions()
+    assert [s["job_name"] for s in submissions] == ["ray_cpu_workers_auto"] * 2
+    assert f"--chdir={workdir}" in submissions[0]["args"]
+    assert "#SBATCH --nodes=1" in slurm_stub.script(submissions[0]["job_id"])
+
+    # A restarted autoscaler finds its nodes and their tags again
+    node_ids = list(created)
+    provider.set_node_tags(node_ids[0], {"ray-node-status": "up-to-date", "extra": "1"})
+    provider = SlurmNodeProvider(config["provider"], config["cluster_name"])
+    assert provider.non_terminated_nodes({"extra": "1"}) == [node_ids[0]]
+    assert sorted(provider.non_terminated_nodes({TAG_RAY_USER_NODE_TYPE: "cpu"})) == sorted(
+        node_ids
+    )
+
+    # A job that ended is a terminated node
+    slurm_stub.set_state(str(submissions[1]["job_id"]), "FAILED")
+    provider.non_terminated_nodes({})  # served from the gateway cache
+    time.sleep(2.1)
+    assert provider.non_terminated_nodes({}) == [HEAD_NODE_ID, node_ids[0]]
+    assert provider.is_terminated(node_ids[1])
+
+    provider.terminate_nodes([HEAD_NODE_ID, node_ids[0]])
+    assert [call["args"] for call in slurm_stub.calls("scancel")] == [
+        [str(submissions[0]["job_id"])]
+    ]
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        states = [job["state"] for job in registry.jobs() if job["tier"] == "cpu"]
+    assert states == ["CANCELLED", "FAILED"]
+
+
+def test_autoscaler_local(workdir, slurm_stub):
+    """Verifies end to end on one machine that pending tasks launch a worker job and that the idle node is released."""
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        address = f"127.0.0.1:{s.getsockname()[1]}"
+    slurm_stub.use_ray(address)
+    slurm_stub.set_delay("*", 0)
+
+    runtime_dict = setup_autoscaling("--idle-timeout", "5", "--node-id-as-ip")
+    env = os.environ | {
+        "PYTHONPATH": str(workdir),
+        "AUTOSCALER_UPDATE_INTERVAL_S": "1",
+        "RAY_OVERRIDE_NODE_ID_FOR_TESTING": HEAD_NODE_ID,
+    }
+    head = [
+        "ray",
+        "start",
+        "--head",
+        f"--port={address.split(':')[1]}",
+        "--num-cpus=0",
+        "--include-dashboard=false",
+        "--disable-usage-stats",
+        f"--autoscaling-config={runtime_dict['autoscaling_config']}",
+    ]
+    subprocess.run(head, env=env, check=True, capture_output=True)
+
+    try:
+        ray.init(address=address)
+
+        @ray.remote(num_cpus=1)
+        def node_id() -> str:
+            return ray.get_runtime_context().get_node_id()
+
+        # The head has no cores, the task runs on a node launched by the autoscaler
+        node = ray.get(node_id.remote(), timeout=180)
+        assert node in json.loads(open(Cfg.AUTOSCALER_STATE).read())["nodes"]
+        ray.shutdown()
+
+        # Once idle, the nodes are released and their jobs cancelled
+        launched = [str(s["job_id"]) for s in slurm_stub.submissions()]
+        cancelled = []
+        for _ in range(120):
+            cancelled = [job_id for call in slurm_stub.calls("scancel") for job_id in call["args"]]
+            if sorted(cancelled) == sorted(launched):
+                break
+            time.sleep(1)
+        assert 1 <= len(launched) <= 2
+        assert sorted(cancelled) == sorted(launched)
+        assert json.loads(open(Cfg.AUTOSCALER_STATE).read())["nodes"] == {}
+    finally:
+        ray.shutdown()
+        subprocess.run(["ray", "stop", "--force"], capture_output=True)
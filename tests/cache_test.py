@@ -0,0 +1,86 @@
+import os
+import time
+
+from src.container.cache import evict
+from src.container.cache import sync
+
+
+def write_image(path: str, content: bytes, mtime: float | None = None):
+    """Write a fake container image.
+
+    Args:
+        path (str): Path of the image.
+        content (bytes): Content of the image.
+        mtime (float | None, optional): Modification time to set. Defaults to None.
+    """
+    with open(path, "wb") as f:
+        f.write(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_sync_hit(tmp_path):
+    """Verifies that the image is copied once and then served from the node-local cache."""
+
+    src = str(tmp_path / "ray.sif")
+    target = str(tmp_path / "node" / "ray_container.sif")
+    write_image(src, b"image v1")
+
+    first = sync(src, target)
+    second = sync(src, target)
+
+    assert not first["hit"] and first["bytes"] == len(b"image v1")
+    assert second["hit"] and second["bytes"] == 0
+    assert os.path.islink(target)
+    with open(target, "rb") as f:
+        assert f.read() == b"image v1"
+
+    # No temporary files are left behind
+    assert not [name for name in os.listdir(tmp_path / "node" / ".syndeo_cache") if ".tmp" in name]
+
+
+def test_sync_changed_source(tmp_path):
+    """Verifies that a changed source is copied again and the target points to the new image."""
+
+    src = str(tmp_path / "ray.sif")
+    target = str(tmp_path / "node" / "ray_container.sif")
+    write_image(src, b"image v1", mtime=1000)
+    sync(src, target)
+
+    write_image(src, b"image v2", mtime=2000)
+    result = sync(src, target)
+
+    assert not result["hit"]
+    with open(target, "rb") as f:
+        assert f.read() == b"image v2"
+
+
+def test_sync_verify(tmp_path):
+    """Verifies that the full hash detects a source modified without changing size or time."""
+
+    src = str(tmp_path / "ray.sif")
+    target = str(tmp_path / "node" / "ray_container.sif")
+    write_image(src, b"image v1", mtime=1000)
+    sync(src, target)
+
+    write_image(src, b"image v2", mtime=1000)
+    assert sync(src, target)["hit"]  # size and time match
+    assert not sync(src, target, verify=True)["hit"]
+    with open(target, "rb") as f:
+        assert f.read() == b"image v2"
+
+
+def test_evict_lru(tmp_path):
+    """Verifies that the least recently used images are evicted first and the image in use is kept."""
+
+    cache_dir = str(tmp_path)
+    now = time.time()
+    for i, name in enumerate(["a", "b", "c", "d"]):
+        write_image(os.path.join(cache_dir, f"{name}.sif"), b"x" * 10, mtime=now + i)
+
+    removed = evict(cache_dir, max_images=2, keep=os.path.join(cache_dir, "a.sif"))
+    assert sorted(os.path.basename(p) for p in removed) == ["b.sif", "c.sif"]
+    assert sorted(os.listdir(cache_dir)) == ["a.sif", "d.sif"]
+
+    removed = evict(cache_dir, max_images=5, max_bytes=10)
+    assert [os.path.basename(p) for p in removed] == ["a.sif"]
@@ -0,0 +1,439 @@
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.launch.slurm import GATEWAY
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+
+# Stub of SLURM's sbatch.  Records every submission and simulates the job by writing one
+# "Ray runtime started" line per node (of every hetjob component) to the job's --output log
+# after a configurable delay.  Each task of a job array writes its own log (%a, %A patterns).
+SBATCH_STUB = """#!{python}
+import fcntl
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+state_dir = os.environ["SYNDEO_STUB_DIR"]
+
+# sbatch --test-only prints the expected start set with set_start (recorded like the queries)
+if "--test-only" in sys.argv:
+    with open(os.path.join(state_dir, "calls.jsonl"), "a") as f:
+        f.write(json.dumps(dict(command="sbatch", args=sys.argv[1:], time=time.time())) + "\\n")
+    args = dict([arg[2:].split("=", 1) for arg in sys.argv[1:] if "=" in arg])
+    starts = json.load(open(os.path.join(state_dir, "starts.json")))
+    delay = starts.get(f"{{args['partition']}}:{{args['nodes']}}", starts.get(args["partition"]))
+    if delay is None:
+        print("sbatch: error: Requested node configuration is not available", file=sys.stderr)
+        sys.exit(1)
+    start = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() + delay))
+    print(f"sbatch: Job 999 to start at {{start}} using 1 processors on nodes n-1 in partition {{args['partition']}}", file=sys.stderr)
+    sys.exit(0)
+
+script = sys.argv[-1]
+with open(script) as f:
+    content = f.read()
+
+def option(name, default):
+    match = re.search(r"#SBATCH --" + name + r"[ =](\\S+)", content)
+    return match.group(1) if match else default
+
+# Allocate a job id (submissions may run concurrently)
+counter = os.path.join(state_dir, "job_id")
+with open(os.path.join(state_dir, "lock"), "w") as lock:
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    job_id = int(open(counter).read()) + 1 if os.path.exists(counter) else 1000
+    with open(counter, "w") as f:
+        f.write(str(job_id))
+
+job_name = option("job-name", "job")
+output = option("output", f"slurm-{{job_id}}.out")
+days, _, clock = option("time", "").rpartition("-")
+fields = ([0, 0, 0] + [int(field) for field in clock.split(":") if field])[-3:]
+limit = ((int(days or 0) * 24 + fields[0]) * 60 + fields[1]) * 60 + fields[2]
+nodes = sum([int(n) for n in re.findall(r"#SBATCH --nodes[ =](\\d+)", content)]) or 1
+array = option("array", None)
+tasks = list(range(int(array.split("-")[0]), int(array.split("-")[-1]) + 1)) if array else [None]
+outputs = [
+    output.replace("%A", str(job_id)).replace("%a", str(task)) if task is not None else output
+    for task in tasks
+]
+
+# Tasks whose state was set to anything but RUNNING (set_state) never start their nodes
+states_path = os.path.join(state_dir, "states.json")
+states = json.load(open(states_path)) if os.path.exists(states_path) else {{}}
+outputs = [
+    path
+    for task, path in zip(tasks, outputs)
+    if states.get(str(job_id) if task is None else f"{{job_id}}_{{task}}", "RUNNING") == "RUNNING"
+]
+
+with open(os.path.join(state_dir, "jobs", f"{{job_id}}.sh"), "w") as f:
+    f.write(content)
+with open(os.path.join(state_dir, "submissions.jsonl"), "a") as f:
+    record = dict(job_id=job_id, job_name=job_name, args=sys.argv[1:], output=output, nodes=nodes, array=array, limit=limit, time=time.time())
+    f.write(json.dumps(record) + "\\n")
+
+# Simulate the job starting after its queue delay
+delays = json.load(open(os.path.join(state_dir, "delays.json")))
+delay = delays.get(job_name, delays.get("*"))
+if delay is not None:
+    code = f"import time; time.sleep({{delay}})"
+    for path in outputs:
+        code += f"; open({{path!r}}, 'a').write('Ray runtime started\\\\n' * {{nodes}})"
+    subprocess.Popen(
+        [sys.executable, "-c", code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+print(f"Submitted batch job {{job_id}}")
+"""
+
+
+# Stub of squeue, sacct, scancel, srun and sinfo (dispatched on the command name).  Every call
+# is recorded.  A submitted job is PENDING until its queue delay elapsed, then RUNNING until its
+# time limit (TIMEOUT), unless its state was set explicitly (set_state) or it was cancelled
+# (scancel --signal only signals it).
+QUERY_STUB = """#!{python}
+import fcntl
+import json
+import os
+import signal
+import sys
+import time
+
+ACTIVE = {{"PENDING", "RUNNING", "CONFIGURING", "COMPLETING"}}
+
+state_dir = os.environ["SYNDEO_STUB_DIR"]
+command = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+
+with open(os.path.join(state_dir, "calls.jsonl"), "a") as f:
+    f.write(json.dumps(dict(command=command, args=args, time=time.time())) + "\\n")
+
+# Simulated controller latency and transient failures (set_latency, set_failures)
+latency = json.load(open(os.path.join(state_dir, "latency.json"))).get(command, 0)
+time.sleep(latency)
+with open(os.path.join(state_dir, "lock"), "w") as lock:
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    path = os.path.join(state_dir, "failures.json")
+    failures = json.load(open(path))
+    if failures.get(command, 0) > 0:
+        failures[command] -= 1
+        json.dump(failures, open(path, "w"))
+        print(f"{{command}}: error: Socket timed out on send/recv operation", file=sys.stderr)
+        sys.exit(1)
+
+if command == "srun":
+    sys.exit(0)
+if command == "sinfo":
+    path = os.path.join(state_dir, "sinfo.txt")
+    print(open(path).read() if os.path.exists(path) else "", end="")
+    sys.exit(0)
+
+def load(name, default):
+    path = os.path.join(state_dir, name)
+    return json.load(open(path)) if os.path.exists(path) else default
+
+# Start time of the running jobs, filled by jobs()
+starts = {{}}
+
+def jobs():
+    path = os.path.join(state_dir, "submissions.jsonl")
+    records = [json.loads(line) for line in open(path)] if os.path.exists(path) else []
+    delays, states = load("delays.json", {{}}), load("states.json", {{}})
+    result = {{}}
+    for record in records:
+        delay = delays.get(record["job_name"], delays.get("*"))
+        started = delay is not None and time.time() - record["time"] >= delay
+        start, state = "N/A", "RUNNING" if started else "PENDING"
+        if started:
+            start = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record["time"] + delay))
+            # Jobs are killed at their time limit (--time)
+            if record.get("limit") and time.time() - record["time"] >= delay + record["limit"]:
+                state = "TIMEOUT"
+        array = record.get("array")
+        if array:
+            first, last = array.split("-")[0], array.split("-")[-1]
+            ids = [f"{{record['job_id']}}_{{t}}" for t in range(int(first), int(last) + 1)]
+        else:
+            ids = [str(record["job_id"])]
+        for job_id in ids:
+            result[job_id] = states.get(job_id, state)
+            starts[job_id] = start
+    return result
+
+def requested():
+    for arg in args:
+        if arg.startswith("--jobs="):
+            return arg.split("=", 1)[1].split(",")
+    return list(jobs())
+
+if command == "squeue":
+    known, reasons = jobs(), load("reasons.json", {{}})
+    for job_id in requested():
+        if known.get(job_id) in ACTIVE:
+            reason = reasons.get(job_id, "None" if known[job_id] == "RUNNING" else "Priority")
+            print(f"{{job_id}}|{{known[job_id]}}|{{reason}}|{{starts[job_id]}}")
+elif command == "sacct":
+    known = jobs()
+    for job_id in requested():
+        if job_id in known and known[job_id] not in ACTIVE:
+            print(f"{{job_id}}|{{known[job_id]}}")
+elif command == "scancel" and not any([arg.startswith("--signal") for arg in args]):
+    with open(os.path.join(state_dir, "lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        states = load("states.json", {{}})
+        for job_id in jobs():
+            if job_id in args or job_id.split("_")[0] in args:
+                states[job_id] = "CANCELLED"
+                # Jobs running a real process (use_ray) are killed with it
+                pid = os.path.join(state_dir, "pids", job_id)
+                if os.path.exists(pid):
+                    try:
+                        os.killpg(int(open(pid).read()), signal.SIGTERM)
+                    except ProcessLookupError:
+                        pass
+        with open(os.path.join(state_dir, "states.json"), "w") as f:
+            json.dump(states, f)
+"""
+
+
+# Stub of sbatch that runs every job as a local Ray worker node: `ray start --block` joins the head
+# address set with use_ray, with the cores of the job, the environment of --export and the job id
+# label of setup_ray_workers.sh.  scancel kills the worker.
+RAY_SBATCH_STUB = """#!{python}
+import fcntl
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+state_dir = os.environ["SYNDEO_STUB_DIR"]
+script = sys.argv[-1]
+with open(script) as f:
+    content = f.read()
+
+env = dict(os.environ)
+for arg in sys.argv[1:-1]:
+    if arg.startswith("--export="):
+        for item in arg.split("=", 1)[1].split(",")[1:]:
+            key, value = item.split("=", 1)
+            env[key] = value
+
+counter = os.path.join(state_dir, "job_id")
+with open(os.path.join(state_dir, "lock"), "w") as lock:
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    job_id = int(open(counter).read()) + 1 if os.path.exists(counter) else 1000
+    with open(counter, "w") as f:
+        f.write(str(job_id))
+
+cpus = re.search(r"#SBATCH --cpus-per-task=(\\d+)", content).group(1)
+address = open(os.path.join(state_dir, "ray_address")).read()
+process = subprocess.Popen(
+    [
+        "ray",
+        "start",
+        f"--address={{address}}",
+        f"--num-cpus={{cpus}}",
+        "--labels=" + json.dumps({{"syndeo.io/job-id": str(job_id)}}),
+        "--block",
+    ],
+    env=env,
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL,
+    start_new_session=True,
+)
+os.makedirs(os.path.join(state_dir, "pids"), exist_ok=True)
+with open(os.path.join(state_dir, "pids", str(job_id)), "w") as f:
+    f.write(str(process.pid))
+
+with open(os.path.join(state_dir, "jobs", f"{{job_id}}.sh"), "w") as f:
+    f.write(content)
+job_name = re.search(r"#SBATCH --job-name (\\S+)", content).group(1)
+with open(os.path.join(state_dir, "submissions.jsonl"), "a") as f:
+    record = dict(job_id=job_id, job_name=job_name, args=sys.argv[1:], nodes=1, time=time.time())
+    f.write(json.dumps(record) + "\\n")
+
+print(f"Submitted batch job {{job_id}}")
+"""
+
+
+class SlurmStub:
+    """Handle on the stub SLURM commands installed on the PATH of a test."""
+
+    def __init__(self, state_dir: Path):
+        self.state_dir = state_dir
+        (state_dir / "jobs").mkdir(parents=True)
+        self.delays: dict = {}
+        self._write_delays()
+        for name in ["latency.json", "failures.json", "starts.json"]:
+            (state_dir / name).write_text("{}")
+        self.install("sbatch", SBATCH_STUB.format(python=sys.executable))
+        for name in ["squeue", "sacct", "scancel", "srun", "sinfo"]:
+            self.install(name, QUERY_STUB.format(python=sys.executable))
+
+    def install(self, name: str, source: str):
+        """Install an executable stub command.
+
+        Args:
+            name (str): Name of the command (i.e. sbatch).
+            source (str): Source code of the executable, including the shebang.
+        """
+        path = self.state_dir / name
+        path.write_text(source)
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+    def set_delay(self, job_name: str, delay: float | None):
+        """Set the simulated queue delay of a job, None means the job never starts.
+
+        Args:
+            job_name (str): The job name passed to sbatch.
+            delay (float | None): Seconds until the job writes its "Ray runtime started" lines.
+
+        The job name "*" sets the delay of every job without its own delay.
+        """
+        self.delays[job_name] = delay
+        self._write_delays()
+
+    def set_state(self, job_id: str, state: str, reason: str | None = None):
+        """Override the state reported by squeue and sacct for a job.
+
+        Args:
+            job_id (str): SLURM job id (array tasks as <job>_<task>).
+            state (str): SLURM state (i.e. FAILED).
+            reason (str | None, optional): Pending reason reported by squeue (i.e. Resources). Defaults to None.
+        """
+        for name, value in [("states.json", state), ("reasons.json", reason)]:
+            path = self.state_dir / name
+            values = json.loads(path.read_text()) if path.exists() else {}
+            if value is not None:
+                values[job_id] = value
+            path.write_text(json.dumps(values))
+
+    def set_partitions(self, lines: list[str]):
+        """Set the partitions reported by sinfo.
+
+        Args:
+            lines (list[str]): sinfo lines in the partition index format (name|avail|limit|nodes|cpus|gres|A/I/O/T).
+        """
+        (self.state_dir / "sinfo.txt").write_text("".join([f"{line}\n" for line in lines]))
+
+    def set_start(self, partition: str, seconds: float, nodes: int | None = None):
+        """Set the expected start reported by :code:`sbatch --test-only` on a partition.
+
+        Args:
+            partition (str): Partition name.
+            seconds (float): Seconds from now until the request would start.
+            nodes (int | None, optional): Only for requests of this many nodes. Defaults to None (any).
+        """
+        self._update("starts.json", partition if nodes is None else f"{partition}:{nodes}", seconds)
+
+    def use_ray(self, address: str):
+        """Run every job submitted from now on as a local Ray worker node joining a head.
+
+        Args:
+            address (str): Address of the Ray head (ip:port).
+        """
+        (self.state_dir / "ray_address").write_text(address)
+        self.install("sbatch", RAY_SBATCH_STUB.format(python=sys.executable))
+
+    def set_latency(self, command: str, seconds: float):
+        """Make every call of a stub command take longer.
+
+        Args:
+            command (str): Name of the command (i.e. squeue).
+            seconds (float): Latency added to each call.
+        """
+        self._update("latency.json", command, seconds)
+
+    def set_failures(self, command: str, count: int):
+        """Make the next calls of a stub command fail with a "Socket timed out" error.
+
+        Args:
+            command (str): Name of the command (i.e. squeue).
+            count (int): Number of calls that fail.
+        """
+        self._update("failures.json", command, count)
+
+    def calls(self, command: str | None = None) -> list[dict]:
+        """Every call of the squeue, sacct, scancel, srun and sinfo stubs (and of sbatch --test-only) recorded so far.
+
+        Args:
+            command (str | None, optional): Only the calls of this command. Defaults to None.
+
+        Returns:
+            list[dict]: Call records (command, args, time) in order.
+        """
+        path = self.state_dir / "calls.jsonl"
+        if path.exists() is False:
+            return []
+        calls = [json.loads(line) for line in path.read_text().splitlines()]
+        return [call for call in calls if command in (None, call["command"])]
+
+    def submissions(self) -> list[dict]:
+        """Every sbatch submission recorded so far.
+
+        Returns:
+            list[dict]: Submission records in order.
+        """
+        path = self.state_dir / "submissions.jsonl"
+        if path.exists() is False:
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    def script(self, job_id: int) -> str:
+        """The script recorded for a submitted job.
+
+        Args:
+            job_id (int): SLURM job id.
+
+        Returns:
+            str: Content of the submitted script.
+        """
+        return (self.state_dir / "jobs" / f"{job_id}.sh").read_text()
+
+    def _update(self, name: str, key: str, value):
+        path = self.state_dir / name
+        path.write_text(json.dumps(json.loads(path.read_text()) | {key: value}))
+
+    def _write_delays(self):
+        (self.state_dir / "delays.json").write_text(json.dumps(self.delays))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch) -> Path:
+    """A temporary working directory laid out like the repo (templates, logs, .ray_slurm)."""
+
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "src").symlink_to(REPO_DIR / "src")
+    (work / "logs").mkdir()
+    (work / ".ray_slurm").mkdir()
+    monkeypatch.chdir(work)
+
+    return work
+
+
+@pytest.fixture
+def slurm_stub(tmp_path, monkeypatch) -> SlurmStub:
+    """Stub SLURM commands placed first on the PATH."""
+
+    stub = SlurmStub(tmp_path / "slurm")
+    GATEWAY.invalidate()  # job ids restart with every stub
+    monkeypatch.setenv("SYNDEO_STUB_DIR", str(stub.state_dir))
+    monkeypatch.setenv("PATH", f"{stub.state_dir}{os.pathsep}{os.environ['PATH']}")
+
+    return stub
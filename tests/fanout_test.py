@@ -0,0 +1,97 @@
+import os
+import threading
+
+from src.container.fanout import chunked_copy
+from src.container.fanout import distribute
+from src.container.fanout import parse_report
+from src.container.fanout import report_line
+from src.container.fanout import staging_path
+from src.container.fanout import Strategy
+from src.container.fanout import tree_children
+from src.container.fanout import tree_parent
+
+
+def test_tree():
+    """Verifies that every node of the broadcast tree has exactly one parent that lists it as a child."""
+
+    size = 13
+    for rank in range(1, size):
+        assert rank in tree_children(tree_parent(rank), size)
+    assert sorted(sum([tree_children(rank, size) for rank in range(size)], [])) == list(
+        range(1, size)
+    )
+    assert tree_parent(0) is None
+
+
+def test_chunked_copy(tmp_path):
+    """Verifies that parallel chunked reads reproduce the file."""
+
+    src = tmp_path / "ray.sif"
+    src.write_bytes(os.urandom(1000))
+    chunked_copy(str(src), str(tmp_path / "copy.sif"), workers=3, chunk_size=64)
+
+    assert (tmp_path / "copy.sif").read_bytes() == src.read_bytes()
+
+
+def test_distribute_tree(tmp_path):
+    """Verifies that only the root reads the shared file system and the other nodes get the image from a peer."""
+
+    src = tmp_path / "ray.sif"
+    src.write_bytes(os.urandom(1 << 16))
+    rendezvous = f"file://{tmp_path}/rendezvous"
+    size = 5
+    results = {}
+
+    def node(rank: int):
+        target = str(tmp_path / f"node{rank}" / "ray_container.sif")
+        results[rank] = distribute(
+            Strategy.tree,
+            str(src),
+            target,
+            rank=rank,
+            size=size,
+            rendezvous=rendezvous,
+            timeout=10,
+            host="127.0.0.1",
+        )
+
+    threads = [threading.Thread(target=node, args=(rank,)) for rank in range(size)]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+
+    assert results[0]["origin"] == "shared"
+    for rank in range(1, size):
+        assert results[rank]["origin"] == f"rank {tree_parent(rank)}"
+        image = tmp_path / f"node{rank}" / "ray_container.sif"
+        assert image.read_bytes() == src.read_bytes()
+
+
+def test_distribute_sbcast(tmp_path):
+    """Verifies that a broadcast copy is moved into the cache and a missing one falls back to the source."""
+
+    src = tmp_path / "ray.sif"
+    src.write_bytes(b"image")
+    target = str(tmp_path / "node" / "ray_container.sif")
+    os.makedirs(os.path.dirname(target))
+
+    with open(staging_path(target), "wb") as f:
+        f.write(b"image")
+    assert distribute(Strategy.sbcast, str(src), target)["origin"] == "staged"
+    assert not os.path.exists(staging_path(target))
+
+    src.write_bytes(b"image v2")
+    assert distribute(Strategy.sbcast, str(src), target)["origin"] == "shared"
+    assert distribute(Strategy.sbcast, str(src), target)["origin"] == "cache"
+
+
+def test_report(tmp_path):
+    """Verifies that the per-node report lines can be read back from a log."""
+
+    result = {"origin": "rank 0", "bytes": 2048, "seconds": 1.5}
+    log = tmp_path / "launch.log"
+    log.write_text("Ray runtime started\n" + report_line(result, 1, Strategy.tree) + "\n")
+
+    (node,) = parse_report(str(log))
+    assert node["origin"] == "rank_0"
+    assert node["bytes"] == 2048
+    assert node["seconds"] == 1.5
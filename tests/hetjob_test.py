@@ -0,0 +1,68 @@
+from typer.testing import CliRunner
+
+from main import app
+from src.launch.hetjob import gpus_per_node
+from src.launch.hetjob import hetjob_values
+
+runner = CliRunner()
+
+
+def test_gpus_per_node():
+    """Verifies that the GPU count is read from the gres request."""
+
+    assert gpus_per_node("gpu:volta:2") == 2
+    assert gpus_per_node("gpu:1") == 1
+    assert gpus_per_node("n/a") == 0
+
+
+def test_hetjob_values():
+    """Verifies that one component is generated per tier and the workers get the head address directly."""
+
+    config = {
+        "job_name": "ray_head_node",
+        "output": "hetjob",
+        "cpus_per_task": 4,
+        "nodes": 1,
+        "partition": "xeon-p8",
+        "gres": "n/a",
+        "time": "0-00:05:00",
+        "hostenv": "bare_metal",
+        "tmpdir": "/tmp",
+        "container_src_path": "n/a",
+        "container_tgt_path": "/tmp/ray_container.sif",
+    }
+    cpu = config | {"nodes": 2, "partition": "normal"}
+    gpu = config | {"nodes": 3, "partition": "gaia", "gres": "gpu:volta:2", "hostenv": "container"}
+
+    values = hetjob_values(config, [("cpu", cpu), ("gpu", gpu)])
+
+    assert values["nodes"] == 6
+    assert values["partition"] == "xeon-p8,normal,gaia"
+    assert values["hetjob_components"].count("#SBATCH hetjob") == 2
+    assert values["hetjob_components"].count("#SBATCH --gres=gpu:volta:2") == 1
+    assert "--het_group=0" in values["hetjob_setup"]
+    assert "--het_group=2" in values["hetjob_setup"]
+    assert values["hetjob_setup"].count("--address=$HEAD_NODE_ADDR") == 2
+    assert values["hetjob_setup"].count("--container_src=") == 1
+
+
+def test_run_hetjob(workdir, slurm_stub):
+    """Verifies that `run --hetjob` submits a single heterogeneous job without a shared address file."""
+
+    runner.invoke(app, ["setup-head", "--output", "hetjob_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "hetjob_test_cpu", "--nodes", "2"])
+    runner.invoke(app, ["setup-gpu", "--output", "hetjob_test_gpu", "--nodes", "2"])
+    slurm_stub.set_delay("ray_head_node", 0.2)
+
+    result = runner.invoke(app, ["run", "--hetjob"])
+    assert result.exit_code == 0, result.stdout
+
+    submissions = slurm_stub.submissions()
+    assert len(submissions) == 1
+    assert submissions[0]["output"] == "logs/hetjob_test_head.log"
+    assert submissions[0]["nodes"] == 5
+
+    script = slurm_stub.script(submissions[0]["job_id"])
+    assert script.count("#SBATCH hetjob") == 2
+    assert "--dir=" not in script
+    assert "{" not in script.replace("${", "")  # every placeholder was filled
@@ -0,0 +1,54 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.launch.local import LOCAL_DIR_ENV
+from src.launch.local import LocalScheduler
+from src.launch.slurm import GATEWAY
+from src.validation.health import NodeCensus
+
+runner = CliRunner()
+
+
+def test_local_backend(workdir, monkeypatch):
+    """Verifies that `--backend local` runs a cluster on simulated nodes: the head and one Ray node per worker."""
+
+    # The backend changes the environment of the process and the partition index
+    monkeypatch.setenv("PATH", os.environ["PATH"])
+    monkeypatch.setenv(LOCAL_DIR_ENV, "")
+    monkeypatch.setattr(Cfg, "PARTITIONS_FILE", Cfg.PARTITIONS_FILE)
+    GATEWAY.invalidate()
+
+    # Ray sockets live in the temporary directory of the head, a short path
+    tmpdir = tempfile.mkdtemp(prefix="syndeo", dir="/tmp")
+    local = ["--backend", "local", "--local-nodes", "3"]
+    try:
+        runner.invoke(
+            app, [*local, "setup-head", "--output", "local_test_head", "--tmpdir", tmpdir]
+        )
+        args = ["--output", "local_test_cpu", "--nodes", "2", "--cpus-per-task", "1"]
+        runner.invoke(app, [*local, "setup-cpu", *args, "--tmpdir", tmpdir])
+        result = runner.invoke(app, [*local, "run", "--concurrent"])
+        assert result.exit_code == 0, result.stdout
+        assert "local0" in result.stdout
+
+        # The worker job ran on the two other nodes, each one a Ray node labelled with the job
+        head_log = open(workdir / "logs" / "local_test_head.log").read()
+        address = head_log.split("HEAD Node Address       = ")[-1].split()[0]
+        cpu_log = open(workdir / "logs" / "local_test_cpu.log").read()
+        assert "local1" in cpu_log and "local2" in cpu_log
+        assert [len(nodes) for nodes in NodeCensus(address).by_job().values()] == [2]
+
+        assert runner.invoke(app, [*local, "teardown"]).exit_code == 0
+        squeue = subprocess.run(["squeue"], capture_output=True, text=True)
+        assert squeue.returncode == 0 and squeue.stdout == ""
+    finally:
+        scheduler = LocalScheduler(os.environ[LOCAL_DIR_ENV])
+        scheduler.cancel([job["id"] for job in scheduler.all_jobs()])
+        subprocess.run(["ray", "stop", "--force"], capture_output=True)
+        shutil.rmtree(tmpdir, ignore_errors=True)
@@ -0,0 +1,102 @@
+import os
+
+from src.validation.logs import LogFollower
+from src.validation.logs import RAY_RUNTIME_STARTED
+
+
+def append(log_path: str, text: str):
+    """Append text to a log file.
+
+    Args:
+        log_path (str): Path to the log file.
+        text (str): Text to append.
+    """
+    with open(log_path, "a") as f:
+        f.write(text)
+
+
+def test_incremental_count(tmp_path):
+    """Verifies that the follower counts markers appended over several polls."""
+
+    log_path = str(tmp_path / "ray.log")
+    follower = LogFollower(log_path, RAY_RUNTIME_STARTED)
+
+    # Log does not exist yet
+    assert follower.count(RAY_RUNTIME_STARTED) == 0
+
+    append(log_path, f"starting...\n{RAY_RUNTIME_STARTED}\n")
+    assert follower.count(RAY_RUNTIME_STARTED) == 1
+
+    append(log_path, f"{RAY_RUNTIME_STARTED}\n{RAY_RUNTIME_STARTED}\n")
+    assert follower.count(RAY_RUNTIME_STARTED) == 3
+
+    # Polling again without new data does not double count
+    assert follower.count(RAY_RUNTIME_STARTED) == 3
+
+
+def test_split_marker(tmp_path):
+    """Verifies that a marker written across two reads is counted exactly once."""
+
+    log_path = str(tmp_path / "ray.log")
+    follower = LogFollower(log_path, [RAY_RUNTIME_STARTED, "Ray"])
+
+    append(log_path, "node 1: Ray runt")
+    counts = follower.poll()
+    assert counts[RAY_RUNTIME_STARTED] == 0
+    assert counts["Ray"] == 1
+
+    append(log_path, "ime started\n")
+    counts = follower.poll()
+    assert counts[RAY_RUNTIME_STARTED] == 1
+    assert counts["Ray"] == 1
+
+
+def test_split_marker_small_chunks(tmp_path):
+    """Verifies that counting is correct when every read is smaller than the marker."""
+
+    log_path = str(tmp_path / "ray.log")
+    append(log_path, f"{RAY_RUNTIME_STARTED}\n" * 5)
+
+    follower = LogFollower(log_path, RAY_RUNTIME_STARTED, chunk_size=3)
+    assert follower.count(RAY_RUNTIME_STARTED) == 5
+
+
+def test_truncation_and_recreation(tmp_path):
+    """Verifies that the follower restarts from the beginning when the log is truncated or recreated."""
+
+    log_path = str(tmp_path / "ray.log")
+    follower = LogFollower(log_path, RAY_RUNTIME_STARTED)
+
+    append(log_path, f"{RAY_RUNTIME_STARTED}\n" * 3)
+    assert follower.count(RAY_RUNTIME_STARTED) == 3
+
+    # Truncate in place
+    with open(log_path, "w") as f:
+        f.write(f"{RAY_RUNTIME_STARTED}\n")
+    assert follower.count(RAY_RUNTIME_STARTED) == 1
+
+    # Delete the log, then recreate it
+    os.remove(log_path)
+    assert follower.count(RAY_RUNTIME_STARTED) == 0
+
+    append(log_path, f"{RAY_RUNTIME_STARTED}\n" * 2)
+    assert follower.count(RAY_RUNTIME_STARTED) == 2
+
+
+def test_bytes_read_per_tick(tmp_path):
+    """Verifies that the I/O per poll only depends on the appended bytes, not on the log size."""
+
+    log_path = str(tmp_path / "ray.log")
+    append(log_path, "x" * 10_000_000)
+
+    follower = LogFollower(log_path, RAY_RUNTIME_STARTED)
+    follower.poll()
+    assert follower.bytes_read == 10_000_000
+
+    for _ in range(10):
+        append(log_path, f"{RAY_RUNTIME_STARTED}\n")
+        bytes_before = follower.bytes_read
+        follower.poll()
+        assert follower.bytes_read - bytes_before == len(RAY_RUNTIME_STARTED) + 1
+
+    assert follower.count(RAY_RUNTIME_STARTED) == 10
@@ -0,0 +1,94 @@
+import json
+import subprocess
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.validation.monitor import JobFailedError
+from src.validation.monitor import JobMonitor
+
+runner = CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def fast_monitor(monkeypatch):
+    """Query the stub scheduler often so failures are detected quickly."""
+
+    monkeypatch.setattr(Cfg, "MONITOR_INTERVAL", 0.1)
+
+
+def test_monitor(workdir, slurm_stub):
+    """Verifies that the scheduler is queried in batch, cached and that dead jobs raise."""
+
+    script = workdir / "job.sh"
+    script.write_text("#!/bin/bash\n#SBATCH --job-name monitor_test\n")
+    job_ids = [
+        subprocess.run(["sbatch", str(script)], capture_output=True, text=True).stdout.split()[-1]
+        for _ in range(2)
+    ]
+
+    monitor = JobMonitor(job_ids, interval=60)
+    monitor.check()
+    monitor.check()
+    assert monitor.queries == 1
+    assert len(slurm_stub.calls("squeue")) == 1
+    assert monitor.describe(job_ids[0]) == "PENDING (Priority)"
+
+    slurm_stub.set_state(job_ids[1], "OUT_OF_MEMORY")
+    monitor.refresh(force=True)
+    with pytest.raises(JobFailedError, match="OUT_OF_MEMORY"):
+        monitor.check()
+    monitor.check([job_ids[0]])  # the other job is still fine
+
+
+@pytest.mark.parametrize(
+    "state, reason, message",
+    [
+        ("FAILED", None, "is FAILED"),
+        ("CANCELLED", None, "is CANCELLED"),
+        ("PENDING", "PartitionNodeLimit", "can never start"),
+    ],
+)
+def test_run_job_failed(workdir, slurm_stub, state, reason, message):
+    """Verifies that `run` aborts with a clear error instead of waiting on a dead job."""
+
+    runner.invoke(app, ["setup-head", "--output", "monitor_test_head"])
+    slurm_stub.set_state("1000", state, reason)  # first job id of the stub
+
+    tic = time.time()
+    result = runner.invoke(app, ["run"])
+    assert time.time() - tic < 5
+    assert result.exit_code == 1
+    assert message in result.stdout
+    assert "teardown --cluster" in result.stdout
+
+
+def test_run_deadline(workdir, slurm_stub):
+    """Verifies that a tier that does not start within its deadline aborts the launch."""
+
+    runner.invoke(app, ["setup-head", "--output", "monitor_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "monitor_test_cpu", "--deadline", "1"])
+    slurm_stub.set_delay("ray_head_node", 0.1)
+
+    tic = time.time()
+    result = runner.invoke(app, ["run", "--concurrent"])
+    assert 1 <= time.time() - tic < 5
+    assert result.exit_code == 1
+    assert "did not start within 1 s" in result.stdout
+
+
+def test_sweep_job_failed(workdir, slurm_stub):
+    """Verifies that a sweep gives up on the variants whose job died and collects the others."""
+
+    slurm_stub.set_delay("*", 0.2)
+    slurm_stub.set_state("1000_1", "NODE_FAIL")
+
+    result = runner.invoke(app, ["sweep", "--repeats", "2"])
+    assert result.exit_code == 0, result.stdout
+
+    (sweep_dir,) = (workdir / ".ray_slurm" / "sweeps").iterdir()
+    variants = json.loads((sweep_dir / "results.json").read_text())
+    assert [v["status"] for v in variants] == ["ready", "failed: NODE_FAIL"]
@@ -0,0 +1,87 @@
+import json
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.launch.partitions import check_request
+from src.launch.partitions import node_cpus
+from src.launch.partitions import parse_gres
+from src.launch.partitions import parse_sinfo
+from src.launch.partitions import parse_time
+
+runner = CliRunner()
+
+SINFO = [
+    "xeon-p8|up|4-00:00:00|240|48|(null)|200/40/0/240",
+    "gaia|up|1-00:00:00|30|40|gpu:volta:2(S:0-1)|28/2/0/30",
+    "gaia|up|1-00:00:00|4|20|(null)|0/4/0/4",
+    "debug|down|30:00|2|8|(null)|0/2/0/2",
+]
+
+
+def request(**kwargs) -> dict:
+    """A CPU request updated with keyword arguments."""
+
+    config = {"partition": "xeon-p8", "nodes": 2, "cpus_per_task": 48, "gres": "n/a"}
+    return config | {"time": "0-01:00:00"} | kwargs
+
+
+def test_parse():
+    """Verifies the parsing of gres, SLURM times and sinfo lines."""
+
+    assert parse_gres("gpu:volta:2(S:0-1),gpu:tesla:1") == {
+        "gpu": 3,
+        "gpu:volta": 2,
+        "gpu:tesla": 1,
+    }
+    assert parse_gres("(null)") == parse_gres("n/a") == {}
+    assert parse_time("1-02:03:04") == 93784
+    assert parse_time("30:00") == parse_time("30") == 1800
+    assert parse_time("infinite") is None
+
+    index = parse_sinfo("\n".join(SINFO))
+    assert index["gaia"]["max_time"] == 86400
+    assert [group["nodes"] for group in index["gaia"]["groups"]] == [30, 4]
+    assert index["xeon-p8"]["groups"][0]["idle"] == 40
+
+
+def test_check_request():
+    """Verifies that requests that can never start are rejected with the reason."""
+
+    index = parse_sinfo("\n".join(SINFO))
+
+    assert check_request(index, request()) == []
+    assert "240 nodes" in check_request(index, request(nodes=300))[0]
+    assert "48 cores" in check_request(index, request(cpus_per_task=64))[0]
+    assert "walltime" in check_request(index, request(time="5-00:00:00"))[0]
+    assert "no nodes with gres" in check_request(index, request(gres="gpu:volta:2"))[0]
+    assert "unknown partition" in check_request(index, request(partition="normal"))[0]
+    assert "not available" in check_request(index, request(partition="debug", cpus_per_task=8))[0]
+
+    # Only the GPU nodes of a partition count for a GPU request, any partition of a list may run it
+    gpu = request(partition="gaia", gres="gpu:volta:2", cpus_per_task=40)
+    assert check_request(index, gpu) == []
+    assert check_request(index, gpu | {"nodes": 32}) != []
+    assert check_request(index, gpu | {"partition": "debug,gaia"}) == []
+    assert node_cpus(index, gpu) == 40
+    assert node_cpus(index, request(partition="gaia")) == 20
+    assert check_request({}, request(nodes=10**6)) == []
+
+
+def test_setup_feasibility(workdir, slurm_stub):
+    """Verifies that `setup-*` fills the cores of a full node and rejects infeasible requests before submission."""
+
+    slurm_stub.set_partitions(SINFO)
+
+    result = runner.invoke(app, ["setup-cpu", "--partition", "xeon-p8", "--nodes", "4"])
+    assert result.exit_code == 0, result.stdout
+    assert json.loads(open(Cfg.CONFIG_CPU).read())["cpus_per_task"] == 48
+
+    result = runner.invoke(app, ["setup-gpu", "--partition", "gaia", "--nodes", "64"])
+    assert result.exit_code != 0
+    assert "30 nodes with gres" in str(result.exception)
+    assert not (workdir / Cfg.CONFIG_GPU).exists()
+
+    # The partition index is cached
+    assert len(slurm_stub.calls("sinfo")) == 1
@@ -0,0 +1,157 @@
+import json
+import time
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.launch.partitions import parse_sinfo
+from src.launch.placement import candidate_options
+from src.launch.placement import choose
+from src.launch.placement import parse_start_times
+from src.launch.placement import parse_test_only
+from src.launch.placement import parse_timestamp
+from src.launch.placement import place
+
+runner = CliRunner()
+
+# Recorded scheduler output
+SINFO = [
+    "normal|up|2-00:00:00|64|16|(null)|60/4/0/64",
+    "xeon-p8|up|4-00:00:00|240|48|(null)|238/2/0/240",
+    "xeon-e5|up|4-00:00:00|32|32|(null)|30/2/0/32",
+]
+TEST_ONLY = "sbatch: Job 3676091 to start at 2024-02-05T11:19:07 using 96 processors on nodes d-3-1-[1-2] in partition xeon-p8"
+SQUEUE_START = "2024-02-05T10:00:00\nN/A\n2024-02-05T12:30:00\n"
+
+
+def request(**kwargs) -> dict:
+    """A CPU worker request updated with keyword arguments."""
+
+    config = {"nodes": 1, "cpus_per_task": 0, "gres": "n/a", "time": "0-01:00:00"}
+    return config | kwargs
+
+
+def option(nodes: int, cpus: int, start: float | None) -> dict:
+    """An estimated option of a partition sized in cores."""
+
+    return {"nodes": nodes, "cpus": cpus, "capacity": nodes * cpus, "idle": 0, "start": start}
+
+
+def test_parse():
+    """Verifies the parsing of sbatch --test-only and squeue --start estimates."""
+
+    assert parse_test_only(TEST_ONLY) == parse_timestamp("2024-02-05T11:19:07")
+    assert parse_test_only("sbatch: error: Batch job submission failed") is None
+    assert parse_start_times(SQUEUE_START) == [
+        parse_timestamp("2024-02-05T10:00:00"),
+        parse_timestamp("2024-02-05T12:30:00"),
+    ]
+
+
+def test_choose():
+    """Verifies that the earliest expected start wins and that a request is only split when that starts sooner."""
+
+    # 192 cores: 4 xeon-p8 nodes in an hour, or 12 normal nodes in 10 minutes
+    options = {"xeon-p8": [option(4, 48, 3600)], "normal": [option(12, 16, 600)]}
+    assert choose(options, 192) == [{"partition": "normal", "nodes": 12, "cpus": 16, "start": 600}]
+
+    # Idle nodes of two partitions cover 128 cores now, which beats waiting for either one
+    options["normal"].insert(0, option(4, 16, 0))
+    options["xeon-e5"] = [option(2, 32, 0), option(4, 32, 7200)]
+    parts = choose(options, 128)
+    assert [(part["partition"], part["nodes"], part["start"]) for part in parts] == [
+        ("normal", 4, 0),
+        ("xeon-e5", 2, 0),
+    ]
+    assert choose(options, 192)[0]["partition"] == "normal"
+
+    # Unknown starts come last, ties go to a single job
+    options = {"a": [option(2, 16, None)], "b": [option(2, 16, None)], "c": [option(1, 32, 60)]}
+    assert choose(options, 32) == [{"partition": "c", "nodes": 1, "cpus": 32, "start": 60}]
+    assert choose(options, 10**6) == []
+
+
+def test_candidate_options():
+    """Verifies the node counts estimated on each partition from the partition index."""
+
+    index = parse_sinfo("\n".join(SINFO))
+    options = candidate_options(index, request(), 192, ["normal", "xeon-p8", "unknown"])
+
+    assert list(options) == ["normal", "xeon-p8"]
+    assert [o["nodes"] for o in options["normal"]] == [4, 12]  # idle nodes, whole request
+    assert [o["nodes"] for o in options["xeon-p8"]] == [2, 4]
+    options = candidate_options(index, request(nodes=3), 0, [])
+    assert [o["capacity"] for o in options["xeon-e5"]] == [2, 3]  # sized in nodes
+    assert candidate_options(index, request(cpus_per_task=8), 64, ["normal"])["normal"][0] == {
+        "nodes": 4,
+        "cpus": 16,
+        "capacity": 32,
+        "idle": 4,
+    }
+
+
+def test_place_auto(workdir, slurm_stub):
+    """Verifies that `setup-cpu --partition auto` picks the earliest estimate, splits when faster and logs every decision."""
+
+    slurm_stub.set_partitions(SINFO)
+    slurm_stub.set_start("normal", 3600)
+    slurm_stub.set_start("xeon-p8", 60)
+
+    args = ["setup-cpu", "--partition", "auto", "--cores", "192", "--candidates"]
+    result = runner.invoke(app, args + ["normal,xeon-p8,xeon-e5"])
+    assert result.exit_code == 0, result.stdout
+    config = json.loads(open(Cfg.CONFIG_CPU).read())
+    assert (config["partition"], config["nodes"], config["cpus_per_task"]) == ("xeon-p8", 4, 48)
+    assert "parts" not in config
+
+    # Only the idle xeon-p8 nodes start soon, the idle normal nodes make up the rest right away
+    slurm_stub.set_start("xeon-p8", 10**5)
+    slurm_stub.set_start("xeon-p8", 0, nodes=2)
+    slurm_stub.set_start("normal", 0, nodes=4)
+    place_test = place(parse_sinfo("\n".join(SINFO)), request(), 160, ["normal", "xeon-p8"])
+    assert [(p["partition"], p["nodes"]) for p in place_test["parts"]] == [
+        ("normal", 4),
+        ("xeon-p8", 2),
+    ]
+    assert all([p["start"] - time.time() < 60 for p in place_test["parts"]])
+
+    # Without estimates, a request that fits in the idle nodes starts now
+    result = runner.invoke(app, args + ["xeon-e5,unknown", "--cores", "64"])
+    assert result.exit_code == 0, result.stdout
+    assert json.loads(open(Cfg.CONFIG_CPU).read())["partition"] == "xeon-e5"
+
+    decisions = [json.loads(line) for line in open(Cfg.PLACEMENT_LOG)]
+    assert len(decisions) == 2
+    assert decisions[0]["parts"][0]["partition"] == "xeon-p8"
+    assert set(decisions[0]["options"]) == {"normal", "xeon-p8", "xeon-e5"}
+    assert len(slurm_stub.calls("sbatch")) == 6 + 4 + 1  # one --test-only per estimated option
+
+
+def test_run_split(workdir, slurm_stub):
+    """Verifies that a tier split across partitions is submitted as one job per partition."""
+
+    slurm_stub.set_partitions(SINFO)
+    slurm_stub.set_start("normal", 0, nodes=4)
+    slurm_stub.set_start("xeon-p8", 0, nodes=2)
+    slurm_stub.set_delay("*", 0.1)
+
+    runner.invoke(app, ["setup-head", "--partition", "normal", "--output", "split_head"])
+    args = ["setup-cpu", "--partition", "auto", "--cores", "160", "--output", "split_cpu"]
+    result = runner.invoke(app, args + ["--candidates", "normal,xeon-p8"])
+    assert result.exit_code == 0, result.stdout
+    config = json.loads(open(Cfg.CONFIG_CPU).read())
+    assert config["partition"] == "normal+xeon-p8"
+    assert [part["cpus_per_task"] for part in config["parts"]] == [16, 48]
+
+    result = runner.invoke(app, ["run", "--concurrent"])
+    assert result.exit_code == 0, result.stdout
+
+    submissions = slurm_stub.submissions()
+    assert [s["job_name"] for s in submissions] == [
+        "ray_head_node",
+        "ray_cpu_workers_0",
+        "ray_cpu_workers_1",
+    ]
+    assert [s["nodes"] for s in submissions] == [1, 4, 2]
+    assert "--partition=xeon-p8" in slurm_stub.script(submissions[2]["job_id"])
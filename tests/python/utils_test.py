@@ -1,7 +1,6 @@
 import os
 import subprocess
 import tempfile
-import time
 from typing import Callable
 
 import ray
@@ -10,16 +9,6 @@ from rich.console import Console
 
 console = Console()
 
-RESOURCES = {
-    "cpus": {
-        "manycore": 64,
-        "xeon-p8": 48,
-        "xeon-e5": 28,
-        "gaia": 20,
-    },
-    "gpus": {"gaia": 2},
-}
-
 
 def ray_stats(context):
     """This function prints out relevant statistics that will help a developer
@@ -89,28 +78,23 @@ def check_logs(log_path: str, printout: str, timeout: int = 250, exitcode="Shutd
         timeout (int, optional): The timeout period before throwing an exception. Defaults to 250 seconds.
         exitcode (str, optional): An exit code to determine if Ray has shut down. Defaults to "Shutdown Ray".
     """
-    # Set initial variables
-    success = False
-    timer = 0.0
-
-    # Load logs and look for desired printout
-    while (success == False) and (timer < timeout):
-        if os.path.isfile(log_path):
-            # Read all lines from file
-            file_ptr = open(log_path)
-            lines = file_ptr.readlines()
-
-            # Check line for success printout
-            for line in lines:
-                if printout in line:
-                    success = True
-                    continue
-                if exitcode in line:
-                    timer = 1000  # force exit
-                    break
-
-        time.sleep(0.25)
-        timer += 0.25
+    # Imported here so the Ray scripts in this folder can import utils_test without the repo on the path
+    from src.validation.logs import LogFollower
+    from src.validation.wait import wait_for
+
+    follower = LogFollower(log_path, [printout, exitcode])
+
+    def finished() -> bool:
+        counts = follower.poll()
+        return counts[printout] > 0 or counts[exitcode] > 0
+
+    # Follow the logs (only newly appended bytes are read) until the printout or exit code is found
+    try:
+        wait_for(finished, [log_path], timeout=timeout)
+    except TimeoutError:
+        pass
+
+    success = follower.found(printout)
 
     # Check flags
     assert (
@@ -0,0 +1,72 @@
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+import ray
+
+from src.validation.ready import alive_nodes
+from src.validation.ready import port_open
+from src.validation.ready import wait_for_port
+
+
+def free_port() -> int:
+    """A local port that is free at the time of the call."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_wait_for_port():
+    """Verifies that the probe returns as soon as the port opens."""
+
+    port = free_port()
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    def listen():
+        time.sleep(0.3)
+        server.bind(("127.0.0.1", port))
+        server.listen()
+
+    assert not port_open("127.0.0.1", port)
+    thread = threading.Thread(target=listen)
+    thread.start()
+    try:
+        start = time.monotonic()
+        wait_for_port(f"127.0.0.1:{port}", timeout=5)
+        assert time.monotonic() - start < 2
+    finally:
+        thread.join()
+        server.close()
+
+    with pytest.raises(TimeoutError):
+        wait_for_port(f"127.0.0.1:{free_port()}", timeout=0.3)
+
+
+def test_wait_for_port_process_exited():
+    """Verifies that the probe fails early when the process starting the service exits."""
+
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError):
+        wait_for_port(f"127.0.0.1:{free_port()}", timeout=10, pid=process.pid)
+    assert time.monotonic() - start < 2
+
+
+def test_alive_nodes(monkeypatch):
+    """Verifies that only alive nodes on the requested hosts are counted."""
+
+    nodes = [
+        {"Alive": True, "NodeManagerHostname": "d-1-1.cluster"},
+        {"Alive": True, "NodeManagerHostname": "d-1-2"},
+        {"Alive": False, "NodeManagerHostname": "d-1-3"},
+        {"Alive": True, "NodeManagerHostname": "d-2-1"},
+    ]
+    monkeypatch.setattr(ray, "nodes", lambda: nodes)
+
+    assert alive_nodes("127.0.0.1:6379", ["d-1-1", "d-1-2.cluster", "d-1-3"]) == 2
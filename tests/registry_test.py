@@ -0,0 +1,82 @@
+import json
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.launch.registry import Registry
+
+runner = CliRunner()
+
+
+def test_registry(tmp_path):
+    """Verifies that jobs, state transitions and head addresses are recorded and queried."""
+
+    with Registry(str(tmp_path / "registry.db")) as registry:
+        registry.add("100", "abc", "head", {"job_name": "ray_head_node", "nodes": 1})
+        registry.add("101", "abc", "cpu", {"job_name": "ray_cpu_workers", "nodes": 2})
+        registry.add("200", "xyz", "head", {"job_name": "ray_head_node", "nodes": 1})
+
+        assert registry.update_states({"100": "RUNNING", "101": "PENDING"}) == {
+            "100": "RUNNING",
+            "101": "PENDING",
+        }
+        assert registry.update_states({"100": "RUNNING", "101": "FAILED"}) == {"101": "FAILED"}
+        assert [state for state, _ in registry.transitions("101")] == [
+            "SUBMITTED",
+            "PENDING",
+            "FAILED",
+        ]
+
+        registry.set_head("abc", "10.0.0.1:6379")
+        assert [job["job_id"] for job in registry.jobs(["abc"], active=True)] == ["100"]
+        assert registry.jobs(["abc"])[0]["head_addr"] == "10.0.0.1:6379"
+        assert registry.latest_cluster() == "xyz"
+
+
+def test_status_teardown(workdir, slurm_stub):
+    """Verifies that a run is recorded and torn down with a single scancel call."""
+
+    runner.invoke(app, ["setup-head", "--output", "registry_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "registry_test_cpu", "--nodes", "2"])
+    slurm_stub.set_delay("*", 0.2)
+
+    result = runner.invoke(app, ["run", "--concurrent"])
+    assert result.exit_code == 0, result.stdout
+    cluster_id = json.loads(open(Cfg.CONFIG_MISC).read())["cluster_id"]
+
+    # The job ids returned by sbatch are recorded
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        jobs = registry.jobs([cluster_id])
+    assert [job["job_id"] for job in jobs] == [str(s["job_id"]) for s in slurm_stub.submissions()]
+    assert [job["tier"] for job in jobs] == ["head", "cpu"]
+
+    # A failed job is no longer active
+    slurm_stub.set_state(jobs[1]["job_id"], "FAILED")
+    queries = len(slurm_stub.calls("squeue"))
+    result = runner.invoke(app, ["status"])
+    assert result.exit_code == 0, result.stdout
+    assert len(slurm_stub.calls("squeue")) == queries + 1
+
+    result = runner.invoke(app, ["teardown", "--logs"])
+    assert result.exit_code == 0, result.stdout
+    (scancel,) = slurm_stub.calls("scancel")
+    assert scancel["args"] == [jobs[0]["job_id"]]
+    assert len(slurm_stub.calls("srun")) == 1
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        assert [job["state"] for job in registry.jobs([cluster_id])] == ["CANCELLED", "FAILED"]
+    assert not (workdir / "logs" / "registry_test_head.log").exists()
+
+
+def test_teardown_sweep(workdir, slurm_stub):
+    """Verifies that every array task of a sweep is cancelled in one call."""
+
+    result = runner.invoke(app, ["sweep", "--nodes", "1,2", "--repeats", "2", "--no-wait"])
+    assert result.exit_code == 0, result.stdout
+
+    result = runner.invoke(app, ["teardown"])
+    assert result.exit_code == 0, result.stdout
+    (scancel,) = slurm_stub.calls("scancel")
+    assert len(scancel["args"]) == 4
+    assert all(["_" in job_id for job_id in scancel["args"]])
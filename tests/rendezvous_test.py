@@ -0,0 +1,90 @@
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from src.rendezvous import client
+from src.rendezvous.server import RendezvousServer
+
+
+def put_later(url: str, key: str, value: str, delay: float):
+    """Publish a value from a background thread after a delay.
+
+    Args:
+        url (str): Location of the rendezvous.
+        key (str): Key to publish.
+        value (str): Value of the key.
+        delay (float): Delay in seconds.
+    """
+
+    def target():
+        time.sleep(delay)
+        client.put(url, key, value)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def free_port() -> int:
+    """A local port that is free at the time of the call."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_file_put_get(tmp_path):
+    """Verifies that a file rendezvous is written atomically and read back without the newline."""
+
+    url = f"file://{tmp_path}/cluster"
+    client.put(url, "ray_head_node_addr", "10.0.0.1:6379")
+
+    assert os.listdir(tmp_path / "cluster") == ["ray_head_node_addr.txt"]  # no temporary leftovers
+    assert client.get(url, "ray_head_node_addr", timeout=1).strip() == "10.0.0.1:6379"
+
+
+def test_file_get_blocks(tmp_path):
+    """Verifies that a reader blocks until the value is published and times out otherwise."""
+
+    url = f"file://{tmp_path}"
+    thread = put_later(url, "ray_head_node_addr", "10.0.0.1:6379", 0.2)
+    assert client.get(url, "ray_head_node_addr", timeout=5).strip() == "10.0.0.1:6379"
+    thread.join()
+
+    with pytest.raises(TimeoutError):
+        client.get(url, "missing", timeout=0.2)
+
+
+def test_http_long_poll():
+    """Verifies that an HTTP reader is answered as soon as the value is published."""
+
+    with RendezvousServer(host="127.0.0.1") as server:
+        url = server.url("127.0.0.1") + "/cluster"
+        thread = put_later(url, "ray_head_node_addr", "10.0.0.1:6379", 0.2)
+
+        start = time.monotonic()
+        assert client.get(url, "ray_head_node_addr", timeout=5) == "10.0.0.1:6379"
+        assert time.monotonic() - start < 2
+        thread.join()
+
+        with pytest.raises(TimeoutError):
+            client.get(url, "missing", timeout=0.3)
+
+
+def test_http_retry():
+    """Verifies that the clients retry until the server is reachable."""
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/cluster"
+    server = RendezvousServer(host="127.0.0.1", port=port)
+
+    thread = threading.Timer(0.3, server.start)
+    thread.start()
+    try:
+        client.put(url, "ray_head_node_addr", "10.0.0.1:6379", timeout=5)
+        assert client.get(url, "ray_head_node_addr", timeout=5) == "10.0.0.1:6379"
+    finally:
+        thread.join()
+        server.stop()
@@ -0,0 +1,63 @@
+import json
+import socket
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.launch.registry import Registry
+
+runner = CliRunner()
+
+
+def test_renew_capacity(workdir, slurm_stub):
+    """Verifies that worker jobs are replaced ahead of their time limit, so the capacity holds over several time limits."""
+
+    runner.invoke(app, ["setup-head", "--output", "renew_test_head"])
+    args = ["--output", "renew_test_cpu", "--nodes", "2", "--time", "0-00:00:04"]
+    runner.invoke(app, ["setup-cpu", *args])
+    slurm_stub.set_delay("*", 0.5)
+    assert runner.invoke(app, ["run", "--concurrent"]).exit_code == 0
+
+    # A window of 3.5 time limits
+    args = ["--lead", "2", "--interval", "0.25", "--grace", "0", "--duration", "14"]
+    result = runner.invoke(app, ["renew", *args])
+    assert result.exit_code == 0, result.stdout
+
+    samples = [json.loads(line) for line in open(Cfg.CAPACITY_LOG)]
+    assert samples[-1]["time"] - samples[0]["time"] >= 3 * 4
+    assert min([sample["nodes"] for sample in samples]) >= samples[0]["target"] == 2
+
+    # Every replaced job was drained (SIGTERM to its steps) before it was cancelled
+    workers = slurm_stub.submissions()[1:]
+    assert len(workers) >= 4
+    assert all(["#SBATCH --signal=TERM@60" in slurm_stub.script(w["job_id"]) for w in workers])
+    drained = [call["args"][1] for call in slurm_stub.calls("scancel") if len(call["args"]) == 2]
+    assert drained == [str(worker["job_id"]) for worker in workers[: len(drained)]]
+    assert len(drained) >= 3
+
+
+def test_renew_head(workdir, slurm_stub):
+    """Verifies that `renew --head` starts a new cluster before the head expires and fails over once it answers."""
+
+    runner.invoke(app, ["setup-head", "--output", "renew_test_head", "--time", "0-00:00:30"])
+    runner.invoke(app, ["setup-cpu", "--output", "renew_test_cpu"])
+    slurm_stub.set_delay("*", 0.1)
+    assert runner.invoke(app, ["run", "--concurrent"]).exit_code == 0
+    cluster_id = json.loads(open(Cfg.CONFIG_MISC).read())["cluster_id"]
+
+    args = ["--lead", "60", "--interval", "0.2", "--duration", "0.1", "--head"]
+    assert runner.invoke(app, ["renew", *args]).exit_code == 0
+    successor = json.loads(open(Cfg.RENEWALS).read())["successor"]
+    assert successor not in ("", cluster_id)
+    assert len(slurm_stub.submissions()) == 4
+
+    # The new head answers, it becomes the current cluster
+    with socket.create_server(("127.0.0.1", 0)) as gcs:
+        with open(workdir / "logs" / f"renew_test_head_{successor}.log", "a") as f:
+            f.write(f"HEAD Node Address       = 127.0.0.1:{gcs.getsockname()[1]}\n")
+        assert runner.invoke(app, ["renew", *args]).exit_code == 0
+
+    assert json.loads(open(Cfg.CONFIG_MISC).read())["cluster_id"] == successor
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        assert registry.jobs([successor])[0]["head_addr"].startswith("127.0.0.1:")
@@ -0,0 +1,94 @@
+import json
+import socket
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.launch.registry import Registry
+
+runner = CliRunner()
+
+
+def run_cluster(slurm_stub, *args: str) -> str:
+    """Run the current configuration, return the id of the current cluster."""
+
+    result = runner.invoke(app, ["run", "--concurrent", *args])
+    assert result.exit_code == 0, result.stdout
+
+    return json.loads(open(Cfg.CONFIG_MISC).read())["cluster_id"]
+
+
+def publish_head(workdir, output: str, gcs: socket.socket):
+    """Print the head address in the log of a head, as setup_ray_head.sh does."""
+
+    address = "127.0.0.1:%d" % gcs.getsockname()[1]
+    with open(workdir / "logs" / f"{output}.log", "a") as f:
+        f.write(f"HEAD Node Address       = {address}\n")
+
+
+def test_reuse(workdir, slurm_stub):
+    """Verifies that `run --reuse` returns the live cluster of the same configuration without submitting anything."""
+
+    runner.invoke(app, ["setup-head", "--output", "reuse_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "reuse_test_cpu", "--nodes", "2"])
+    slurm_stub.set_delay("*", 0.1)
+
+    with socket.create_server(("127.0.0.1", 0)) as gcs:
+        cluster_id = run_cluster(slurm_stub)
+        publish_head(workdir, "reuse_test_head", gcs)
+
+        assert run_cluster(slurm_stub, "--reuse") == cluster_id
+        assert len(slurm_stub.submissions()) == 2
+        with Registry(Cfg.REGISTRY_DB) as registry:
+            assert registry.jobs([cluster_id])[0]["head_addr"].startswith("127.0.0.1:")
+
+        # Not enough walltime left (5 minutes) to be reused
+        renewed = run_cluster(slurm_stub, "--reuse", "--renew-margin", "600")
+        assert renewed != cluster_id
+        assert len(slurm_stub.submissions()) == 4
+        publish_head(workdir, "reuse_test_head", gcs)
+
+    # A head that does not answer is not reused
+    assert run_cluster(slurm_stub, "--reuse") not in (cluster_id, renewed)
+
+    # Another configuration never matches
+    runner.invoke(app, ["setup-cpu", "--output", "reuse_test_cpu", "--nodes", "3"])
+    submitted = len(slurm_stub.submissions())
+    run_cluster(slurm_stub, "--reuse")
+    assert len(slurm_stub.submissions()) == submitted + 2
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        assert len({cluster["config_hash"] for cluster in registry.clusters()}) == 2
+
+
+def test_standby(workdir, slurm_stub):
+    """Verifies that standby clusters are submitted ahead, reused once ready and replaced when they end."""
+
+    runner.invoke(app, ["setup-head", "--output", "standby_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "standby_test_cpu"])
+    slurm_stub.set_delay("*", 0.1)
+
+    with socket.create_server(("127.0.0.1", 0)) as gcs:
+        cluster_id = run_cluster(slurm_stub, "--reuse", "--standby", "1")
+
+        # The standby cluster has its own logs and is not waited for
+        with Registry(Cfg.REGISTRY_DB) as registry:
+            clusters = [cluster["cluster_id"] for cluster in registry.clusters()]
+            standby = clusters[1]
+            assert [job["log"] for job in registry.jobs([standby])] == [
+                f"logs/standby_test_head_{standby}.log",
+                f"logs/standby_test_cpu_{standby}.log",
+            ]
+        assert len(slurm_stub.submissions()) == 4
+
+        # The pool is full
+        publish_head(workdir, "standby_test_head", gcs)
+        assert run_cluster(slurm_stub, "--reuse", "--standby", "1") == cluster_id
+        assert len(slurm_stub.submissions()) == 4
+
+        # The current cluster ends: the standby takes over and is replaced
+        head = str(slurm_stub.submissions()[0]["job_id"])
+        slurm_stub.set_state(head, "TIMEOUT")
+        publish_head(workdir, f"standby_test_head_{standby}", gcs)
+        assert run_cluster(slurm_stub, "--reuse", "--standby", "1") == standby
+        assert len(slurm_stub.submissions()) == 6
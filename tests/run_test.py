@@ -0,0 +1,81 @@
+import time
+
+from typer.testing import CliRunner
+
+from main import app
+
+runner = CliRunner()
+
+
+def setup_tiers():
+    """Use the CLI to write a head, CPU and GPU configuration."""
+
+    runner.invoke(app, ["setup-head", "--output", "run_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "run_test_cpu", "--nodes", "2"])
+    runner.invoke(app, ["setup-gpu", "--output", "run_test_gpu", "--nodes", "3"])
+
+
+def test_run_serial(workdir, slurm_stub):
+    """Verifies that the serial launch submits one tier at a time, after the previous tier started."""
+
+    setup_tiers()
+    for job_name in ["ray_head_node", "ray_cpu_workers", "ray_gpu_workers"]:
+        slurm_stub.set_delay(job_name, 0.5)
+
+    result = runner.invoke(app, ["run"])
+    assert result.exit_code == 0, result.stdout
+
+    submissions = slurm_stub.submissions()
+    assert [s["job_name"] for s in submissions] == [
+        "ray_head_node",
+        "ray_cpu_workers",
+        "ray_gpu_workers",
+    ]
+    assert submissions[1]["time"] - submissions[0]["time"] >= 0.5
+    assert submissions[2]["time"] - submissions[1]["time"] >= 0.5
+
+
+def test_run_concurrent(workdir, slurm_stub):
+    """Verifies that the concurrent launch submits every tier up front and waits for the slowest tier only."""
+
+    setup_tiers()
+    slurm_stub.set_delay("ray_head_node", 1.0)
+    slurm_stub.set_delay("ray_cpu_workers", 1.0)
+    slurm_stub.set_delay("ray_gpu_workers", 1.0)
+
+    tic = time.time()
+    result = runner.invoke(app, ["run", "--concurrent"])
+    elapsed = time.time() - tic
+    assert result.exit_code == 0, result.stdout
+
+    # Every tier is submitted before the head has started
+    submissions = slurm_stub.submissions()
+    assert len(submissions) == 3
+    assert submissions[-1]["time"] - submissions[0]["time"] < 1.0
+
+    # Time to full cluster is max(tier) rather than sum(tier)
+    assert elapsed < 2.5
+
+    # Workers wait on the head address for the requested timeout
+    assert "--timeout=3600" in slurm_stub.script(submissions[1]["job_id"])
+
+
+def test_run_rendezvous_http(workdir, slurm_stub):
+    """Verifies that `run --rendezvous http` points every tier to the same server namespace."""
+
+    setup_tiers()
+    for job_name in ["ray_head_node", "ray_cpu_workers", "ray_gpu_workers"]:
+        slurm_stub.set_delay(job_name, 0.1)
+
+    result = runner.invoke(app, ["run", "--concurrent", "--rendezvous", "http"])
+    assert result.exit_code == 0, result.stdout
+
+    scripts = [slurm_stub.script(s["job_id"]) for s in slurm_stub.submissions()]
+    urls = {
+        line.split("=", 1)[1].rstrip(" \\")
+        for s in scripts
+        for line in s.splitlines()
+        if "--rendezvous=" in line
+    }
+    assert len(urls) == 1
+    assert urls.pop().startswith("http://")
@@ -0,0 +1,80 @@
+import json
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.launch.registry import Registry
+
+runner = CliRunner()
+
+
+def run_cluster(slurm_stub) -> str:
+    """Run a head and a CPU tier, return the cluster id."""
+
+    runner.invoke(app, ["setup-head", "--output", "scale_test_head"])
+    runner.invoke(app, ["setup-cpu", "--output", "scale_test_cpu", "--nodes", "2"])
+    slurm_stub.set_delay("*", 0.1)
+
+    result = runner.invoke(app, ["run", "--concurrent"])
+    assert result.exit_code == 0, result.stdout
+
+    return json.loads(open(Cfg.CONFIG_MISC).read())["cluster_id"]
+
+
+def test_scale_out(workdir, slurm_stub):
+    """Verifies that `scale-cpu --add` submits a worker job joining the running head and only waits for its nodes."""
+
+    cluster_id = run_cluster(slurm_stub)
+    head_script = slurm_stub.script(slurm_stub.submissions()[0]["job_id"])
+
+    result = runner.invoke(app, ["scale-cpu", "--add", "3"])
+    assert result.exit_code == 0, result.stdout
+
+    submissions = slurm_stub.submissions()
+    assert len(submissions) == 3
+    assert (submissions[-1]["job_name"], submissions[-1]["nodes"]) == ("ray_cpu_workers_scale1", 3)
+
+    # The new workers read the head address from the rendezvous of the running cluster
+    rendezvous = f"--rendezvous=file://$HOME/tmp/{cluster_id}"
+    assert rendezvous in slurm_stub.script(submissions[-1]["job_id"])
+    assert rendezvous in head_script
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        jobs = registry.jobs([cluster_id], active=True)
+    assert [(job["tier"], job["state"]) for job in jobs] == [
+        ("head", "RUNNING"),
+        ("cpu", "RUNNING"),
+        ("cpu", "RUNNING"),
+    ]
+    assert "6 nodes" in result.stdout
+
+    # A job that never starts fails the scale-out, the cluster keeps running
+    slurm_stub.set_state("1003", "FAILED")
+    result = runner.invoke(app, ["scale-cpu", "--add", "1"])
+    assert result.exit_code == 1
+    assert "FAILED" in result.stdout
+
+
+def test_scale_in(workdir, slurm_stub):
+    """Verifies that `scale-cpu --remove` drains the latest worker job before cancelling it."""
+
+    cluster_id = run_cluster(slurm_stub)
+    assert runner.invoke(app, ["scale-cpu", "--add", "1"]).exit_code == 0
+    scaled = str(slurm_stub.submissions()[-1]["job_id"])
+
+    result = runner.invoke(app, ["scale-cpu", "--remove", "1", "--grace", "0"])
+    assert result.exit_code == 0, result.stdout
+
+    # SIGTERM to the job steps, node-local cleanup, then one scancel
+    scancels = [call["args"] for call in slurm_stub.calls("scancel")]
+    assert scancels == [["--signal=TERM", scaled], [scaled]]
+    assert [call["args"][0] for call in slurm_stub.calls("srun")] == [f"--jobid={scaled}"]
+
+    with Registry(Cfg.REGISTRY_DB) as registry:
+        jobs = registry.jobs([cluster_id], active=True)
+    assert [job["tier"] for job in jobs] == ["head", "cpu"]
+
+    # The head is not a worker job
+    result = runner.invoke(app, ["scale-cpu", "--job", jobs[0]["job_id"]])
+    assert result.exit_code != 0
@@ -76,7 +76,7 @@ ray start \
 # Provides verification of Ray runtimes.
 # Argument 1: Slurm log file.
 # Argument 2: Number of nodes to check for.
-python src/validation/nodes.py "logs/slurm-basic-cpu-test.log" 2
+python -m src.validation.nodes "logs/slurm-basic-cpu-test.log" 2
 
 python -u tests/python/basic_test.py $HEAD_NODE_ADDR
 
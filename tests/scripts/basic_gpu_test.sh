@@ -77,7 +77,7 @@ ray start \
 # Provides verification of Ray runtimes.
 # Argument 1: Slurm log file.
 # Argument 2: Number of nodes to check for.
-python src/validation/nodes.py "logs/slurm-basic-gpu-test.log" 2
+python -m src.validation.nodes "logs/slurm-basic-gpu-test.log" 2
 
 python -u tests/python/basic_test.py $HEAD_NODE_ADDR
 
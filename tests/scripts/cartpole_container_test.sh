@@ -65,7 +65,7 @@ source src/scripts/setup_ray_workers.sh \
 # Provides verification of Ray runtimes.
 # Argument 1: Slurm log file.
 # Argument 2: Number of nodes to check for.
-python src/validation/nodes.py "logs/slurm-cartpole-container.log" 3
+python -m src.validation.nodes "logs/slurm-cartpole-container.log" 3
 
 # Container Run
 # --------------------------------------------------------------------------------------------------
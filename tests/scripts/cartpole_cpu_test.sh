@@ -45,7 +45,7 @@ source src/scripts/setup_ray_workers.sh --gpus=0 --index=1
 # Provides verification of Ray runtimes.
 # Argument 1: Slurm log file.
 # Argument 2: Number of nodes to check for.
-python src/validation/nodes.py "logs/slurm-cartpole-cpu-test.log" 3
+python -m src.validation.nodes "logs/slurm-cartpole-cpu-test.log" 3
 
 # Python Code
 # --------------------------------------------------------------------------------------------------
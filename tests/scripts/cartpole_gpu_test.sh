@@ -46,7 +46,7 @@ source src/scripts/setup_ray_workers.sh --gpus=1 --index=1
 # Provides verification of Ray runtimes.
 # Argument 1: Slurm log file.
 # Argument 2: Number of nodes to check for.
-python src/validation/nodes.py "logs/slurm-cartpole-gpu-test.log" 2
+python -m src.validation.nodes "logs/slurm-cartpole-gpu-test.log" 2
 
 # Python Code
 # --------------------------------------------------------------------------------------------------
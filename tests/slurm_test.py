@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.launch.slurm import Gateway
+from src.launch.slurm import job_info
+from src.launch.slurm import job_states
+from src.launch.slurm import sbatch
+from src.launch.slurm import squeue_info
+
+
+def submit(workdir, count: int) -> list[str]:
+    """Submit jobs to the stub scheduler."""
+
+    script = workdir / "job.sh"
+    script.write_text("#!/bin/bash\n#SBATCH --job-name slurm_test\n")
+    return [sbatch(str(script)).stdout.split()[-1] for _ in range(count)]
+
+
+def test_ttl_cache(workdir, slurm_stub):
+    """Verifies that identical read-only queries are answered from the cache until the TTL expires."""
+
+    job_ids = submit(workdir, 2)
+    gateway = Gateway(ttl=0.3)
+
+    first = squeue_info(job_ids, gateway)
+    assert squeue_info(job_ids, gateway) == first
+    assert len(slurm_stub.calls("squeue")) == 1
+
+    time.sleep(0.3)
+    squeue_info(job_ids, gateway)
+    assert len(slurm_stub.calls("squeue")) == 2
+    assert gateway.stats()["squeue"].cache_hits == 1
+
+
+def test_coalesce(workdir, slurm_stub):
+    """Verifies that concurrent identical queries share a single call."""
+
+    job_ids = submit(workdir, 1)
+    gateway = Gateway()
+    slurm_stub.set_latency("squeue", 0.3)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: squeue_info(job_ids, gateway), range(8)))
+
+    assert all([result == results[0] for result in results])
+    assert len(slurm_stub.calls("squeue")) == 1
+    stats = gateway.stats()["squeue"]
+    assert stats.coalesced + stats.cache_hits == 7
+
+
+def test_batch(workdir, slurm_stub):
+    """Verifies that per-job queries issued concurrently are batched into one multi-job call."""
+
+    job_ids = submit(workdir, 8)
+    gateway = Gateway(batch_window=0.1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda job_id: job_info([job_id], gateway), job_ids))
+
+    assert [list(result) for result in results] == [[job_id] for job_id in job_ids]
+    (call,) = slurm_stub.calls("squeue")
+    assert call["args"][-1] == f"--jobs={','.join(sorted(job_ids))}"
+
+    # Answered from the per-job cache
+    assert job_states(job_ids, gateway) == {job_id: "PENDING" for job_id in job_ids}
+    assert len(slurm_stub.calls("squeue")) == 1
+
+
+def test_retry_rate_limit(workdir, slurm_stub):
+    """Verifies that transient errors are retried with a backoff and that calls are rate limited."""
+
+    job_ids = submit(workdir, 1)
+    slurm_stub.set_failures("squeue", 2)
+
+    gateway = Gateway(ttl=0, rate=10, burst=1)
+    assert squeue_info(job_ids, gateway)[job_ids[0]]["state"] == "PENDING"
+    stats = gateway.stats()["squeue"]
+    assert (stats.calls, stats.retries, stats.errors) == (3, 2, 0)
+    assert stats.seconds > 0 and stats.max_seconds <= stats.seconds
+
+    tic = time.monotonic()
+    for _ in range(5):
+        squeue_info(job_ids, gateway)
+    assert time.monotonic() - tic >= 0.4
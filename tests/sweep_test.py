@@ -0,0 +1,78 @@
+import json
+
+from typer.testing import CliRunner
+
+from main import app
+from src.launch.sweep import expand_grid
+from src.launch.sweep import group_variants
+from src.launch.sweep import sweep_values
+
+runner = CliRunner()
+
+BASE = {
+    "job_name": "sweep",
+    "output": "sweep",
+    "gres": "n/a",
+    "time": "0-00:05:00",
+    "tmpdir": "/tmp",
+    "container_src_path": "n/a",
+    "container_tgt_path": "/tmp/ray_container.sif",
+    "hostenv": "bare_metal",
+    "cpus_per_task": 4,
+    "partition": "xeon-p8",
+}
+
+
+def test_expand_grid():
+    """Verifies that every combination is a variant and variants sharing resources share an array."""
+
+    grid = {"nodes": [1, 2, 4], "partition": ["xeon-p8", "gaia"]}
+    variants = expand_grid(BASE, grid, repeats=2)
+
+    assert len(variants) == 12
+    assert [v["variant"] for v in variants] == list(range(12))
+    assert len(group_variants(variants)) == 6
+    assert len(group_variants(variants, array=False)) == 12
+
+
+def test_sweep_values():
+    """Verifies that one array task is generated per variant with one extra node for the head."""
+
+    variants = expand_grid(BASE, {"nodes": [2], "hostenv": ["bare_metal", "container"]})
+    values = sweep_values("sweep_test", 0, variants)
+
+    assert values["array"] == "0-1"
+    assert values["nodes"] == 3
+    assert "#SBATCH --nodes=3" in values["sweep_header"]
+    assert values["sweep_variants"].count(";;") == 2
+    assert values["sweep_variants"].count("--index=1") == 2
+    assert values["sweep_variants"].count("--container_src=") == 2  # head and workers
+    assert "/tmp/sweep_test_1" in values["sweep_variants"]  # isolated tmpdir per variant
+
+
+def test_sweep(workdir, slurm_stub):
+    """Verifies that `sweep` submits one job array per resource request and collects every variant."""
+
+    slurm_stub.set_delay("*", 0.2)
+    result = runner.invoke(
+        app, ["sweep", "--nodes", "1,2", "--partition", "xeon-p8,gaia", "--repeats", "2"]
+    )
+    assert result.exit_code == 0, result.stdout
+
+    submissions = slurm_stub.submissions()
+    assert len(submissions) == 4
+    assert all([s["array"] == "0-1" for s in submissions])
+
+    (sweep_dir,) = (workdir / ".ray_slurm" / "sweeps").iterdir()
+    variants = json.loads((sweep_dir / "results.json").read_text())
+    assert len(variants) == 8
+    assert all([v["status"] == "ready" for v in variants])
+    assert len({v["log"] for v in variants}) == 8
+
+
+def test_sweep_no_array(workdir, slurm_stub):
+    """Verifies that without job arrays every variant is its own submission."""
+
+    result = runner.invoke(app, ["sweep", "--nodes", "1,2", "--no-array", "--no-wait"])
+    assert result.exit_code == 0, result.stdout
+    assert len(slurm_stub.submissions()) == 2
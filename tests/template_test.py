@@ -0,0 +1,54 @@
+import glob
+import os
+
+import pytest
+
+from src.launch.template import load
+from src.launch.template import PLACEHOLDER
+from src.launch.template import render_file
+from src.launch.template import Template
+
+
+def test_render():
+    """Verifies that placeholders are filled in one pass and shell expansions are left alone."""
+
+    template = Template("#SBATCH --nodes={NODES}\necho ${NODES} {JOB_NAME}{JOB_NAME}\n")
+    text = template.render({"nodes": 2, "job_name": "{NODES}", "unused": "x"})
+
+    assert text == "#SBATCH --nodes=2\necho ${NODES} {NODES}{NODES}\n"
+
+
+def test_unresolved(tmp_path):
+    """Verifies that a missing value raises before the destination is written."""
+
+    src = tmp_path / "template.sh"
+    src.write_text("#SBATCH --gres={GRES}\n#SBATCH --nodes={NODES}\n")
+
+    with pytest.raises(KeyError, match="GRES"):
+        render_file({"nodes": 1}, str(src), str(tmp_path / "script.sh"))
+    assert not (tmp_path / "script.sh").exists()
+
+    with pytest.raises(ValueError, match="gres"):
+        Template("#SBATCH --gres={gres}\n")
+
+
+def test_load_cache(tmp_path):
+    """Verifies that a template is compiled once and recompiled after it is modified."""
+
+    src = tmp_path / "template.sh"
+    src.write_text("{A}\n")
+    assert load(str(src)) is load(str(src))
+
+    src.write_text("{B}\n")
+    os.utime(src, ns=(0, os.stat(src).st_mtime_ns + 1))
+    assert load(str(src)).placeholders == {"B"}
+
+
+def test_repo_templates():
+    """Verifies that every sbatch template of the repo only uses known upper case placeholders."""
+
+    templates_dir = os.path.join(os.path.dirname(__file__), "..", "src", "templates")
+    for path in glob.glob(os.path.join(templates_dir, "*.sh")):
+        template = load(path)
+        values = {key: "x" for key in template.placeholders}
+        assert not PLACEHOLDER.search(template.render(values))
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from src.validation.logs import LogFollower
+from src.validation.logs import RAY_RUNTIME_STARTED
+from src.validation.wait import Backoff
+from src.validation.wait import FileWatcher
+from src.validation.wait import read_when_ready
+from src.validation.wait import wait_for_count
+from src.validation.wait import wait_for_file
+
+
+def write_later(path: str, text: str, delay: float, mode: str = "a"):
+    """Write to a file from a background thread after a delay.
+
+    Args:
+        path (str): Path of the file.
+        text (str): Text to write.
+        delay (float): Delay in seconds.
+        mode (str, optional): File open mode. Defaults to "a".
+    """
+
+    def target():
+        time.sleep(delay)
+        with open(path, mode) as f:
+            f.write(text)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def test_backoff():
+    """Verifies that the backoff grows exponentially up to the maximum and can be reset."""
+
+    backoff = Backoff(initial=0.1, factor=2, maximum=0.5)
+    assert [backoff.next() for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+    backoff.reset()
+    assert backoff.next() == 0.1
+
+
+def test_inotify_wakeup(tmp_path):
+    """Verifies that the watcher is woken up by a file change well before the timeout."""
+
+    path = str(tmp_path / "ray.log")
+
+    with FileWatcher([path]) as watcher:
+        if watcher.inotify is False:
+            pytest.skip("inotify is not available on this system")
+
+        thread = write_later(path, "hello\n", delay=0.1)
+        tic = time.monotonic()
+        assert watcher.wait(5.0) is True
+        assert time.monotonic() - tic < 2.0
+        thread.join()
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_wait_for_file(tmp_path, use_inotify):
+    """Verifies that waiting for a file returns once it is created (with and without inotify)."""
+
+    path = str(tmp_path / "ray.log")
+    thread = write_later(path, "", delay=0.2)
+
+    wait_for_file(path, timeout=5, use_inotify=use_inotify)
+    thread.join()
+
+
+def test_wait_for_file_timeout(tmp_path):
+    """Verifies that a timeout is raised when the file never appears."""
+
+    with pytest.raises(TimeoutError):
+        wait_for_file(str(tmp_path / "missing.log"), timeout=0.3)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_read_when_ready(tmp_path, use_inotify):
+    """Verifies that a partially written address file is not returned until it is complete."""
+
+    path = str(tmp_path / "ray_head_node_addr.txt")
+    with open(path, "w") as f:
+        f.write("10.0.0.1:")  # incomplete write
+
+    thread = write_later(path, "6379\n", delay=0.2)
+    assert read_when_ready(path, timeout=5, use_inotify=use_inotify) == "10.0.0.1:6379"
+    thread.join()
+
+
+def test_wait_for_count(tmp_path):
+    """Verifies that waiting for a marker count reports progress and returns the final count."""
+
+    path = str(tmp_path / "ray.log")
+    follower = LogFollower(path, RAY_RUNTIME_STARTED)
+    progress = []
+
+    threads = [write_later(path, f"{RAY_RUNTIME_STARTED}\n", delay=0.1 * i) for i in range(1, 4)]
+    count = wait_for_count(follower, RAY_RUNTIME_STARTED, 3, timeout=5, callback=progress.append)
+    for thread in threads:
+        thread.join()
+
+    assert count == 3
+    assert progress[-1] == 3
+    assert progress == sorted(progress)
@@ -0,0 +1,101 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import time
+
+from typer.testing import CliRunner
+
+from main import app
+from main import Cfg
+from src.validation.health import NodeCensus
+
+runner = CliRunner()
+
+
+def read_jsonl(path: str) -> list[dict]:
+    """Records of a JSON lines file."""
+
+    return [json.loads(line) for line in open(path)] if os.path.exists(path) else []
+
+
+def test_watch(workdir, slurm_stub):
+    """Verifies that lost worker nodes are noticed with one GCS query per round and replaced."""
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        address = f"127.0.0.1:{s.getsockname()[1]}"
+
+    # The GCS notices a dead raylet within a second
+    env = os.environ | {
+        "RAY_health_check_initial_delay_ms": "0",
+        "RAY_health_check_period_ms": "200",
+        "RAY_health_check_timeout_ms": "200",
+        "RAY_health_check_failure_threshold": "2",
+    }
+    head = [
+        "ray",
+        "start",
+        "--head",
+        f"--port={address.split(':')[1]}",
+        "--num-cpus=0",
+        "--include-dashboard=false",
+        "--disable-usage-stats",
+    ]
+    subprocess.run(head, env=env, check=True, capture_output=True)
+
+    try:
+        runner.invoke(app, ["setup-head", "--output", "watch_test_head"])
+        runner.invoke(app, ["setup-cpu", "--output", "watch_test_cpu", "--cpus-per-task", "1"])
+        slurm_stub.set_delay("*", 0.1)
+        assert runner.invoke(app, ["run", "--concurrent"]).exit_code == 0
+        with open(workdir / "logs" / "watch_test_head.log", "a") as f:
+            f.write(f"HEAD Node Address       = {address}\n")
+        slurm_stub.use_ray(address)  # replacements are real Ray worker nodes
+
+        # The worker job fails: its node is replaced
+        cpu = str(slurm_stub.submissions()[1]["job_id"])
+        slurm_stub.set_state(cpu, "NODE_FAIL")
+        assert runner.invoke(app, ["watch", "--duration", "0.1"]).exit_code == 0
+        events = read_jsonl(Cfg.EVENTS_LOG)
+        assert [(e["event"], e["job_id"], e["nodes"]) for e in events] == [
+            ("nodes_lost", cpu, 1),
+            ("replaced", cpu, 1),
+        ]
+        replacement = events[1]["replacement"]
+        assert len(slurm_stub.submissions()) == 3
+
+        census = NodeCensus(address, interval=0)
+        for _ in range(120):
+            if replacement in census.by_job():
+                break
+            time.sleep(0.5)
+
+        # One GCS query per round, the node of the replacement is alive
+        args = ["watch", "--interval", "0.2", "--duration", "1"]
+        assert runner.invoke(app, args).exit_code == 0
+        samples = read_jsonl(Cfg.HEALTH_LOG)[1:]
+        assert [s["gcs_queries"] for s in samples] == list(range(1, len(samples) + 1))
+        assert all([s["alive"] == s["target"] == 1 for s in samples])
+
+        # The node of the replacement dies while its job runs
+        pid = int((slurm_stub.state_dir / "pids" / replacement).read_text())
+        os.killpg(pid, signal.SIGKILL)
+        killed = time.time()
+        for _ in range(60):
+            assert runner.invoke(app, ["watch", "--duration", "0.1"]).exit_code == 0
+            if len(slurm_stub.submissions()) == 4:
+                break
+            time.sleep(0.5)
+
+        lost = read_jsonl(Cfg.EVENTS_LOG)[2]
+        assert (lost["event"], lost["job_id"], lost["reason"]) == (
+            "nodes_lost",
+            replacement,
+            "left the Ray cluster",
+        )
+        assert lost["time"] - killed < 30
+        assert [call["args"][-1] for call in slurm_stub.calls("scancel")][-1] == replacement
+    finally:
+        subprocess.run(["ray", "stop", "--force"], capture_output=True)